@@ -1,11 +1,57 @@
+import os
 from flask import Flask
+from app.database import db_config
+from app.database.init_db import init_db
+from app.controllers.student_controller import student_cache, group_writer
+from app.controllers.student_replica import student_replica
+from app.controllers import jobs_controller
+from app.controllers.jobs_controller import job_runner
+from app.database import write_queue
 from app.routes.student_routes import student_bp
-from flasgger import Swagger
+from app.routes.system_routes import system_bp
+from app.routes.job_routes import job_bp
+from app.utils import compression, metrics, sql_profiler
+from app.utils.docs import init_docs, DEFAULT_APISPEC_PATH
 
-def create_app():
-    """Application Factory Pattern to create the Flask app."""
+def create_app(config=None):
+    """
+    Application Factory Pattern to create the Flask app.
+    Args:
+        config (dict): Optional overrides for app.config (e.g. DATABASE, DB_POOL_SIZE).
+    """
     app = Flask(__name__)
-    
+
+    # 0. Defaults (overridable from the environment or the `config` argument)
+    app.config.update(
+        DATABASE=os.environ.get('STUDENTS_DB'),
+        DB_POOL_SIZE=int(os.environ.get('DB_POOL_SIZE', db_config.DEFAULT_POOL_SIZE)),
+        DB_POOL_TIMEOUT=float(os.environ.get('DB_POOL_TIMEOUT', db_config.DEFAULT_POOL_TIMEOUT)),
+        AUTO_MIGRATE=os.environ.get('AUTO_MIGRATE', 'true').lower() != 'false',
+        STUDENT_CACHE_SIZE=int(os.environ.get('STUDENT_CACHE_SIZE', 10000)),
+        STUDENT_CACHE_TTL=float(os.environ.get('STUDENT_CACHE_TTL', 60)),
+        METRICS_ENABLED=os.environ.get('METRICS_ENABLED', 'true').lower() != 'false',
+        SQL_PROFILER=os.environ.get('SQL_PROFILER', 'false').lower() == 'true',
+        SQL_SLOW_MS=float(os.environ.get('SQL_SLOW_MS', sql_profiler.DEFAULT_SLOW_MS)),
+        SQL_N_PLUS_ONE_THRESHOLD=int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD',
+                                                    sql_profiler.DEFAULT_N_PLUS_ONE_THRESHOLD)),
+        SQL_PROFILER_HEADER=os.environ.get('SQL_PROFILER_HEADER', 'false').lower() == 'true',
+        DOCS_MODE=os.environ.get('DOCS_MODE', 'dynamic').lower(),
+        APISPEC_PATH=os.environ.get('APISPEC_PATH', DEFAULT_APISPEC_PATH),
+        WRITE_QUEUE=os.environ.get('WRITE_QUEUE', 'false').lower() == 'true',
+        WRITE_QUEUE_MAX_BATCH=int(os.environ.get('WRITE_QUEUE_MAX_BATCH', write_queue.DEFAULT_MAX_BATCH)),
+        WRITE_QUEUE_MAX_BATCH_MS=float(os.environ.get('WRITE_QUEUE_MAX_BATCH_MS', write_queue.DEFAULT_MAX_BATCH_MS)),
+        STUDENT_REPLICA=os.environ.get('STUDENT_REPLICA', 'false').lower() == 'true',
+        COMPRESSION=os.environ.get('COMPRESSION', 'true').lower() != 'false',
+        COMPRESSION_MIN_SIZE=int(os.environ.get('COMPRESSION_MIN_SIZE', compression.DEFAULT_MIN_SIZE)),
+        COMPRESSION_LEVEL=int(os.environ.get('COMPRESSION_LEVEL', compression.DEFAULT_LEVEL)),
+        JOBS_ENABLED=os.environ.get('JOBS_ENABLED', 'true').lower() != 'false',
+        JOB_THREADS=int(os.environ.get('JOB_THREADS', jobs_controller.DEFAULT_THREADS)),
+        JOB_PROCESSES=int(os.environ.get('JOB_PROCESSES', jobs_controller.DEFAULT_PROCESSES)),
+        JOBS_DIR=os.environ.get('JOBS_DIR'),
+    )
+    if config:
+        app.config.update(config)
+
     # 1. Swagger Visual configuration
     app.config['SWAGGER'] = {
         'title': 'Student Management API',
@@ -13,11 +59,52 @@ def create_app():
         'description': 'API for the management of university students (CRUD) by: Gustavo Barreto, José Marcano and Gemini! :D'
     }
     
-    # 2. Execute Swagger
-    swagger = Swagger(app)
+    # 2. Execute Swagger (DOCS_MODE: dynamic, prebuilt apispec.json, or off in production)
+    init_docs(app)
     
     # 3. Blueprint registering (the routes)
     app.register_blueprint(student_bp)
+    app.register_blueprint(system_bp)
+    app.register_blueprint(job_bp)
+
+    # 4. Database pool: one checkout per request, returned on teardown
+    db_config.init_app(app)
+
+    # 5. Bring the schema up to date (a no-op PRAGMA read when it already is)
+    if app.config['AUTO_MIGRATE']:
+        init_db(db_config.resolve_db_path(), verbose=False)
+
+    # 6. Read-through cache for GET /api/students/<id> (size 0 disables it)
+    student_cache.configure(app.config['STUDENT_CACHE_SIZE'], app.config['STUDENT_CACHE_TTL'])
+
+    # 7. Request metrics (latency, status codes, DB time and SQL count per route) for /metrics
+    if app.config['METRICS_ENABLED']:
+        metrics.init_app(app)
+
+    # 8. Opt-in SQL profiler (statement stats, slow log with plans, N+1 detection)
+    sql_profiler.init_app(app)
+
+    # 9. Opt-in group commit: one writer thread applies concurrent single-row writes in shared transactions
+    group_writer.configure(app.config['WRITE_QUEUE'], app.config['WRITE_QUEUE_MAX_BATCH'],
+                           app.config['WRITE_QUEUE_MAX_BATCH_MS'])
+
+    # 10. Opt-in in-memory replica of the students table (by-id and id-ordered list reads), loaded now
+    if app.config['STUDENT_REPLICA']:
+        conn = db_config.get_pool().acquire()
+        try:
+            student_replica.configure(True, conn)
+        finally:
+            conn.close()
+    else:
+        student_replica.configure(False)
+
+    # 11. gzip responses for clients that accept it (registered last so it runs first among after_request hooks)
+    if app.config['COMPRESSION']:
+        compression.init_app(app)
+
+    # 12. Background jobs (POST /api/jobs): small thread + process pools; uploads and exports go to JOBS_DIR
+    job_runner.configure(app.config['JOBS_ENABLED'], app.config['JOB_THREADS'], app.config['JOB_PROCESSES'],
+                         app.config['JOBS_DIR'])
     
     return app
 
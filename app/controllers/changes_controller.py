@@ -0,0 +1,112 @@
+import sqlite3
+from app.database.db_config import get_db_connection
+
+# The change log itself is written by the student_changes_* triggers (migration 9)
+DEFAULT_CHANGES_LIMIT = 500
+MAX_CHANGES_LIMIT = 5000
+DEFAULT_RETENTION_DAYS = 30
+
+
+class ChangesExpired(Exception):
+    """The requested `since` is older than what retention kept (HTTP 410)."""
+
+    def __init__(self, since, horizon):
+        super().__init__(f"Changes up to seq {horizon} were dropped by retention (since={since}); resync")
+        self.since = since
+        self.horizon = horizon
+
+
+def _get_horizon(conn):
+    row = conn.execute("SELECT version FROM table_versions WHERE name = 'student_changes_horizon'").fetchone()
+    return row[0] if row else 0
+
+
+def get_latest_seq(conn):
+    """Sequence number of the newest change (0 if nothing was ever logged)."""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'student_changes'").fetchone()
+    return row[0] if row else 0
+
+
+def get_changes(since=0, limit=DEFAULT_CHANGES_LIMIT):
+    """
+    Changes logged after sequence number `since`, oldest first, each with the
+    student's current row (None once it is hard-deleted).
+    A compacted log keeps only the latest entry per student, so treat every
+    entry as "upsert this student": `op` is the last thing that happened to it.
+    Returns: dict {"changes", "next_since", "has_more", "latest_seq"}
+    Raises: ChangesExpired if retention already dropped changes after `since`.
+    """
+    conn = get_db_connection()
+    try:
+        horizon = _get_horizon(conn)
+        if since < horizon:
+            raise ChangesExpired(since, horizon)
+
+        sql = '''
+            SELECT c.seq, c.student_id, c.op, c.changed_at, s.*
+            FROM student_changes c LEFT JOIN students s ON s.id = c.student_id
+            WHERE c.seq > ? ORDER BY c.seq LIMIT ?
+        '''
+        rows = conn.execute(sql, (since, limit + 1)).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        changes = []
+        for row in rows:
+            student = dict(row)
+            change = {key: student.pop(key) for key in ('seq', 'student_id', 'op', 'changed_at')}
+            change['student'] = student if student['id'] is not None else None
+            changes.append(change)
+
+        return {
+            "changes": changes,
+            "next_since": changes[-1]['seq'] if changes else since,
+            "has_more": has_more,
+            "latest_seq": get_latest_seq(conn),
+        }
+    finally:
+        conn.close()
+
+
+def compact_changes(conn, retention_days=DEFAULT_RETENTION_DAYS, compact=True):
+    """
+    Keep the change log bounded:
+      compact   -> drop entries superseded by a newer one for the same student
+                   (clients still converge: every entry carries the current row)
+      retention -> drop entries older than `retention_days` and move the horizon,
+                   so clients that fell further behind get 410 and resync
+    Returns: dict {"superseded": n, "expired": n, "horizon": seq, "remaining": n}
+    """
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        superseded = 0
+        if compact:
+            superseded = conn.execute('''
+                DELETE FROM student_changes WHERE seq NOT IN (
+                    SELECT MAX(seq) FROM student_changes GROUP BY student_id
+                )
+            ''').rowcount
+
+        expired = 0
+        if retention_days is not None:
+            cutoff = conn.execute(
+                "SELECT MAX(seq) FROM student_changes WHERE changed_at < datetime('now', ?)",
+                (f'-{int(retention_days)} days',)
+            ).fetchone()[0]
+            if cutoff is not None:
+                expired = conn.execute('DELETE FROM student_changes WHERE seq <= ?', (cutoff,)).rowcount
+                conn.execute(
+                    "UPDATE table_versions SET version = MAX(version, ?) WHERE name = 'student_changes_horizon'",
+                    (cutoff,)
+                )
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    return {
+        "superseded": superseded,
+        "expired": expired,
+        "horizon": _get_horizon(conn),
+        "remaining": conn.execute('SELECT COUNT(*) FROM student_changes').fetchone()[0],
+    }
@@ -0,0 +1,158 @@
+import csv
+import io
+import json
+import sqlite3
+import uuid
+from app.database.db_config import get_db_connection
+from app.controllers.student_controller import insert_students, bump_students_version, after_write
+from app.utils.validators import validate_students, format_errors
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 50000
+# Rejected rows echoed back in an import response or job result (the CLI writes them all)
+MAX_REPORTED_REJECTS = 1000
+
+
+def iter_source_rows(stream, import_format):
+    """
+    Read an upload incrementally, one record at a time.
+    Args:
+        stream: binary or text file-like object.
+    Yields: (row_number, record or None, error or None); row_number starts at 1.
+    """
+    if isinstance(stream, io.TextIOBase):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+    if import_format == 'csv':
+        for row_number, row in enumerate(csv.DictReader(text), start=1):
+            # CSV has no null: an empty cell means "not provided"
+            yield row_number, {k: (v if v != '' else None) for k, v in row.items() if k}, None
+        return
+
+    row_number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+        yield row_number, record, None
+
+
+def get_import_run(import_id):
+    """Return the progress record of an import, or None."""
+    conn = get_db_connection()
+    try:
+        run = conn.execute('SELECT * FROM import_runs WHERE id = ?', (import_id,)).fetchone()
+        return dict(run) if run else None
+    finally:
+        conn.close()
+
+
+def _commit_chunk(conn, import_id, chunk, rows_read, on_reject):
+    """
+    Insert the valid rows of one chunk and record progress in the same
+    transaction, so a resumed import starts exactly after the last commit.
+    Args:
+        chunk (list): (row_number, record, error) tuples; error is set for rows
+            that failed parsing. The rest are validated here.
+    """
+    if not chunk:
+        return
+    # Validate the parsed rows of the chunk in one batch
+    parsed = [i for i, (_, _, error) in enumerate(chunk) if error is None]
+    for i, errors in zip(parsed, validate_students([chunk[i][1] for i in parsed])):
+        if errors:
+            chunk[i] = (chunk[i][0], chunk[i][1], format_errors(errors))
+    valid = [(row_number, record) for row_number, record, error in chunk if error is None]
+    rejects = [(row_number, record, error) for row_number, record, error in chunk if error is not None]
+
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        outcomes = insert_students(conn, [record for _, record in valid]) if valid else []
+        created_ids = []
+        for (row_number, record), (status, value) in zip(valid, outcomes):
+            if status == 'created':
+                created_ids.append(value)
+            else:
+                rejects.append((row_number, record, value))
+        conn.execute(
+            'UPDATE import_runs SET rows_committed = ?, created = created + ?, rejected = rejected + ?, '
+            'updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+            (rows_read, len(created_ids), len(rejects), import_id)
+        )
+        # Only a chunk that created rows invalidates the caches and counts
+        version = bump_students_version(conn) if created_ids else None
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    if created_ids:
+        after_write(created_ids, version)
+
+    # Reported only once the chunk is durable, so a resume never repeats them
+    for row_number, record, error in sorted(rejects, key=lambda r: r[0]):
+        on_reject(row_number, record, error)
+
+
+def import_students(stream, import_format='csv', chunk_size=DEFAULT_CHUNK_SIZE,
+                    import_id=None, source=None, on_reject=None):
+    """
+    Stream-import students from CSV or NDJSON, committing every `chunk_size` rows.
+    Memory is bounded by the chunk size, not by the size of the upload.
+    Args:
+        import_id (str): Resume this import: rows already committed are skipped.
+        on_reject (callable): on_reject(row_number, record, error) for every rejected row.
+    Returns:
+        dict: The import run (id, status, rows_committed, created, rejected) plus `resumed_from`.
+    """
+    on_reject = on_reject or (lambda row_number, record, error: None)
+    conn = get_db_connection()
+    try:
+        resumed_from = 0
+        run = conn.execute('SELECT * FROM import_runs WHERE id = ?', (import_id,)).fetchone() if import_id else None
+        if run:
+            if run['status'] == 'completed':
+                return dict(run, resumed_from=run['rows_committed'])
+            resumed_from = run['rows_committed']
+            conn.execute("UPDATE import_runs SET status = 'running' WHERE id = ?", (import_id,))
+        else:
+            import_id = import_id or uuid.uuid4().hex
+            conn.execute('INSERT INTO import_runs (id, source, format) VALUES (?, ?, ?)',
+                         (import_id, source, import_format))
+        conn.commit()
+
+        chunk = []
+        rows_read = resumed_from
+        try:
+            for row_number, record, error in iter_source_rows(stream, import_format):
+                if row_number <= resumed_from:
+                    continue  # Committed by a previous attempt
+                rows_read = row_number
+                chunk.append((row_number, record, error))
+                if len(chunk) >= chunk_size:
+                    _commit_chunk(conn, import_id, chunk, rows_read, on_reject)
+                    chunk = []
+            _commit_chunk(conn, import_id, chunk, rows_read, on_reject)
+        except Exception:
+            conn.execute("UPDATE import_runs SET status = 'interrupted', updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                         (import_id,))
+            conn.commit()
+            raise
+
+        conn.execute("UPDATE import_runs SET status = 'completed', updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                     (import_id,))
+        conn.commit()
+        run = conn.execute('SELECT * FROM import_runs WHERE id = ?', (import_id,)).fetchone()
+        return dict(run, resumed_from=resumed_from)
+    finally:
+        conn.close()
@@ -0,0 +1,560 @@
+import atexit
+import io
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.database.db_config import get_db_connection, get_pool, resolve_db_path
+from app.database.migrations import get_schema_version
+from app.controllers.changes_controller import compact_changes, DEFAULT_RETENTION_DAYS
+from app.controllers.import_controller import (
+    import_students, IMPORT_FORMATS, DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE, MAX_REPORTED_REJECTS
+)
+from app.controllers.stats_controller import recompute_stats
+from app.controllers.student_controller import iter_student_batches, rebuild_search_index
+from app.controllers.student_filters import build_id_match
+from app.utils.exporters import EXPORT_FORMATS, export_chunks
+
+logger = logging.getLogger(__name__)
+
+# Background jobs (POST /api/jobs): heavy operations run on a small thread
+# pool, or in separate processes for CPU-bound ones, instead of a request worker.
+# The jobs table (migration 10) is the only shared state: the job updates its
+# progress there and reads cancel_requested back in the same statement, so
+# polling and cancelling work from any worker process, and the status survives
+# a restart. Jobs whose owning process died are marked 'interrupted' when the
+# next runner starts; an interrupted import can be resubmitted with its import_id.
+JOB_STATUSES = ('queued', 'running', 'completed', 'failed', 'cancelled', 'interrupted')
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled', 'interrupted')
+DEFAULT_THREADS = 2
+DEFAULT_PROCESSES = 1
+DEFAULT_LIST_LIMIT = 20
+MAX_LIST_LIMIT = 200
+# Migration that creates the jobs table
+JOBS_SCHEMA_VERSION = 10
+# Seconds between two progress writes (each one is also the cancellation check)
+PROGRESS_INTERVAL = 0.5
+# Process jobs run as `python manage.py run-job <id>`: a fresh interpreter, so
+# it neither inherits this process's threads and connections (fork) nor
+# re-imports the server's __main__ (multiprocessing spawn runs run.py again)
+MANAGE_PY = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'manage.py')
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested; `result` is kept on the job."""
+
+    def __init__(self, result=None):
+        super().__init__("Job cancelled")
+        self.result = result
+
+
+class JobContext:
+    """Handed to every job: progress reporting and cooperative cancellation."""
+
+    def __init__(self, job_id, conn):
+        self.job_id = job_id
+        self._conn = conn
+        self._reported_at = 0.0
+
+    def report(self, progress=None, message=None, force=False):
+        """
+        Record progress (0..1) and/or a status message, at most every PROGRESS_INTERVAL.
+        Raises: JobCancelled if someone asked to cancel the job.
+        """
+        now = time.monotonic()
+        if not force and now - self._reported_at < PROGRESS_INTERVAL:
+            return
+        self._reported_at = now
+        rows = self._conn.execute(
+            'UPDATE jobs SET progress = COALESCE(?, progress), message = COALESCE(?, message), '
+            'updated_at = CURRENT_TIMESTAMP WHERE id = ? RETURNING cancel_requested',
+            (None if progress is None else round(min(max(progress, 0.0), 1.0), 4), message, self.job_id)
+        ).fetchall()
+        self._conn.commit()
+        if rows and rows[0][0]:
+            raise JobCancelled()
+
+
+class _ProgressReader(io.RawIOBase):
+    """Binary file wrapper calling on_read(bytes read so far) after every read."""
+
+    def __init__(self, raw, on_read):
+        self._raw = raw
+        self._on_read = on_read
+        self._done = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self._raw.readinto(buffer)
+        self._done += n or 0
+        self._on_read(self._done)
+        return n
+
+
+# --- Job types ------------------------------------------------------------
+# Each type: (executor, run(ctx, params) -> result dict, parse(params) -> params).
+# parse() type-checks what the client sent and raises ValueError with a
+# user-facing message. Keys starting with "_" are set by the runner only.
+
+def _import_params(params):
+    import_format = params.get('format') or 'csv'
+    if import_format not in IMPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(IMPORT_FORMATS)}")
+    try:
+        chunk_size = int(params.get('chunk_size') or DEFAULT_CHUNK_SIZE)
+    except (TypeError, ValueError):
+        chunk_size = 0
+    if not 1 <= chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError(f"chunk_size must be between 1 and {MAX_CHUNK_SIZE}")
+    # A client-chosen id resumes that import; otherwise we pick it now so a
+    # cancelled job can say which import to resume
+    return {"format": import_format, "chunk_size": chunk_size,
+            "import_id": params.get('import_id') or uuid.uuid4().hex}
+
+
+def _run_import(ctx, params):
+    path = params['_upload']
+    size = os.path.getsize(path) or 1
+    rejected_rows = []
+
+    def on_reject(row_number, record, error):
+        if len(rejected_rows) < MAX_REPORTED_REJECTS:
+            rejected_rows.append({"row": row_number, "error": error, "record": record})
+
+    try:
+        with open(path, 'rb') as raw:
+            stream = io.BufferedReader(_ProgressReader(raw, lambda done: ctx.report(done / size)))
+            result = import_students(stream, params['format'], params['chunk_size'], import_id=params['import_id'],
+                                     source=params.get('_source'), on_reject=on_reject)
+    except JobCancelled:
+        # Committed chunks stay; resubmitting the file with this import_id continues after them
+        raise JobCancelled({"import_id": params['import_id'], "rejected_rows": rejected_rows})
+    finally:
+        os.remove(path)
+    result["rejected_rows"] = rejected_rows
+    return result
+
+
+def _export_params(params):
+    export_format = params.get('format') or 'ndjson'
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    is_active = str(params.get('is_active', 'true')).lower()
+    if is_active not in ('true', 'false', 'all'):
+        raise ValueError("is_active must be one of: true, false, all")
+    return {"format": export_format, "is_active": is_active}
+
+
+def _run_export(ctx, params):
+    conn = get_pool().acquire()
+    try:
+        if params['is_active'] == 'all':
+            total = conn.execute('SELECT COUNT(*) FROM students').fetchone()[0]
+        else:
+            status = 0 if params['is_active'] == 'false' else 1
+            total = conn.execute('SELECT COUNT(*) FROM students WHERE is_active = ?', (status,)).fetchone()[0]
+    finally:
+        conn.close()
+
+    written = 0
+
+    def counted(batches):
+        nonlocal written
+        for columns, rows in batches:
+            yield columns, rows
+            written += len(rows)
+            ctx.report(written / total if total else None, f"{written} of {total} rows")
+
+    path = params['_file']
+    partial = path + '.part'
+    chunks = export_chunks(counted(iter_student_batches(params['is_active'])), params['format'])
+    try:
+        with open(partial, 'w', encoding='utf-8', newline='') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(partial, path)
+    finally:
+        chunks.close()  # Hands the export connection back even when cancelled
+        if os.path.exists(partial):
+            os.remove(partial)
+    return {"rows": written, "bytes": os.path.getsize(path), "format": params['format']}
+
+
+def _run_recompute_stats(ctx, params):
+    conn = get_pool().acquire()
+    try:
+        return {"groups": recompute_stats(conn)}
+    finally:
+        conn.close()
+
+
+def _run_rebuild_search(ctx, params):
+    conn = get_pool().acquire()
+    try:
+        rebuild_search_index(conn)
+        return {}
+    finally:
+        conn.close()
+
+
+def _run_vacuum(ctx, params):
+    path = resolve_db_path()
+    conn = get_pool().acquire()
+    try:
+        before = os.path.getsize(path)
+        conn.execute('VACUUM')
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        return {"bytes_before": before, "bytes_after": os.path.getsize(path)}
+    finally:
+        conn.close()
+
+
+def _compact_params(params):
+    try:
+        retention_days = int(params.get('retention_days', DEFAULT_RETENTION_DAYS))
+    except (TypeError, ValueError):
+        retention_days = -1
+    if retention_days < 0:
+        raise ValueError("retention_days must be a non-negative integer")
+    return {"retention_days": retention_days}
+
+
+def _run_compact_changes(ctx, params):
+    conn = get_pool().acquire()
+    try:
+        return compact_changes(conn, params['retention_days'])
+    finally:
+        conn.close()
+
+
+def _no_params(params):
+    return {}
+
+
+# Export serialization is pure Python (CSV/JSON encoding): it gets its own
+# process so it does not compete with request threads for the GIL. The rest
+# spend their time inside SQLite, which releases the GIL.
+JOB_TYPES = {
+    'import': ('thread', _run_import, _import_params),
+    'export': ('process', _run_export, _export_params),
+    'recompute_stats': ('thread', _run_recompute_stats, _no_params),
+    'rebuild_search': ('thread', _run_rebuild_search, _no_params),
+    'vacuum': ('thread', _run_vacuum, _no_params),
+    'compact_changes': ('thread', _run_compact_changes, _compact_params),
+}
+
+
+def run_job(job_id, job_type, params):
+    """
+    Run one queued job and record the outcome. Executes in a pool thread or in
+    a child process (module-level so it can be pickled).
+    """
+    conn = get_pool().acquire()
+    try:
+        started = conn.execute(
+            "UPDATE jobs SET status = 'running', started_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP "
+            "WHERE id = ? AND status = 'queued' AND cancel_requested = 0 RETURNING id", (job_id,)
+        ).fetchall()
+        if not started:
+            # Cancelled before it started (possibly from another worker)
+            if params.get('_upload') and os.path.exists(params['_upload']):
+                os.remove(params['_upload'])
+            conn.execute("UPDATE jobs SET status = 'cancelled', finished_at = CURRENT_TIMESTAMP, "
+                         "updated_at = CURRENT_TIMESTAMP WHERE id = ? AND status = 'queued'", (job_id,))
+            conn.commit()
+            return
+        conn.commit()
+
+        result, error = None, None
+        try:
+            result = JOB_TYPES[job_type][1](JobContext(job_id, conn), params)
+            status = 'completed'
+        except JobCancelled as e:
+            status, result = 'cancelled', e.result
+        except Exception as e:
+            status, error = 'failed', f"{type(e).__name__}: {e}"
+        if conn.in_transaction:
+            conn.rollback()
+        conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, "
+            "progress = CASE WHEN ? = 'completed' THEN 1 ELSE progress END, "
+            "finished_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (status, None if result is None else json.dumps(result), error, status, job_id)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def run_job_by_id(job_id):
+    """Entry point of a job process: load the job row and run it. Returns: False if there is no such job."""
+    conn = get_pool().acquire()
+    try:
+        row = conn.execute('SELECT type, params FROM jobs WHERE id = ?', (job_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return False
+    run_job(job_id, row['type'], json.loads(row['params']) if row['params'] else {})
+    return True
+
+
+def _run_in_process(job_id):
+    """Run a job in its own interpreter and wait for it (called from a process slot thread)."""
+    completed = subprocess.run([sys.executable, MANAGE_PY, 'run-job', job_id],
+                               env=dict(os.environ, STUDENTS_DB=resolve_db_path()),
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        detail = completed.stderr.strip().splitlines()[-1:] or [f"exit status {completed.returncode}"]
+        raise RuntimeError(f"Job process failed: {detail[0]}")
+
+
+# --- Records --------------------------------------------------------------
+
+def _job_dict(row):
+    job = dict(row)
+    params = json.loads(job['params']) if job['params'] else {}
+    job['params'] = {key: value for key, value in params.items() if not key.startswith('_')}
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    job['cancel_requested'] = bool(job['cancel_requested'])
+    job.pop('worker', None)
+    return job
+
+
+def get_job(job_id):
+    """Return the job record (params and result decoded), or None."""
+    conn = get_db_connection()
+    try:
+        row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return _job_dict(row) if row else None
+    finally:
+        conn.close()
+
+
+def list_jobs(status=None, limit=DEFAULT_LIST_LIMIT):
+    """Most recent jobs first, optionally only those in `status`."""
+    conn = get_db_connection()
+    try:
+        if status:
+            rows = conn.execute('SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?',
+                                (status, limit)).fetchall()
+        else:
+            rows = conn.execute('SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?', (limit,)).fetchall()
+        return [_job_dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def export_file(job_id):
+    """Path of a finished export job's file, or None."""
+    conn = get_db_connection()
+    try:
+        row = conn.execute("SELECT params FROM jobs WHERE id = ? AND type = 'export' AND status = 'completed'",
+                           (job_id,)).fetchone()
+    finally:
+        conn.close()
+    path = json.loads(row['params']).get('_file') if row else None
+    return path if path and os.path.exists(path) else None
+
+
+class JobRunner:
+    """
+    Owns the executors of this process. Every job row records the process
+    that owns it ("<host>:<pid>:<token>"), so a restarted runner can tell its
+    predecessors' unfinished jobs from those of live sibling workers.
+    """
+
+    def __init__(self):
+        self.threads = DEFAULT_THREADS
+        self.processes = DEFAULT_PROCESSES
+        self.jobs_dir = None
+        self.worker = None
+        self._thread_pool = None
+        self._process_pool = None
+        self._futures = {}
+        self._lock = threading.Lock()
+        atexit.register(self.stop)
+
+    @property
+    def running(self):
+        return self._thread_pool is not None
+
+    def configure(self, enabled, threads=DEFAULT_THREADS, processes=DEFAULT_PROCESSES, jobs_dir=None):
+        """(Re)start the executors with new settings, or stop them. Called by create_app()."""
+        self.stop()
+        self.threads = max(1, threads)
+        self.processes = max(1, processes)
+        self.jobs_dir = jobs_dir or os.path.join(os.path.dirname(os.path.abspath(resolve_db_path())), 'jobs')
+        if not enabled:
+            return
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self.worker = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        with self._lock:
+            self._thread_pool = ThreadPoolExecutor(self.threads, thread_name_prefix='job')
+        try:
+            self.recover()
+        except Exception:
+            logger.exception("Could not check for interrupted jobs")
+
+    def stop(self):
+        """Stop taking jobs. Running ones are abandoned; the next runner marks them interrupted."""
+        with self._lock:
+            pools = (self._thread_pool, self._process_pool)
+            self._thread_pool = self._process_pool = None
+            self._futures.clear()
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def _is_gone(self, worker):
+        """True if the process that owned a job no longer exists."""
+        host, _, rest = (worker or '').partition(':')
+        pid, _, token = rest.partition(':')
+        if host != socket.gethostname() or not pid.isdigit():
+            return False  # Another machine (or an old row): cannot tell
+        if int(pid) == os.getpid():
+            return token != self.worker.rsplit(':', 1)[1]  # Same pid, earlier run (e.g. PID 1 in a container)
+        if os.name == 'nt':
+            return False  # os.kill(pid, 0) would signal the process on Windows
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False
+        return False
+
+    def recover(self):
+        """Mark queued/running jobs of dead processes as interrupted. Returns: their ids."""
+        conn = get_pool().acquire()
+        try:
+            if get_schema_version(conn) < JOBS_SCHEMA_VERSION:
+                return []  # Not migrated yet (AUTO_MIGRATE=false): no job can be left over
+            rows = conn.execute("SELECT id, worker FROM jobs WHERE status IN ('queued', 'running')").fetchall()
+            stale = [row['id'] for row in rows if self._is_gone(row['worker'])]
+            if stale:
+                clause, params = build_id_match(stale)
+                conn.execute(
+                    "UPDATE jobs SET status = 'interrupted', error = 'The worker stopped before the job finished', "
+                    f"finished_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP WHERE {clause}", params
+                )
+                conn.commit()
+            return stale
+        finally:
+            conn.close()
+
+    def _executor(self, kind):
+        with self._lock:
+            if self._thread_pool is None:
+                raise RuntimeError("Background jobs are disabled (JOBS_ENABLED=false)")
+            if kind == 'thread':
+                return self._thread_pool
+            if self._process_pool is None:
+                # One thread per process slot: it starts the job process and waits for it
+                self._process_pool = ThreadPoolExecutor(self.processes, thread_name_prefix='job-process')
+            return self._process_pool
+
+    def submit(self, job_type, params, upload=None):
+        """
+        Record a job and queue it.
+        Args:
+            params (dict): Client parameters (strings are fine, they are parsed here).
+            upload: werkzeug FileStorage for an import.
+        Returns: the job record (status 'queued').
+        Raises: ValueError on an unknown type or bad parameters; RuntimeError when disabled.
+        """
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"type must be one of: {', '.join(JOB_TYPES)}")
+        kind, _, parse = JOB_TYPES[job_type]
+        params = parse(params or {})
+        executor = self._executor(kind)
+
+        job_id = uuid.uuid4().hex
+        if job_type == 'import':
+            if upload is None:
+                raise ValueError('An import job needs the file as multipart field "file"')
+            params['_upload'] = os.path.join(self.jobs_dir, f"{job_id}.upload")
+            params['_source'] = upload.filename
+            upload.save(params['_upload'])
+        elif job_type == 'export':
+            params['_file'] = os.path.join(self.jobs_dir, f"{job_id}.{params['format']}")
+
+        conn = get_db_connection()
+        try:
+            conn.execute('INSERT INTO jobs (id, type, params, worker) VALUES (?, ?, ?, ?)',
+                         (job_id, job_type, json.dumps(params), self.worker))
+            conn.commit()
+        finally:
+            conn.close()
+
+        if kind == 'process':
+            future = executor.submit(_run_in_process, job_id)
+        else:
+            future = executor.submit(run_job, job_id, job_type, params)
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda f: self._finished(job_id, f))
+        return get_job(job_id)
+
+    def _finished(self, job_id, future):
+        with self._lock:
+            self._futures.pop(job_id, None)
+        if future.cancelled() or future.exception() is None:
+            return
+        # run_job itself failed (e.g. the job process crashed): don't leave the job "running"
+        conn = get_pool().acquire()
+        try:
+            conn.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = CURRENT_TIMESTAMP, "
+                         "updated_at = CURRENT_TIMESTAMP WHERE id = ? AND status IN ('queued', 'running')",
+                         (f"{type(future.exception()).__name__}: {future.exception()}", job_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def cancel(self, job_id):
+        """
+        Ask a job to stop. A queued job is cancelled at once; a running one
+        stops at its next progress report.
+        Returns: the job record, or None if there is no such job.
+        """
+        conn = get_db_connection()
+        try:
+            requested = conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = CURRENT_TIMESTAMP "
+                "WHERE id = ? AND status IN ('queued', 'running') RETURNING id", (job_id,)
+            ).fetchall()
+            conn.commit()
+            with self._lock:
+                future = self._futures.get(job_id)
+            if requested and future is not None and future.cancel():
+                conn.execute("UPDATE jobs SET status = 'cancelled', finished_at = CURRENT_TIMESTAMP, "
+                             "updated_at = CURRENT_TIMESTAMP WHERE id = ? AND status = 'queued'", (job_id,))
+                conn.commit()
+                upload = os.path.join(self.jobs_dir, f"{job_id}.upload")
+                if os.path.exists(upload):
+                    os.remove(upload)
+        finally:
+            conn.close()
+        return get_job(job_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.running,
+                "threads": self.threads,
+                "processes": self.processes,
+                "process_pool_started": self._process_pool is not None,
+                "in_flight": len(self._futures),
+            }
+
+
+job_runner = JobRunner()
@@ -0,0 +1,110 @@
+import sqlite3
+from app.database.db_config import get_db_connection
+from app.database.migrations import STATS_RECOMPUTE_SQL
+
+# Relative tolerance when comparing running GPA sums with a fresh recompute
+SUM_TOLERANCE = 1e-6
+
+
+def _gpa_summary(row):
+    """Shape count/sum/min/max columns into the public GPA block."""
+    return {
+        "count": row['gpa_count'],
+        "mean": round(row['gpa_sum'] / row['gpa_count'], 3) if row['gpa_count'] else None,
+        "min": row['gpa_min'],
+        "max": row['gpa_max'],
+    }
+
+
+def get_student_stats(is_active=True):
+    """
+    Dashboard statistics read from the student_stats summary table (O(groups)).
+    Returns: dict with overall totals, GPA per major, and semester and
+    enrollment-year histograms.
+    """
+    status_filter = 0 if str(is_active).lower() == 'false' else 1
+    conn = get_db_connection()
+    try:
+        aggregate = '''
+            SUM(student_count) AS student_count, SUM(gpa_count) AS gpa_count,
+            SUM(gpa_sum) AS gpa_sum, MIN(gpa_min) AS gpa_min, MAX(gpa_max) AS gpa_max
+        '''
+        overall = conn.execute(f'SELECT {aggregate} FROM student_stats WHERE is_active = ?', (status_filter,)).fetchone()
+        by_major = conn.execute(
+            f'SELECT major, {aggregate} FROM student_stats WHERE is_active = ? GROUP BY major ORDER BY major',
+            (status_filter,)
+        ).fetchall()
+        by_semester = conn.execute(
+            'SELECT semester, SUM(student_count) AS student_count FROM student_stats '
+            'WHERE is_active = ? GROUP BY semester ORDER BY semester', (status_filter,)
+        ).fetchall()
+        by_year = conn.execute(
+            'SELECT enrollment_year, SUM(student_count) AS student_count FROM student_stats '
+            'WHERE is_active = ? GROUP BY enrollment_year ORDER BY enrollment_year', (status_filter,)
+        ).fetchall()
+
+        return {
+            "total": overall['student_count'] or 0,
+            "gpa": _gpa_summary(overall) if overall['student_count'] else None,
+            "by_major": [
+                {"major": row['major'], "count": row['student_count'], "gpa": _gpa_summary(row)}
+                for row in by_major
+            ],
+            "by_semester": {str(row['semester']): row['student_count'] for row in by_semester},
+            "by_enrollment_year": {row['enrollment_year']: row['student_count'] for row in by_year},
+        }
+    finally:
+        conn.close()
+
+
+def verify_stats(conn):
+    """
+    Compare student_stats with a full recompute from the students table.
+    Returns: list of drifted groups [{"group": (...), "stored": {...}, "expected": {...}}]
+    """
+    key = 'is_active, major, semester, enrollment_year'
+    stored = {tuple(row[:4]): tuple(row[4:]) for row in conn.execute(
+        f'SELECT {key}, student_count, gpa_count, gpa_sum, gpa_min, gpa_max FROM student_stats'
+    )}
+    expected = {tuple(row[:4]): tuple(row[4:]) for row in conn.execute('''
+        SELECT is_active, major, semester, substr(enrollment_date, 1, 4),
+               COUNT(*), COUNT(gpa), COALESCE(SUM(gpa), 0), MIN(gpa), MAX(gpa)
+        FROM students
+        GROUP BY is_active, major, semester, substr(enrollment_date, 1, 4)
+    ''')}
+
+    fields = ('student_count', 'gpa_count', 'gpa_sum', 'gpa_min', 'gpa_max')
+    drift = []
+    for group in sorted(set(stored) | set(expected), key=repr):
+        have, want = stored.get(group), expected.get(group)
+        if have and want and _same(have, want):
+            continue
+        drift.append({
+            "group": dict(zip(('is_active', 'major', 'semester', 'enrollment_year'), group)),
+            "stored": dict(zip(fields, have)) if have else None,
+            "expected": dict(zip(fields, want)) if want else None,
+        })
+    return drift
+
+
+def _same(have, want):
+    for a, b in zip(have, want):
+        if isinstance(a, float) or isinstance(b, float):
+            if a is None or b is None or abs(a - b) > SUM_TOLERANCE * max(1.0, abs(b)):
+                return False
+        elif a != b:
+            return False
+    return True
+
+
+def recompute_stats(conn):
+    """Rebuild student_stats from scratch in one transaction. Returns: number of groups."""
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute('DELETE FROM student_stats')
+        conn.execute(STATS_RECOMPUTE_SQL)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return conn.execute('SELECT COUNT(*) FROM student_stats').fetchone()[0]
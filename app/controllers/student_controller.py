@@ -1,14 +1,155 @@
+import json
+import logging
+import re
 import sqlite3
-from app.database.db_config import get_db_connection
+import threading
+import time
+from app.database.db_config import get_db_connection, get_pool
+from app.database.write_queue import GroupCommitWriter
+from app.controllers.student_replica import student_replica
+from app.controllers.student_filters import (
+    build_where, build_id_match, parse_sort, order_by, encode_cursor, decode_cursor, seek_clauses,
+    parse_fields, select_columns, shape_rows
+)
+from app.utils.cache import LRUCache, MISSING
+from app.utils.metrics import metrics
+from app.utils.validators import validate_students, format_errors
 
-def get_all_students(page=1, per_page=10, is_active=True):
+logger = logging.getLogger(__name__)
+
+# Cached COUNT(*) per (is_active, filters): {key: (count, max_id, stored_at, version)}.
+# An entry is only reused while the students change counter is unchanged;
+# the TTL is a safety net for writers that bypass this controller.
+COUNT_CACHE_TTL = 30.0
+COUNT_MODES = ('exact', 'cached', 'estimate', 'none')
+MAX_CACHED_COUNTS = 256
+# Largest page the list endpoint serves (per_page is checked by the route)
+MAX_PER_PAGE = 1000
+_count_cache = {}
+_count_lock = threading.Lock()
+
+# Read-through cache for get_student_by_id (a cached None is a 404)
+student_cache = LRUCache(max_size=10000, ttl=60.0)
+
+
+def get_students_version(conn):
+    """Current value of the students change counter (table_versions)."""
+    return conn.execute("SELECT version FROM table_versions WHERE name = 'students'").fetchone()[0]
+
+
+def bump_students_version(conn):
+    """
+    Bump the students change counter inside the caller's write transaction.
+    Every write path must call it before committing: other workers compare
+    it to drop their caches. Returns: int -> the new version.
+    """
+    sql = "UPDATE table_versions SET version = version + 1 WHERE name = 'students' RETURNING version"
+    return conn.execute(sql).fetchall()[0][0]
+
+
+def after_write(student_ids, version):
+    """Post-commit hook: drop cached rows for `student_ids` and the cached totals."""
+    student_cache.invalidate(student_ids, version)
+    invalidate_counts()
+
+
+# Opt-in group commit for the single-row writes (create, update, delete, restore)
+group_writer = GroupCommitWriter(bump_students_version, after_write)
+
+
+def run_write(op, *args):
+    """
+    Run a single-row write op(conn, *args) -> (result, written_ids) in its own
+    transaction, or through group_writer (shared transactions) when it is on.
+    Returns: the op's result; nothing is committed when written_ids is empty.
+    """
+    if group_writer.running:
+        return group_writer.submit(op, *args)
+    conn = get_db_connection()
+    try:
+        result, written_ids = op(conn, *args)
+        if written_ids:
+            version = bump_students_version(conn)
+            conn.commit()
+            after_write(list(written_ids), version)
+        else:
+            conn.rollback()
+        return result
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def invalidate_counts():
+    """Forget cached totals (called after every write)."""
+    with _count_lock:
+        _count_cache.clear()
+
+
+def _count_students(conn, status_filter, filters, count_mode, version=None):
+    """
+    Total for the list endpoint according to `count_mode`:
+      exact    -> always run COUNT(*)
+      cached   -> COUNT(*) once, then reuse until a write or the TTL expires
+      estimate -> scale the last known count by id growth (no table scan)
+      none     -> skip the total entirely
+    `version` is the students change counter when the caller already read it.
+    Returns: (total or None, is_estimate)
+    """
+    if count_mode == 'none':
+        return None, False
+
+    key = (status_filter, tuple(sorted(filters.items())))
+    now = time.monotonic()
+    if version is None:
+        version = get_students_version(conn)
+    with _count_lock:
+        cached = _count_cache.get(key)
+
+    if cached and count_mode == 'cached' and cached[3] == version and now - cached[2] < COUNT_CACHE_TTL:
+        return cached[0], False
+
+    if cached and count_mode == 'estimate':
+        # MAX(id) is a single b-tree seek on the rowid
+        max_id = conn.execute('SELECT MAX(id) FROM students').fetchone()[0] or 0
+        if cached[1]:
+            return int(round(cached[0] * max_id / cached[1])), True
+        return cached[0], True
+
+    clauses, params = build_where(status_filter, filters)
+    max_id = conn.execute('SELECT MAX(id) FROM students').fetchone()[0] or 0
+    total_count = conn.execute(f"SELECT COUNT(*) FROM students WHERE {' AND '.join(clauses)}", params).fetchone()[0]
+    with _count_lock:
+        if len(_count_cache) >= MAX_CACHED_COUNTS:
+            _count_cache.clear()
+        _count_cache[key] = (total_count, max_id, now, version)
+    return total_count, False
+
+
+def get_all_students(page=1, per_page=10, is_active=True, cursor=None, count_mode='cached',
+                     filters=None, sort=None, fields=None, columnar=False, version=None):
     """
     Retrieve students with pagination and active status filter.
     Args:
         is_active (bool/str): Filter by active status (True/False or 'true'/'false').
+        cursor (str): None for OFFSET pages; a `next_cursor` token (or '' for the
+            first page) switches to keyset pagination, which costs the same on any page.
+        count_mode (str): One of COUNT_MODES, see _count_students().
+        filters (dict): Typed filters from student_filters.parse_filters().
+        sort (str): e.g. "gpa,-enrollment_date" (see SORTABLE_COLUMNS).
+        fields (str): Sparse fieldset, e.g. "id,first_name,gpa" (default: every column).
+        columnar (bool): Return "columns" + "rows" (value arrays) instead of "students".
+        version (int): Students change counter already read by the caller (e.g. for
+            the ETag), so it is not read a second time.
+    Raises: ValueError on an invalid cursor, sort or field.
     """
+    filters = filters or {}
+    sort_keys = parse_sort(sort)
+    fields = parse_fields(fields)
+    selected = select_columns(fields, sort_keys)
     conn = get_db_connection()
-    offset = (page - 1) * per_page
     
     # Convert string 'true'/'false' to boolean 1/0 for SQLite
     if str(is_active).lower() == 'false':
@@ -17,23 +158,70 @@ def get_all_students(page=1, per_page=10, is_active=True):
         status_filter = 1
         
     try:
-        # Filter dynamically based on user requests.
-        count_sql = 'SELECT COUNT(*) FROM students WHERE is_active = ?'
-        total_count = conn.execute(count_sql, (status_filter,)).fetchone()[0]
-        
-        sql = 'SELECT * FROM students WHERE is_active = ? LIMIT ? OFFSET ?'
-        students = conn.execute(sql, (status_filter, per_page, offset)).fetchall()
-        
-        return {
-            "students": [dict(row) for row in students],
-            "total": total_count,
-            "page": page,
-            "per_page": per_page,
-            "total_pages": (total_count + per_page - 1) // per_page
-        }
+        if student_replica.enabled and student_replica.serves(sort_keys):
+            return student_replica.list(conn, status_filter, page, per_page, cursor, count_mode, filters, sort_keys,
+                                        fields, columnar, version)
+
+        total_count, is_estimate = _count_students(conn, status_filter, filters, count_mode, version)
+        clauses, params = build_where(status_filter, filters)
+        select = f"SELECT {', '.join(selected) if selected else '*'} FROM students"
+
+        if cursor is not None:
+            # Keyset pagination: seek past the last row instead of skipping rows.
+            values = decode_cursor(cursor, sort_keys)
+            if values is not None:
+                seek, seek_params = seek_clauses(sort_keys, values)
+                clauses += seek
+                params += seek_params
+            sql = f"{select} WHERE {' AND '.join(clauses)} ORDER BY {order_by(sort_keys)} LIMIT ?"
+            query = conn.execute(sql, params + [per_page + 1])
+            query.row_factory = None  # Plain tuples: shape_rows() needs no sqlite3.Row
+            columns = [col[0] for col in query.description]
+            rows = query.fetchall()
+            has_more = len(rows) > per_page
+            rows = rows[:per_page]
+            next_cursor = None
+            if has_more:
+                last = rows[-1]
+                next_cursor = encode_cursor([last[columns.index(column)] for column, _ in sort_keys], sort_keys)
+            result = shape_rows(columns, rows, fields, columnar)
+            result.update(per_page=per_page, next_cursor=next_cursor)
+        else:
+            offset = (page - 1) * per_page
+            sql = f"{select} WHERE {' AND '.join(clauses)} ORDER BY {order_by(sort_keys)} LIMIT ? OFFSET ?"
+            query = conn.execute(sql, params + [per_page, offset])
+            query.row_factory = None
+            columns = [col[0] for col in query.description]
+            result = shape_rows(columns, query.fetchall(), fields, columnar)
+            result.update(page=page, per_page=per_page)
+            if total_count is not None:
+                result["total_pages"] = (total_count + per_page - 1) // per_page
+
+        if total_count is not None:
+            result["total"] = total_count
+            if is_estimate:
+                result["total_is_estimate"] = True
+        return result
     finally:
         conn.close()
 
+def _insert_student(conn, student_data):
+    sql = '''
+        INSERT INTO students (first_name, last_name, email, major, semester, gpa, enrollment_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+    cursor = conn.execute(sql, (
+        student_data['first_name'],
+        student_data['last_name'],
+        student_data['email'],
+        student_data['major'],
+        student_data['semester'],
+        student_data.get('gpa'),
+        student_data['enrollment_date']
+    ))
+    return cursor.lastrowid, (cursor.lastrowid,)
+
+
 def create_student(student_data):
     """
     Create a new student in the database.
@@ -42,121 +230,457 @@ def create_student(student_data):
     Returns:
         int: The ID of the new student, or None if error.
     """
-    conn = get_db_connection()
     try:
-        sql = '''
-            INSERT INTO students (first_name, last_name, email, major, semester, gpa, enrollment_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        '''
-        cursor = conn.execute(sql, (
-            student_data['first_name'],
-            student_data['last_name'],
-            student_data['email'],
-            student_data['major'],
-            student_data['semester'],
-            student_data['gpa'],
-            student_data['enrollment_date']
-        ))
-        conn.commit()
-        new_id = cursor.lastrowid
-        return new_id
+        return run_write(_insert_student, student_data)
     except sqlite3.IntegrityError as e:
         # This usually happens if email is not unique
-        print(f"Integrity Error: {e}")
+        logger.info("Student not created, integrity error: %s", e)
+        metrics.count_error('integrity')
         return None
     except sqlite3.Error as e:
-        print(f"Database Error: {e}")
+        logger.error("Student not created, database error: %s", e)
+        metrics.count_error('database')
         return None
+
+# Columns written on insert, in INSERT_SQL order
+INSERT_COLUMNS = ('first_name', 'last_name', 'email', 'major', 'semester', 'gpa', 'enrollment_date')
+INSERT_SQL = f"INSERT INTO students ({', '.join(INSERT_COLUMNS)}) VALUES ({', '.join('?' * len(INSERT_COLUMNS))})"
+
+BULK_MODES = ('atomic', 'best_effort')
+MAX_BULK_RECORDS = 50000
+
+
+def _existing_emails(conn, emails, chunk_size=500):
+    """Return the subset of `emails` already stored (chunked to stay under SQLite's variable limit)."""
+    found = set()
+    emails = list(emails)
+    for start in range(0, len(emails), chunk_size):
+        chunk = emails[start:start + chunk_size]
+        placeholders = ', '.join('?' * len(chunk))
+        rows = conn.execute(f'SELECT email FROM students WHERE email IN ({placeholders})', chunk).fetchall()
+        found.update(row[0] for row in rows)
+    return found
+
+
+def insert_students(conn, records):
+    """
+    Insert already-validated records inside the caller's open transaction
+    (the caller must hold the write lock, e.g. after BEGIN IMMEDIATE).
+    Duplicate emails (stored or repeated in the batch) are filtered out first,
+    the rest goes in with a single executemany.
+    Returns: list aligned with `records` of ('created', id) | ('duplicate', msg) | ('error', msg)
+    """
+    existing = _existing_emails(conn, {r['email'] for r in records})
+    seen = set()
+    results = [None] * len(records)
+    to_insert = []
+    for index, record in enumerate(records):
+        email = record['email']
+        if email in existing or email in seen:
+            results[index] = ('duplicate', f"Email already exists: {email}")
+            continue
+        seen.add(email)
+        to_insert.append(index)
+
+    # AUTOINCREMENT hands out seq+1, seq+2, ... while we hold the write lock
+    seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'students'").fetchone()
+    next_id = (seq[0] if seq else 0) + 1
+    rows = [tuple(records[i].get(col) for col in INSERT_COLUMNS) for i in to_insert]
+
+    conn.execute('SAVEPOINT bulk_insert')
+    try:
+        conn.executemany(INSERT_SQL, rows)
+        conn.execute('RELEASE bulk_insert')
+        for offset, index in enumerate(to_insert):
+            results[index] = ('created', next_id + offset)
+    except sqlite3.IntegrityError:
+        # Some row broke a constraint: redo them one by one to tell which
+        conn.execute('ROLLBACK TO bulk_insert')
+        conn.execute('RELEASE bulk_insert')
+        for index, row in zip(to_insert, rows):
+            try:
+                cursor = conn.execute(INSERT_SQL, row)
+                results[index] = ('created', cursor.lastrowid)
+            except sqlite3.IntegrityError as e:
+                results[index] = ('error', str(e))
+    return results
+
+
+def create_students_bulk(records, mode='atomic'):
+    """
+    Create many students in one transaction.
+    Args:
+        records (list): Student dicts, validated here in one pass.
+        mode (str): 'atomic' -> all or nothing; 'best_effort' -> insert every valid row.
+    Returns:
+        dict: {"created": n, "failed": n, "committed": bool, "results": [per row]}
+        where each result is {"index", "status": created|invalid|duplicate|error|skipped, "id"|"error"}.
+    """
+    results = []
+    valid = []
+    for index, (record, errors) in enumerate(zip(records, validate_students(records))):
+        if errors:
+            results.append({"index": index, "status": "invalid", "error": format_errors(errors), "errors": errors})
+            continue
+        results.append(None)
+        valid.append((index, record))
+
+    committed = False
+    if valid and (mode == 'best_effort' or len(valid) == len(records)):
+        conn = get_db_connection()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            outcomes = insert_students(conn, [record for _, record in valid])
+            failed = any(status != 'created' for status, _ in outcomes)
+            if mode == 'atomic' and failed:
+                conn.rollback()
+            else:
+                version = bump_students_version(conn)
+                conn.commit()
+                committed = True
+                after_write([value for status, value in outcomes if status == 'created'], version)
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        for (index, _), (status, value) in zip(valid, outcomes):
+            if status == 'created' and committed:
+                results[index] = {"index": index, "status": "created", "id": value}
+            elif status == 'created':
+                results[index] = {"index": index, "status": "skipped"}
+            else:
+                results[index] = {"index": index, "status": status, "error": value}
+
+    # Atomic batch rejected during validation: valid rows were not attempted
+    for index, record in valid:
+        if results[index] is None:
+            results[index] = {"index": index, "status": "skipped"}
+
+    created = sum(1 for r in results if r["status"] == "created")
+    return {
+        "mode": mode,
+        "committed": committed,
+        "created": created,
+        "failed": sum(1 for r in results if r["status"] not in ("created", "skipped")),
+        "results": results,
+    }
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def iter_student_batches(is_active='true', batch_size=EXPORT_BATCH_SIZE):
+    """
+    Stream the students table in id order, `batch_size` rows at a time.
+    Args:
+        is_active (str): 'true', 'false' or 'all'.
+    Yields: (column_names, rows) for each fetchmany() batch.
+    Uses its own pooled connection (not the request one): a streamed response
+    keeps iterating after the request context is gone.
+    """
+    status = str(is_active).lower()
+    if status == 'all':
+        sql, params = 'SELECT * FROM students ORDER BY id', ()
+    else:
+        sql, params = 'SELECT * FROM students WHERE is_active = ? ORDER BY id', (0 if status == 'false' else 1,)
+
+    conn = get_pool().acquire()
+    try:
+        cursor = conn.execute(sql, params)
+        columns = [col[0] for col in cursor.description]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield columns, rows
     finally:
         conn.close()
 
-def get_student_by_id(student_id):
+def student_etag(student):
     """
-    Retrieve a single student by ID (Only if active).
+    Strong validator for a student row: "<id>-<version>". The row version
+    changes on every write, so no hashing is needed and If-Match can read
+    the version straight back out of it (see http_cache.if_match_version).
+    """
+    return f"{student['id']}-{student['version']}"
+
+
+def get_student_entry(student_id):
+    """
+    Retrieve a single active student together with its ETag.
+    Served from the replica when it is on, else from student_cache when possible;
+    the change counter is checked on every call so a write from any worker is
+    never hidden by either.
+    Returns: (student dict, etag) or (None, None) if not found.
     """
     conn = get_db_connection()
     try:
-        
+        if student_replica.enabled:
+            student = student_replica.get(conn, student_id)
+            return (student, student_etag(student)) if student else (None, None)
+
+        version = get_students_version(conn)
+        student_cache.sync(version)
+        cached = student_cache.get(student_id)
+        if cached is not MISSING:
+            return cached
+
         sql = 'SELECT * FROM students WHERE id = ? AND is_active = 1'
         student = conn.execute(sql, (student_id,)).fetchone()
         
-        if student:
-            return dict(student)
-        return None
+        entry = (dict(student), None) if student else (None, None)
+        if entry[0]:
+            entry = (entry[0], student_etag(entry[0]))
+        student_cache.set(student_id, entry, version)
+        return entry
     finally:
         conn.close()
 
-def update_student(student_id, data):
+
+def get_student_by_id(student_id):
     """
-    Update student data (Dynamic SQL for both PUT and PATCH).
-    Returns: Updated student dict or None if not found.
+    Retrieve a single student by ID (Only if active).
     """
+    return get_student_entry(student_id)[0]
+
+
+def current_students_version():
+    """Read the students change counter (used to tag list responses)."""
     conn = get_db_connection()
     try:
-        # Check if student exists
-        student = conn.execute('SELECT * FROM students WHERE id = ?', (student_id,)).fetchone()
-        if not student:
-            conn.close()
-            return None
-
-        # Build dynamic query: "UPDATE students SET field1=?, field2=? WHERE id=?"
-        fields = []
-        values = []
-        for key, value in data.items():
-            # Only update valid columns and update 'updated_at' automatically
-            if key in ['first_name', 'last_name', 'email', 'major', 'semester', 'gpa', 'is_active']:
-                fields.append(f"{key} = ?")
-                values.append(value)
-        
-        fields.append("updated_at = CURRENT_TIMESTAMP")
-        
-        if not fields:
-            conn.close()
-            return dict(student) # Nothing to update
-
-        sql = f"UPDATE students SET {', '.join(fields)} WHERE id = ?"
-        values.append(student_id)
-        
-        conn.execute(sql, values)
-        conn.commit()
-        
-        # Return the updated student
-        updated_student = conn.execute('SELECT * FROM students WHERE id = ?', (student_id,)).fetchone()
-        return dict(updated_student)
+        return get_students_version(conn)
     finally:
         conn.close()
 
-def delete_student(student_id):
-    """Soft delete a student (set is_active = 0)."""
+# bm25 weights per indexed column: first_name, last_name, email, major
+SEARCH_WEIGHTS = (10.0, 10.0, 5.0, 1.0)
+MAX_SEARCH_LIMIT = 100
+_search_token = re.compile(r'\w+', re.UNICODE)
+
+
+def build_match_query(text):
+    """
+    Turn free text into an FTS5 MATCH expression: every word becomes a quoted
+    prefix term ("hern"*), and all of them must match.
+    Returns: str, or None if `text` has no searchable words.
+    """
+    tokens = _search_token.findall(text or '')
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search_students(text, limit=20, is_active=True):
+    """
+    Full-text search over first_name, last_name, email and major, best matches first.
+    Returns: list of student dicts (with a `score`, lower is better), or None if `text` is empty.
+    """
+    match = build_match_query(text)
+    if match is None:
+        return None
+    status_filter = 0 if str(is_active).lower() == 'false' else 1
+
     conn = get_db_connection()
     try:
-        # Check if exists first
-        student = conn.execute('SELECT id FROM students WHERE id = ?', (student_id,)).fetchone()
-        if not student:
-            return False
-            
-        conn.execute('UPDATE students SET is_active = 0 WHERE id = ?', (student_id,))
-        conn.commit()
-        return True
+        weights = ', '.join(str(w) for w in SEARCH_WEIGHTS)
+        sql = f'''
+            SELECT s.*, bm25(students_fts, {weights}) AS score
+            FROM students_fts
+            JOIN students s ON s.id = students_fts.rowid
+            WHERE students_fts MATCH ? AND s.is_active = ?
+            ORDER BY score
+            LIMIT ?
+        '''
+        rows = conn.execute(sql, (match, status_filter, min(limit, MAX_SEARCH_LIMIT))).fetchall()
+        return [dict(row) for row in rows]
     finally:
         conn.close()
 
 
-def restore_student(student_id):
-    """Restore a soft-deleted student (set is_active = 1)."""
+def rebuild_search_index(conn):
+    """Re-index every student from scratch (after bulk loads or on an old database)."""
+    conn.execute("INSERT INTO students_fts (students_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO students_fts (students_fts) VALUES ('optimize')")
+    conn.commit()
+
+
+class VersionConflict(Exception):
+    """The row exists but no longer has the version the caller expected (HTTP 412)."""
+
+    def __init__(self, student_id, current_version):
+        super().__init__(f"Student {student_id} is at version {current_version}")
+        self.student_id = student_id
+        self.current_version = current_version
+
+
+class DuplicateEmail(Exception):
+    """An update would give the student an email another row already has (HTTP 409)."""
+
+
+# Columns a PUT/PATCH may change
+UPDATABLE_COLUMNS = ('first_name', 'last_name', 'email', 'major', 'semester', 'gpa', 'is_active')
+
+
+def _update_returning(conn, student_id, assignments, values, expected_version, returning):
+    """
+    Write op (see run_write) for one "UPDATE students SET ... WHERE id = ?
+    [AND version = ?] RETURNING ...". The row check, the write and the
+    read-back are a single statement, so the write lock is held for one round trip.
+    Returns: (RETURNING row or None if the student does not exist, written ids)
+    Raises: VersionConflict if `expected_version` is given and does not match,
+        DuplicateEmail if the new email belongs to another student,
+        sqlite3.IntegrityError for any other constraint the values break.
+    """
+    sql = f"UPDATE students SET {', '.join(assignments)}, version = version + 1 WHERE id = ?"
+    params = list(values) + [student_id]
+    if expected_version is not None:
+        sql += " AND version = ?"
+        params.append(expected_version)
+    sql += f" RETURNING {returning}"
+
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    except sqlite3.IntegrityError as e:
+        # Other constraint failures (e.g. NOT NULL in a trigger) propagate as they are
+        if str(e) == 'UNIQUE constraint failed: students.email':
+            raise DuplicateEmail(str(e)) from e
+        raise
+    if rows:
+        return rows[0], (student_id,)
+    if expected_version is None:
+        return None, ()
+    # Failure path only: tell "gone" (404) from "changed" (412)
+    current = conn.execute('SELECT version FROM students WHERE id = ?', (student_id,)).fetchone()
+    if current is None:
+        return None, ()
+    raise VersionConflict(student_id, current[0])
+
+
+def update_student(student_id, data, expected_version=None):
+    """
+    Update student data (Dynamic SQL for both PUT and PATCH).
+    Args:
+        expected_version (int): Row version from If-Match; None skips the check.
+    Returns: Updated student dict or None if not found.
+    Raises: VersionConflict if the row changed since `expected_version`,
+        DuplicateEmail if the new email is taken.
+    """
+    # Build dynamic query: "UPDATE students SET field1=?, field2=? WHERE id=? RETURNING *"
+    fields = []
+    values = []
+    for key, value in data.items():
+        # Only update valid columns and update 'updated_at' automatically
+        if key in UPDATABLE_COLUMNS:
+            fields.append(f"{key} = ?")
+            values.append(value)
+
+    fields.append("updated_at = CURRENT_TIMESTAMP")
+
+    student = run_write(_update_returning, student_id, fields, values, expected_version, '*')
+    return dict(student) if student else None
+
+
+def delete_student(student_id, expected_version=None):
+    """
+    Soft delete a student (set is_active = 0).
+    Returns: True, or False if not found. Raises: VersionConflict (see update_student).
+    """
+    return run_write(_update_returning, student_id, ['is_active = 0'], [], expected_version, 'id') is not None
+
+
+def restore_student(student_id, expected_version=None):
+    """
+    Restore a soft-deleted student (set is_active = 1).
+    Returns: True, or False if not found. Raises: VersionConflict (see update_student).
+    """
+    return run_write(_update_returning, student_id, ['is_active = 1'], [], expected_version, 'id') is not None
+
+
+
+def select_students(ids=None, filters=None, is_active=None):
+    """
+    Row selection for the set-based writes: an explicit id list, or the list
+    endpoint filters (see student_filters.FILTERS) applied to `is_active`.
+    Returns: (list of SQL fragments, list of params)
+    """
+    if ids is not None:
+        clause, params = build_id_match(ids)
+        clauses = [clause]
+        if is_active is not None:
+            clauses.append('is_active = ?')
+            params.append(1 if is_active else 0)
+        return clauses, params
+    return build_where(1 if is_active is None or is_active else 0, filters or {})
+
+
+def _update_many(selection, assignments, values, return_ids):
+    """
+    Apply one set-based "UPDATE students SET ... WHERE <selection> RETURNING id"
+    in a single transaction (one commit and one counter bump for every row).
+    Returns: dict {"affected": n, "ids": [...] if return_ids}
+    Raises: sqlite3.IntegrityError (rolled back) e.g. on a duplicate email.
+    """
+    clauses, params = selection
+    sql = (f"UPDATE students SET {', '.join(assignments)}, version = version + 1 "
+           f"WHERE {' AND '.join(clauses)} RETURNING id")
+
     conn = get_db_connection()
     try:
-        # Verificamos si existe (incluso si está borrado)
-        student = conn.execute('SELECT id FROM students WHERE id = ?', (student_id,)).fetchone()
-        if not student:
-            return False
-            
-        conn.execute('UPDATE students SET is_active = 1 WHERE id = ?', (student_id,))
-        conn.commit()
-        return True
+        conn.execute('BEGIN IMMEDIATE')
+        ids = [row[0] for row in conn.execute(sql, list(values) + list(params)).fetchall()]
+        if ids:
+            version = bump_students_version(conn)
+            conn.commit()
+            after_write(ids, version)
+        else:
+            conn.rollback()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
+    result = {"affected": len(ids)}
+    if return_ids:
+        result["ids"] = sorted(ids)
+    return result
+
+
+def update_students_bulk(changes, ids=None, filters=None, is_active=None,
+                         semester_increment=0, return_ids=False):
+    """
+    Set-based PATCH: the same `changes` (UPDATABLE_COLUMNS only) on every selected row.
+    Args:
+        changes (dict): Validated column values.
+        ids, filters, is_active: Row selection, see select_students().
+        semester_increment (int): Added to each row's semester (term roll-over),
+            kept inside the 1-12 range the validator enforces.
+    """
+    assignments = []
+    values = []
+    for key, value in changes.items():
+        if key in UPDATABLE_COLUMNS:
+            assignments.append(f"{key} = ?")
+            values.append(value)
+    if semester_increment:
+        assignments.append("semester = MAX(1, MIN(12, semester + ?))")
+        values.append(semester_increment)
+    assignments.append("updated_at = CURRENT_TIMESTAMP")
+    selection = select_students(ids, filters, is_active)
+    return _update_many(selection, assignments, values, return_ids)
+
+
+def delete_students_bulk(ids=None, filters=None, return_ids=False):
+    """Set-based soft delete of the selected active students."""
+    selection = select_students(ids, filters, is_active=True)
+    return _update_many(selection, ['is_active = 0'], [], return_ids)
+
+
+def restore_students_bulk(ids=None, filters=None, return_ids=False):
+    """Set-based restore of the selected soft-deleted students."""
+    selection = select_students(ids, filters, is_active=False)
+    return _update_many(selection, ['is_active = 1'], [], return_ids)
 
 
 #FUNCTION GET ALL STUDENT WITH NO RETRIEVE INACTIVES
@@ -0,0 +1,232 @@
+import base64
+import json
+from datetime import date
+
+# Query parameter -> (column, SQL operator, type). Only these ever reach the SQL
+# text; values are always bound as parameters.
+FILTERS = {
+    'major': ('major', '=', str),
+    'semester_min': ('semester', '>=', int),
+    'semester_max': ('semester', '<=', int),
+    'gpa_min': ('gpa', '>=', float),
+    'gpa_max': ('gpa', '<=', float),
+    'enrolled_after': ('enrollment_date', '>=', date.fromisoformat),
+    'enrolled_before': ('enrollment_date', '<=', date.fromisoformat),
+}
+
+# Columns accepted in ?sort= (each has an (is_active, col, id) index, so
+# "ORDER BY col, id" is read straight from it)
+SORTABLE_COLUMNS = ('id', 'major', 'semester', 'gpa', 'enrollment_date')
+
+# Sortable columns that may hold NULL (SQLite puts NULL first ascending, last descending)
+NULLABLE_COLUMNS = ('gpa',)
+
+# JSON types a cursor may carry for each sortable column (plus None when nullable)
+CURSOR_TYPES = {
+    'id': (int,),
+    'major': (str,),
+    'semester': (int,),
+    'gpa': (int, float),
+    'enrollment_date': (str,),
+}
+
+DEFAULT_SORT = 'id'
+
+# Columns of a student row, in SELECT * order (the only names ?fields= accepts)
+STUDENT_COLUMNS = ('id', 'first_name', 'last_name', 'email', 'major', 'semester', 'gpa',
+                   'enrollment_date', 'is_active', 'created_at', 'updated_at', 'version')
+
+# ?format= of the list endpoint: one object per row, or column names once plus value arrays
+LIST_FORMATS = ('objects', 'columnar')
+
+
+def parse_filters(args):
+    """
+    Pick and type-check the filter parameters out of a query-string mapping.
+    Returns: dict {param: typed value}
+    Raises: ValueError with a user-facing message on a bad value.
+    """
+    filters = {}
+    for param, (column, operator, cast) in FILTERS.items():
+        raw = args.get(param)
+        if raw is None or raw == '':
+            continue
+        try:
+            value = cast(raw)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value for {param}: {raw}")
+        # Dates are stored as ISO text, compare them as text
+        filters[param] = value.isoformat() if isinstance(value, date) else value
+    return filters
+
+
+def build_where(status_filter, filters):
+    """
+    WHERE clauses for the list/count queries.
+    Returns: (list of SQL fragments, list of params)
+    """
+    clauses = ['is_active = ?']
+    params = [status_filter]
+    for param, value in filters.items():
+        column, operator, _ = FILTERS[param]
+        clauses.append(f"{column} {operator} ?")
+        params.append(value)
+    return clauses, params
+
+
+def build_id_match(ids):
+    """
+    WHERE fragment for "id is one of `ids`". The list goes in as a single JSON
+    parameter, so any number of ids fits in one statement (no 999-variable limit)
+    and SQLite still looks each one up by primary key.
+    Returns: (SQL fragment, list of params)
+    """
+    return "id IN (SELECT value FROM json_each(?))", [json.dumps(ids)]
+
+
+def parse_sort(sort):
+    """
+    Parse "gpa,-enrollment_date" into [('gpa', False), ('enrollment_date', True), ('id', False)].
+    `id` is always appended as the tie-breaker so the order (and the cursor) is total.
+    Raises: ValueError on an unknown column.
+    """
+    keys = []
+    for part in (sort or DEFAULT_SORT).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        desc = part.startswith('-')
+        column = part.lstrip('+-')
+        if column not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort by {column}. Allowed: {', '.join(SORTABLE_COLUMNS)}")
+        if column not in [c for c, _ in keys]:
+            keys.append((column, desc))
+    if 'id' not in [c for c, _ in keys]:
+        keys.append(('id', False))
+    return keys
+
+
+def parse_fields(fields):
+    """
+    Parse a sparse fieldset "id,first_name,gpa" (kept in the given order).
+    Returns: tuple of column names, or None for every column.
+    Raises: ValueError on an unknown column.
+    """
+    columns = []
+    for column in (fields or '').split(','):
+        column = column.strip()
+        if not column:
+            continue
+        if column not in STUDENT_COLUMNS:
+            raise ValueError(f"Unknown field {column}. Allowed: {', '.join(STUDENT_COLUMNS)}")
+        if column not in columns:
+            columns.append(column)
+    return tuple(columns) or None
+
+
+def select_columns(fields, sort_keys):
+    """
+    Columns the list query has to read: the requested fields plus any sort
+    column missing from them (the cursor is built from the last row).
+    Returns: tuple of column names, or None for SELECT *.
+    """
+    if fields is None:
+        return None
+    return fields + tuple(column for column, _ in sort_keys if column not in fields)
+
+
+def shape_rows(columns, rows, fields=None, columnar=False):
+    """
+    Page body from plain tuples whose values follow `columns`, without building
+    an intermediate dict per row when the format does not need one.
+    Returns: {"students": [dict, ...]}, or {"columns": [...], "rows": [[...], ...]} when columnar.
+    """
+    if fields is not None and tuple(fields) != tuple(columns):
+        positions = [columns.index(column) for column in fields]
+        rows = [[row[i] for i in positions] for row in rows]
+        columns = fields
+    if columnar:
+        return {"columns": list(columns), "rows": rows}
+    return {"students": [dict(zip(columns, row)) for row in rows]}
+
+
+def sort_signature(sort_keys):
+    return ','.join(('-' if desc else '') + column for column, desc in sort_keys)
+
+
+def order_by(sort_keys):
+    return ', '.join(f"{column} {'DESC' if desc else 'ASC'}" for column, desc in sort_keys)
+
+
+def encode_cursor(values, sort_keys):
+    """Opaque `next_cursor` token: the sort-key values of the last row returned."""
+    raw = json.dumps({"s": sort_signature(sort_keys), "v": values}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _cursor_value_ok(column, value):
+    """A forged cursor must not smuggle lists, dicts or booleans into the SQL params."""
+    if value is None:
+        return column in NULLABLE_COLUMNS
+    return isinstance(value, CURSOR_TYPES[column]) and not isinstance(value, bool)
+
+
+def decode_cursor(cursor, sort_keys):
+    """
+    Decode a `next_cursor` token produced for the same sort order.
+    Returns: list of values, or None for an empty cursor (first page).
+    Raises: ValueError if the token is invalid or belongs to another sort.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        values = payload['v']
+        valid = (payload['s'] == sort_signature(sort_keys) and isinstance(values, list)
+                 and len(values) == len(sort_keys)
+                 and all(_cursor_value_ok(column, value) for (column, _), value in zip(sort_keys, values)))
+    except (ValueError, KeyError, TypeError):
+        valid = False
+    if not valid:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _after(column, desc, value):
+    """Condition for "sorts strictly after `value`" on one column (None = nothing does)."""
+    if value is None:
+        return (None, []) if desc else (f"{column} IS NOT NULL", [])
+    if desc:
+        if column in NULLABLE_COLUMNS:
+            return f"({column} < ? OR {column} IS NULL)", [value]
+        return f"{column} < ?", [value]
+    return f"{column} > ?", [value]
+
+
+def seek_clauses(sort_keys, values):
+    """
+    Keyset predicate selecting the rows after `values` in `sort_keys` order:
+        (k1 > v1) OR (k1 IS v1 AND k2 > v2) OR ...
+    plus a plain range bound on the first key (k1 >= v1) so SQLite can seek
+    its index instead of filtering from the start.
+    Returns: (list of SQL fragments, list of params)
+    """
+    alternatives = []
+    params = []
+    for i, (column, desc) in enumerate(sort_keys):
+        condition, condition_params = _after(column, desc, values[i])
+        if condition is None:
+            continue
+        parts = [f"{prev} IS ?" for prev, _ in sort_keys[:i]] + [condition]
+        alternatives.append('(' + ' AND '.join(parts) + ')')
+        params.extend(values[:i])
+        params.extend(condition_params)
+
+    clauses = ['(' + ' OR '.join(alternatives) + ')' if alternatives else '0']
+    first_column, first_desc = sort_keys[0]
+    first_value = values[0]
+    if len(sort_keys) > 1 and first_value is not None and not (first_desc and first_column in NULLABLE_COLUMNS):
+        clauses.insert(0, f"{first_column} {'<=' if first_desc else '>='} ?")
+        params.insert(0, first_value)
+    return clauses, params
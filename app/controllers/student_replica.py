@@ -0,0 +1,411 @@
+import bisect
+import math
+import threading
+import time
+from array import array
+
+from app.controllers.changes_controller import get_latest_seq, _get_horizon
+from app.controllers.student_filters import (
+    FILTERS, STUDENT_COLUMNS, build_id_match, decode_cursor, encode_cursor, shape_rows
+)
+
+# Optional in-process copy of the students table (STUDENT_REPLICA=true) for
+# read-heavy workers. One entry per column instead of one dict per row:
+#   ids            array('q'), ascending (AUTOINCREMENT) -> bisect is the id index
+#   is_active      bytearray, so counts and seeks run in C (count/find/rfind)
+#   semester, gpa, version   array('b'/'d'/'q'); a NULL gpa is stored as NaN
+#   major          array('H') of codes into a small table of distinct majors,
+#                  plus the row offsets of each major (the ?major= filter)
+#   names, dates   lists of interned strings (few distinct values)
+# It follows the students change counter: a bumped counter replays the change
+# log (student_changes) since the last sync, or reloads everything when the
+# log was compacted past it or too much changed.
+#
+# Served from here: get-by-id, and the list endpoint in id order (either
+# direction) with any filter and count mode. Other sort orders keep using
+# their covering indexes in SQLite; stats already come from the student_stats
+# summary table, which is O(groups).
+
+LOAD_BATCH_SIZE = 10000
+# Replaying the change log beyond this share of the table costs more than a reload
+FULL_RELOAD_RATIO = 0.2
+COUNT_BLOCK = 4096
+PURGED = 255  # is_active of a hard-deleted row (never matches 0 or 1)
+MAX_CACHED_COUNTS = 256
+
+
+class StudentReplica:
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.version = None     # students change counter the data matches
+        self.seq = 0            # last change log entry applied
+        self.ids = array('q')
+        self.is_active = bytearray()
+        self.semester = array('b')
+        self.gpa = array('d')
+        self.row_version = array('q')
+        self.major = array('H')
+        self.majors = []        # code -> major
+        self._major_codes = {}  # major -> code
+        self._by_major = []     # code -> array('q') of row offsets, ascending
+        self.first_name = []
+        self.last_name = []
+        self.email = []
+        self.enrollment_date = []
+        self.created_at = []
+        self.updated_at = []
+        self._strings = {}      # intern table for the low-cardinality text columns
+        self._counts = {}       # (status, filters) -> total, for filtered counts of this version
+        self.loads = 0
+        self.refreshes = 0
+        self.last_load_seconds = None
+
+    def configure(self, enabled, conn=None):
+        """Turn the replica on (loading it now when `conn` is given) or off."""
+        with self._lock:
+            self._reset()
+            self.enabled = enabled
+            if enabled and conn is not None:
+                self.sync(conn)
+
+    # --- Loading ----------------------------------------------------------
+
+    def _intern(self, value):
+        if value is None:
+            return None
+        return self._strings.setdefault(value, value)
+
+    def _major_code(self, major):
+        code = self._major_codes.get(major)
+        if code is None:
+            code = self._major_codes[major] = len(self.majors)
+            self.majors.append(major)
+            self._by_major.append(array('q'))
+        return code
+
+    def _append(self, row):
+        (student_id, first_name, last_name, email, major, semester, gpa,
+         enrollment_date, is_active, created_at, updated_at, version) = row
+        intern = self._intern
+        code = self._major_code(major)
+        self._by_major[code].append(len(self.ids))
+        self.ids.append(student_id)
+        self.first_name.append(intern(first_name))
+        self.last_name.append(intern(last_name))
+        self.email.append(email)
+        self.major.append(code)
+        self.semester.append(semester)
+        self.gpa.append(math.nan if gpa is None else gpa)
+        self.enrollment_date.append(intern(enrollment_date))
+        self.is_active.append(1 if is_active else 0)
+        self.created_at.append(intern(created_at))
+        self.updated_at.append(intern(updated_at))
+        self.row_version.append(version)
+
+    def _overwrite(self, i, row):
+        (_, first_name, last_name, email, major, semester, gpa,
+         enrollment_date, is_active, created_at, updated_at, version) = row
+        intern = self._intern
+        self.first_name[i] = intern(first_name)
+        self.last_name[i] = intern(last_name)
+        self.email[i] = email
+        code = self._major_code(major)
+        if code != self.major[i]:
+            old = self._by_major[self.major[i]]
+            del old[bisect.bisect_left(old, i)]
+            new = self._by_major[code]
+            new.insert(bisect.bisect_left(new, i), i)
+            self.major[i] = code
+        self.semester[i] = semester
+        self.gpa[i] = math.nan if gpa is None else gpa
+        self.enrollment_date[i] = intern(enrollment_date)
+        self.is_active[i] = 1 if is_active else 0
+        self.created_at[i] = intern(created_at)
+        self.updated_at[i] = intern(updated_at)
+        self.row_version[i] = version
+
+    def _select(self, conn, where='', params=()):
+        cursor = conn.execute(f"SELECT {', '.join(STUDENT_COLUMNS)} FROM students {where} ORDER BY id", params)
+        cursor.row_factory = None  # Plain tuples: no sqlite3.Row per row
+        return cursor
+
+    def _load(self, conn, version, seq):
+        started = time.perf_counter()
+        loads, refreshes = self.loads, self.refreshes
+        self._reset()
+        cursor = self._select(conn)
+        for batch in iter(lambda: cursor.fetchmany(LOAD_BATCH_SIZE), []):
+            for row in batch:
+                self._append(row)
+        self.version, self.seq = version, seq
+        self.loads, self.refreshes = loads + 1, refreshes
+        self.last_load_seconds = round(time.perf_counter() - started, 3)
+
+    def _apply_changes(self, conn, version, seq):
+        """Replay the change log since self.seq. Returns: False if a full reload is needed."""
+        if _get_horizon(conn) > self.seq:
+            return False
+        changed = [row[0] for row in conn.execute(
+            'SELECT DISTINCT student_id FROM student_changes WHERE seq > ? AND seq <= ?', (self.seq, seq)
+        )]
+        if len(changed) > max(len(self.ids) * FULL_RELOAD_RATIO, LOAD_BATCH_SIZE):
+            return False
+
+        clause, params = build_id_match(changed)
+        rows = {row[0]: row for row in self._select(conn, f'WHERE {clause}', params)}
+        last_id = self.ids[-1] if self.ids else 0
+        for student_id in sorted(changed):
+            row = rows.get(student_id)
+            i = bisect.bisect_left(self.ids, student_id)
+            if i < len(self.ids) and self.ids[i] == student_id:
+                if row is None:
+                    self.is_active[i] = PURGED
+                else:
+                    self._overwrite(i, row)
+            elif row is not None:
+                if student_id < last_id:
+                    return False  # Out-of-order id (explicit insert): positions would shift
+                self._append(row)
+                last_id = student_id
+        self.version, self.seq = version, seq
+        self.refreshes += 1
+        return True
+
+    def sync(self, conn, version=None):
+        """
+        Bring the replica up to date with the database (one counter read when
+        nothing changed, none when the caller passes the `version` it just read).
+        """
+        if version is None:
+            version = conn.execute("SELECT version FROM table_versions WHERE name = 'students'").fetchone()[0]
+        if version == self.version:
+            return
+        with self._lock:
+            if version == self.version:
+                return
+            # One read transaction: counter, change log and rows from the same snapshot
+            own_transaction = not conn.in_transaction
+            if own_transaction:
+                conn.execute('BEGIN')
+            try:
+                version = conn.execute("SELECT version FROM table_versions WHERE name = 'students'").fetchone()[0]
+                seq = get_latest_seq(conn)
+                if self.version is None or not self._apply_changes(conn, version, seq):
+                    self._load(conn, version, seq)
+                self._counts.clear()
+            finally:
+                if own_transaction:
+                    conn.rollback()
+
+    # --- Reading ----------------------------------------------------------
+
+    def _values(self, i):
+        """Row `i` as a tuple in STUDENT_COLUMNS (SELECT *) order."""
+        gpa = self.gpa[i]
+        if gpa != gpa:
+            gpa = None
+        elif gpa.is_integer():
+            gpa = int(gpa)  # NUMERIC affinity stores 4.0 as 4; match what SQLite returns
+        return (self.ids[i], self.first_name[i], self.last_name[i], self.email[i],
+                self.majors[self.major[i]], self.semester[i], gpa, self.enrollment_date[i],
+                self.is_active[i], self.created_at[i], self.updated_at[i], self.row_version[i])
+
+    def _row(self, i):
+        return dict(zip(STUDENT_COLUMNS, self._values(i)))
+
+    def get(self, conn, student_id, is_active=1):
+        """The student dict, or None if missing or not in the `is_active` state."""
+        self.sync(conn)
+        with self._lock:
+            i = bisect.bisect_left(self.ids, student_id)
+            if i < len(self.ids) and self.ids[i] == student_id and self.is_active[i] == is_active:
+                return self._row(i)
+            return None
+
+    @staticmethod
+    def serves(sort_keys):
+        """True when the list query can be answered from here (id order only)."""
+        return len(sort_keys) == 1 and sort_keys[0][0] == 'id'
+
+    def _matcher(self, filters):
+        """
+        Filters as (candidates, match): the row offsets of the ?major= value
+        (None: every row) and a predicate for the rest (None: no other filter).
+        """
+        candidates = None
+        checks = []
+        for param, value in filters.items():
+            column, operator, _ = FILTERS[param]
+            if column == 'major':
+                code = self._major_codes.get(value)
+                candidates = self._by_major[code] if code is not None else array('q')
+            else:
+                data = {'semester': self.semester, 'gpa': self.gpa,
+                        'enrollment_date': self.enrollment_date}[column]
+                checks.append((data, operator, value))
+        if not checks:
+            return candidates, None
+
+        def match(i):
+            # NaN (NULL gpa) fails every comparison, like NULL in SQL
+            for data, operator, value in checks:
+                if operator == '>=':
+                    if not data[i] >= value:
+                        return False
+                elif not data[i] <= value:
+                    return False
+            return True
+        return candidates, match
+
+    def _positions(self, status, candidates, match, start, descending):
+        """Offsets of the matching rows from offset `start` on, in list order."""
+        flags = self.is_active
+        if candidates is not None:
+            if descending:
+                indexes = range(bisect.bisect_right(candidates, start) - 1, -1, -1)
+            else:
+                indexes = range(bisect.bisect_left(candidates, start), len(candidates))
+            for j in indexes:
+                i = candidates[j]
+                if flags[i] == status and (match is None or match(i)):
+                    yield i
+        elif descending:
+            i = flags.rfind(status, 0, start + 1)
+            while i >= 0:
+                if match is None or match(i):
+                    yield i
+                i = flags.rfind(status, 0, i)
+        else:
+            i = flags.find(status, start)
+            while i >= 0:
+                if match is None or match(i):
+                    yield i
+                i = flags.find(status, i + 1)
+
+    def _skip(self, status, offset, descending):
+        """Offset of the row after the first `offset` rows with `status` (-1 / len: none left)."""
+        flags = self.is_active
+        size = len(flags)
+        # Whole blocks first, then a binary search inside one; every count runs in C
+        if descending:
+            end = size
+            while end > 0:
+                begin = max(0, end - COUNT_BLOCK)
+                found = flags.count(status, begin, end)
+                if found > offset:
+                    break
+                offset -= found
+                end = begin
+            if end == 0:
+                return -1
+            low, high = begin, end - 1  # largest start with more than `offset` rows in [start, end)
+            while low < high:
+                middle = (low + high + 1) // 2
+                if flags.count(status, middle, end) > offset:
+                    low = middle
+                else:
+                    high = middle - 1
+            return flags.rfind(status, 0, low + 1)
+        begin = 0
+        while begin < size:
+            end = min(size, begin + COUNT_BLOCK)
+            found = flags.count(status, begin, end)
+            if found > offset:
+                break
+            offset -= found
+            begin = end
+        if begin >= size:
+            return size
+        low, high = begin + 1, end  # smallest stop with more than `offset` rows in [begin, stop)
+        while low < high:
+            middle = (low + high) // 2
+            if flags.count(status, begin, middle) > offset:
+                high = middle
+            else:
+                low = middle + 1
+        return low - 1
+
+    def _count(self, status, filters, candidates, match):
+        if candidates is None and match is None:
+            return self.is_active.count(status)
+        key = (status, tuple(sorted(filters.items())))
+        total = self._counts.get(key)
+        if total is None:
+            total = sum(1 for _ in self._positions(status, candidates, match, 0, False))
+            if len(self._counts) >= MAX_CACHED_COUNTS:
+                self._counts.clear()
+            self._counts[key] = total
+        return total
+
+    def list(self, conn, status, page, per_page, cursor, count_mode, filters, sort_keys,
+             fields=None, columnar=False, version=None):
+        """Same result as get_all_students() for an id-ordered query (see serves())."""
+        self.sync(conn, version)
+        descending = sort_keys[0][1]
+        with self._lock:
+            candidates, match = self._matcher(filters)
+            total = None if count_mode == 'none' else self._count(status, filters, candidates, match)
+
+            if cursor is not None:
+                values = decode_cursor(cursor, sort_keys)
+                if values is None:
+                    start = len(self.ids) - 1 if descending else 0
+                elif descending:
+                    start = bisect.bisect_left(self.ids, values[0]) - 1
+                else:
+                    start = bisect.bisect_right(self.ids, values[0])
+                skip = 0
+            elif candidates is None and match is None:
+                start, skip = self._skip(status, (page - 1) * per_page, descending), 0
+            else:
+                start, skip = (len(self.ids) - 1 if descending else 0), (page - 1) * per_page
+
+            positions = self._positions(status, candidates, match, start, descending) if start >= 0 else iter(())
+            wanted = per_page + 1 if cursor is not None else per_page
+            rows = []
+            for i in positions:
+                if skip:
+                    skip -= 1
+                    continue
+                rows.append(self._values(i))
+                if len(rows) == wanted:
+                    break
+
+        if cursor is not None:
+            has_more = len(rows) > per_page
+            rows = rows[:per_page]
+            result = shape_rows(STUDENT_COLUMNS, rows, fields, columnar)
+            result.update(per_page=per_page,
+                          next_cursor=encode_cursor([rows[-1][0]], sort_keys) if has_more else None)
+        else:
+            result = shape_rows(STUDENT_COLUMNS, rows, fields, columnar)
+            result.update(page=page, per_page=per_page)
+            if total is not None:
+                result["total_pages"] = (total + per_page - 1) // per_page
+        if total is not None:
+            result["total"] = total
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "rows": len(self.ids),
+                "active": self.is_active.count(1),
+                "inactive": self.is_active.count(0),
+                "majors": len(self.majors),
+                "distinct_strings": len(self._strings),
+                "version": self.version,
+                "change_seq": self.seq,
+                "loads": self.loads,
+                "refreshes": self.refreshes,
+                "last_load_seconds": self.last_load_seconds,
+            }
+
+
+student_replica = StudentReplica()
@@ -1,24 +1,274 @@
 import sqlite3
 import os
+import queue
+import threading
+import time
+
+from flask import g, has_app_context
 
 # Updated database name based on your changes
 DB_NAME = "students.db"
 
+# Canonical location: app/database/students.db, whatever the working directory.
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), DB_NAME)
+
+# PRAGMAs applied once, when the pool opens a connection (not on every request).
+# cache_size is negative -> KiB, so -16000 is ~16 MB of page cache per connection.
+CONNECTION_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('cache_size', -16000),
+    ('mmap_size', 134217728),
+    ('busy_timeout', 5000),
+)
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_POOL_TIMEOUT = 10.0
+
+# Callables notified after every statement run on a pooled connection, as
+# observer(conn, sql, parameters, seconds) (parameters is None for executemany).
+# Empty by default: execute() then adds no overhead.
+statement_observers = []
+
+# Callables run on every connection the pool opens, as hook(conn)
+connection_hooks = []
+
+_db_path = None
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def resolve_db_path():
+    """
+    Resolve the database path once and remember it.
+    STUDENTS_DB (environment) wins; otherwise the canonical DB_PATH is used.
+    """
+    global _db_path
+    if _db_path is None:
+        _db_path = os.environ.get('STUDENTS_DB') or DB_PATH
+    return _db_path
+
+
+def configure_connection(conn):
+    """Apply the tuning PRAGMAs to a freshly opened connection."""
+    for name, value in CONNECTION_PRAGMAS:
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+def _notify(conn, sql, parameters, seconds):
+    for observer in statement_observers:
+        observer(conn, sql, parameters, seconds)
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """Raised when no pooled connection became free within the pool timeout."""
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3 connection that goes back to its pool on close().
+    Controllers keep calling conn.close() as always; a request-scoped
+    connection ignores it and is returned by the app teardown instead.
+    """
+    pool = None
+    checked_out = False
+    request_scoped = False
+
+    # Timing covers execute() itself (the statement runs up to its first row);
+    # rows fetched later by the caller are not included.
+    def execute(self, sql, parameters=()):
+        if not statement_observers:
+            return super().execute(sql, parameters)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _notify(self, sql, parameters, time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not statement_observers:
+            return super().executemany(sql, seq_of_parameters)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _notify(self, sql, None, time.perf_counter() - started)
+
+    def commit(self):
+        if not statement_observers:
+            return super().commit()
+        started = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            _notify(self, 'COMMIT', None, time.perf_counter() - started)
+
+    def close(self):
+        if self.request_scoped:
+            return
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            super().close()
+
+
+class ConnectionPool:
+    """
+    Bounded pool of pre-configured SQLite connections.
+    Connections are created lazily up to max_size; when all of them are busy,
+    callers wait up to `timeout` seconds for one to be released.
+    """
+
+    def __init__(self, db_path, max_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._all = []
+        self._in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            factory=PooledConnection,
+        )
+        conn.row_factory = sqlite3.Row  # This allows accessing data like dicts: row['email']
+        configure_connection(conn)
+        for hook in connection_hooks:
+            hook(conn)
+        conn.pool = self
+        return conn
+
+    def acquire(self):
+        """Check out a connection (reusing an idle one when possible)."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                can_create = len(self._all) < self.max_size
+                if can_create:
+                    self._all.append(None)  # Reserve the slot while we connect
+            if can_create:
+                try:
+                    conn = self._connect()
+                finally:
+                    with self._lock:
+                        self._all.remove(None)
+                        if conn is not None:
+                            self._all.append(conn)
+            else:
+                started = time.perf_counter()
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise PoolTimeout(f"No database connection available after {self.timeout}s")
+                finally:
+                    with self._lock:
+                        self._waits += 1
+                        self._wait_time += time.perf_counter() - started
+
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+        conn.checked_out = True
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool, discarding any uncommitted work."""
+        if not conn.checked_out:
+            return  # Already released (e.g. close() called twice)
+        conn.checked_out = False
+        conn.request_scoped = False
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._in_use -= 1
+        self._idle.put(conn)
+
+    def close_all(self):
+        """Close every idle connection (used on shutdown and in scripts)."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._all.remove(conn)
+            sqlite3.Connection.close(conn)
+
+    def stats(self):
+        """Counters to size the pool: a steady non-zero `waits` means it is too small."""
+        with self._lock:
+            return {
+                "db_path": self.db_path,
+                "max_size": self.max_size,
+                "size": len(self._all),
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_time_ms": round(self._wait_time * 1000, 3),
+            }
+
+
+def init_pool(db_path=None, max_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT):
+    """(Re)create the process-wide pool. Called by create_app()."""
+    global _pool, _db_path
+    with _pool_lock:
+        if db_path:
+            _db_path = db_path
+        if _pool is not None:
+            _pool.close_all()
+        _pool = ConnectionPool(resolve_db_path(), max_size=max_size, timeout=timeout)
+    return _pool
+
+
+def get_pool():
+    """Return the process-wide pool, creating it with defaults if needed."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(resolve_db_path())
+    return _pool
+
+
 def get_db_connection():
     """
-    Creates and returns a connection to the SQLite database.
-    Sets row_factory to sqlite3.Row to access columns by name.
-    """
-    # Get the absolute path to ensure we find the DB file correctly
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    # Go up one level to app/database/ (or adjust depending on where the db file is)
-    # Since we run from root, relative path usually works, but let's be safe:
-    db_path = os.path.join(os.getcwd(), 'app', 'database', DB_NAME)
-    
-    # Fallback: if running directly inside database folder
-    if not os.path.exists(os.path.dirname(db_path)):
-        db_path = DB_NAME
-
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row  # This allows accessing data like dicts: row['email']
-    return conn
+    Returns a pooled connection to the SQLite database.
+    Inside a Flask request the same connection is reused by every controller
+    call and handed back by the app teardown; outside of Flask, conn.close()
+    returns it to the pool.
+    """
+    if has_app_context():
+        conn = g.get('_db_conn')
+        if conn is None:
+            conn = get_pool().acquire()
+            conn.request_scoped = True
+            g._db_conn = conn
+        return conn
+    return get_pool().acquire()
+
+
+def release_db_connection(exception=None):
+    """Teardown hook: give the request's connection back to the pool."""
+    conn = g.pop('_db_conn', None)
+    if conn is not None and conn.pool is not None:
+        conn.pool.release(conn)
+
+
+def init_app(app):
+    """Create the pool from app.config and wire checkout/return to the app context."""
+    init_pool(
+        app.config.get('DATABASE'),
+        max_size=app.config.get('DB_POOL_SIZE', DEFAULT_POOL_SIZE),
+        timeout=app.config.get('DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT),
+    )
+    app.teardown_appcontext(release_db_connection)
@@ -1,40 +1,30 @@
 import sqlite3
+from app.database.db_config import resolve_db_path
+from app.database.migrations import migrate, get_schema_version
 
-# Name of the database
-DB_NAME = "students.db"
-
-def init_db():
-    """Initialize the database with the students table."""
-    # Connect with DB (in case db doesn't exist its gonna create it.)
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    
-    # Now we make the instructions for the SQL Table
-    create_table_sql = """
-    CREATE TABLE IF NOT EXISTS students (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        first_name VARCHAR(100) NOT NULL,
-        last_name VARCHAR(100) NOT NULL,
-        email VARCHAR(150) UNIQUE NOT NULL,
-        major VARCHAR(100) NOT NULL,
-        semester INTEGER NOT NULL,
-        gpa DECIMAL(3,2),
-        enrollment_date DATE NOT NULL,
-        is_active BOOLEAN DEFAULT 1,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
+def init_db(db_path=None, verbose=True):
     """
-    
+    Initialize the database: create it if needed and apply pending migrations.
+    Args:
+        db_path (str): Defaults to the canonical path (app/database/students.db).
+    Returns: int -> schema version after migrating.
+    """
+    # Connect with DB (in case db doesn't exist its gonna create it.)
+    conn = sqlite3.connect(db_path or resolve_db_path())
     try:
-        cursor.execute(create_table_sql)
-        conn.commit()
-        print("Success: Database initialized and table 'students' created.")
+        applied = migrate(conn)
+        version = get_schema_version(conn)
+        if verbose:
+            for number, description in applied:
+                print(f"Applied migration {number}: {description}")
+            print(f"Success: Database initialized (schema version {version}).")
+        return version
     except sqlite3.Error as e:
         print(f"Error initializing database: {e}")
+        raise
     finally:
         conn.close()
 
-# This line its for directly execute the file.
+# This line its for directly execute the file: python -m app.database.init_db
 if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    init_db()
@@ -0,0 +1,299 @@
+import sqlite3
+
+# student_stats keeps running counts/sums per group so /api/students/stats
+# reads O(groups) rows. The triggers below add a row to its group or take it
+# out; `ref` is 'new' or 'old' inside the trigger body.
+
+
+def _stats_group_match(ref):
+    return (f"is_active = {ref}.is_active AND major = {ref}.major AND semester = {ref}.semester "
+            f"AND enrollment_year = substr({ref}.enrollment_date, 1, 4)")
+
+
+def _stats_add_sql(ref):
+    return f"""
+            INSERT INTO student_stats (is_active, major, semester, enrollment_year,
+                                       student_count, gpa_count, gpa_sum, gpa_min, gpa_max)
+            VALUES ({ref}.is_active, {ref}.major, {ref}.semester, substr({ref}.enrollment_date, 1, 4),
+                    1, {ref}.gpa IS NOT NULL, COALESCE({ref}.gpa, 0), {ref}.gpa, {ref}.gpa)
+            ON CONFLICT (is_active, major, semester, enrollment_year) DO UPDATE SET
+                student_count = student_count + 1,
+                gpa_count = gpa_count + excluded.gpa_count,
+                gpa_sum = gpa_sum + excluded.gpa_sum,
+                gpa_min = CASE WHEN gpa_min IS NULL OR excluded.gpa_min < gpa_min THEN excluded.gpa_min ELSE gpa_min END,
+                gpa_max = CASE WHEN gpa_max IS NULL OR excluded.gpa_max > gpa_max THEN excluded.gpa_max ELSE gpa_max END;"""
+
+
+def _stats_remove_sql(ref):
+    group = _stats_group_match(ref)
+    source = (f"FROM students WHERE is_active = {ref}.is_active AND major = {ref}.major "
+              f"AND semester = {ref}.semester AND substr(enrollment_date, 1, 4) = substr({ref}.enrollment_date, 1, 4)")
+    return f"""
+            UPDATE student_stats SET
+                student_count = student_count - 1,
+                gpa_count = gpa_count - ({ref}.gpa IS NOT NULL),
+                gpa_sum = gpa_sum - COALESCE({ref}.gpa, 0)
+            WHERE {group};
+            -- Min/max cannot be "subtracted": rescan the group only when the extreme left it
+            UPDATE student_stats SET
+                gpa_min = (SELECT MIN(gpa) {source}),
+                gpa_max = (SELECT MAX(gpa) {source})
+            WHERE {group} AND {ref}.gpa IS NOT NULL AND ({ref}.gpa <= gpa_min OR {ref}.gpa >= gpa_max);
+            DELETE FROM student_stats WHERE {group} AND student_count <= 0;"""
+
+
+STATS_RECOMPUTE_SQL = """
+    INSERT INTO student_stats (is_active, major, semester, enrollment_year,
+                               student_count, gpa_count, gpa_sum, gpa_min, gpa_max)
+    SELECT is_active, major, semester, substr(enrollment_date, 1, 4),
+           COUNT(*), COUNT(gpa), COALESCE(SUM(gpa), 0), MIN(gpa), MAX(gpa)
+    FROM students
+    GROUP BY is_active, major, semester, substr(enrollment_date, 1, 4)
+"""
+
+# Ordered schema migrations. Each entry is (version, description, statements);
+# PRAGMA user_version stores the last version applied to a database file.
+# Never edit a migration that has shipped: append a new one instead.
+MIGRATIONS = [
+    (1, "students table", [
+        """
+        CREATE TABLE IF NOT EXISTS students (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name VARCHAR(100) NOT NULL,
+            last_name VARCHAR(100) NOT NULL,
+            email VARCHAR(150) UNIQUE NOT NULL,
+            major VARCHAR(100) NOT NULL,
+            semester INTEGER NOT NULL,
+            gpa DECIMAL(3,2),
+            enrollment_date DATE NOT NULL,
+            is_active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ]),
+    (2, "indexes for listing and filtering", [
+        # Listing: WHERE is_active = ? ORDER BY id (and the COUNT for totals)
+        "CREATE INDEX IF NOT EXISTS idx_students_active_id ON students (is_active, id)",
+        "CREATE INDEX IF NOT EXISTS idx_students_major ON students (major)",
+        "CREATE INDEX IF NOT EXISTS idx_students_semester ON students (semester)",
+        "CREATE INDEX IF NOT EXISTS idx_students_gpa ON students (gpa)",
+        "CREATE INDEX IF NOT EXISTS idx_students_enrollment_date ON students (enrollment_date)",
+    ]),
+    (3, "import runs (resumable streaming imports)", [
+        """
+        CREATE TABLE IF NOT EXISTS import_runs (
+            id TEXT PRIMARY KEY,
+            source TEXT,
+            format TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'running',
+            rows_committed INTEGER NOT NULL DEFAULT 0,
+            created INTEGER NOT NULL DEFAULT 0,
+            rejected INTEGER NOT NULL DEFAULT 0,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ]),
+    (4, "table change counters (cross-process cache invalidation)", [
+        """
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        "INSERT OR IGNORE INTO table_versions (name, version) VALUES ('students', 0)",
+    ]),
+    (5, "full-text search over names, email and major", [
+        # External-content FTS5 index: it stores only the index, rows stay in students.
+        # Soft-deleted students remain indexed; queries filter on is_active.
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+            first_name, last_name, email, major,
+            content='students', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students BEGIN
+            INSERT INTO students_fts (rowid, first_name, last_name, email, major)
+            VALUES (new.id, new.first_name, new.last_name, new.email, new.major);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students BEGIN
+            INSERT INTO students_fts (students_fts, rowid, first_name, last_name, email, major)
+            VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.major);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS students_fts_update
+        AFTER UPDATE OF first_name, last_name, email, major ON students BEGIN
+            INSERT INTO students_fts (students_fts, rowid, first_name, last_name, email, major)
+            VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.major);
+            INSERT INTO students_fts (rowid, first_name, last_name, email, major)
+            VALUES (new.id, new.first_name, new.last_name, new.email, new.major);
+        END
+        """,
+        # Index the rows that already exist
+        "INSERT INTO students_fts (students_fts) VALUES ('rebuild')",
+    ]),
+    (6, "composite indexes for filtered and sorted listing", [
+        # Every list query pins is_active, so leading with it lets one index serve
+        # the filter, the ORDER BY <col>, id and the keyset seek at the same time.
+        "CREATE INDEX IF NOT EXISTS idx_students_active_major ON students (is_active, major, id)",
+        "CREATE INDEX IF NOT EXISTS idx_students_active_semester ON students (is_active, semester, id)",
+        "CREATE INDEX IF NOT EXISTS idx_students_active_gpa ON students (is_active, gpa, id)",
+        "CREATE INDEX IF NOT EXISTS idx_students_active_enrollment ON students (is_active, enrollment_date, id)",
+        # Superseded by the composite indexes above (one less index to update per write)
+        "DROP INDEX IF EXISTS idx_students_major",
+        "DROP INDEX IF EXISTS idx_students_semester",
+        "DROP INDEX IF EXISTS idx_students_gpa",
+        "DROP INDEX IF EXISTS idx_students_enrollment_date",
+    ]),
+    (7, "incrementally maintained statistics", [
+        """
+        CREATE TABLE IF NOT EXISTS student_stats (
+            is_active INTEGER NOT NULL,
+            major TEXT NOT NULL,
+            semester INTEGER NOT NULL,
+            enrollment_year TEXT NOT NULL,
+            student_count INTEGER NOT NULL DEFAULT 0,
+            gpa_count INTEGER NOT NULL DEFAULT 0,
+            gpa_sum REAL NOT NULL DEFAULT 0,
+            gpa_min REAL,
+            gpa_max REAL,
+            PRIMARY KEY (is_active, major, semester, enrollment_year)
+        ) WITHOUT ROWID
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS student_stats_insert AFTER INSERT ON students BEGIN
+            {_stats_add_sql('new')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS student_stats_delete AFTER DELETE ON students BEGIN
+            {_stats_remove_sql('old')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS student_stats_update
+        AFTER UPDATE OF is_active, major, semester, gpa, enrollment_date ON students
+        WHEN old.is_active IS NOT new.is_active OR old.major IS NOT new.major OR old.semester IS NOT new.semester
+          OR old.gpa IS NOT new.gpa OR old.enrollment_date IS NOT new.enrollment_date
+        BEGIN
+            {_stats_remove_sql('old')}
+            {_stats_add_sql('new')}
+        END
+        """,
+        "DELETE FROM student_stats",
+        STATS_RECOMPUTE_SQL,
+    ]),
+    # Row version for optimistic concurrency: every UPDATE does version = version + 1
+    # and If-Match requests only apply while the version is still the one they read.
+    (8, "students.version column", [
+        "ALTER TABLE students ADD COLUMN version INTEGER NOT NULL DEFAULT 1",
+    ]),
+    # Append-only change feed for GET /api/students/changes. The triggers write
+    # it inside the same transaction as the change itself, whatever the write path.
+    # table_versions['student_changes_horizon'] is the highest seq dropped by
+    # retention: a client asking for changes since an older seq has missed some.
+    (9, "student change log", [
+        """
+        CREATE TABLE IF NOT EXISTS student_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            op TEXT NOT NULL,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        # Compaction keeps the latest entry per student
+        "CREATE INDEX IF NOT EXISTS idx_student_changes_student ON student_changes (student_id, seq)",
+        """
+        CREATE TRIGGER IF NOT EXISTS student_changes_insert AFTER INSERT ON students BEGIN
+            INSERT INTO student_changes (student_id, op) VALUES (new.id, 'create');
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS student_changes_update AFTER UPDATE ON students BEGIN
+            INSERT INTO student_changes (student_id, op) VALUES (new.id, CASE
+                WHEN old.is_active = 1 AND new.is_active = 0 THEN 'delete'
+                WHEN old.is_active = 0 AND new.is_active = 1 THEN 'restore'
+                ELSE 'update' END);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS student_changes_delete AFTER DELETE ON students BEGIN
+            INSERT INTO student_changes (student_id, op) VALUES (old.id, 'purge');
+        END
+        """,
+        "INSERT OR IGNORE INTO table_versions (name, version) VALUES ('student_changes_horizon', 0)",
+    ]),
+    # Background jobs (POST /api/jobs). The row is the only shared state: workers,
+    # child processes and pollers all read and write it, and it outlives a restart.
+    # `worker` is "<host>:<pid>" of the process that owns the job.
+    (10, "background jobs", [
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            type TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            params TEXT,
+            progress REAL NOT NULL DEFAULT 0,
+            message TEXT,
+            result TEXT,
+            error TEXT,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at)",
+    ]),
+    # When a row takes its group's min or max GPA with it, the stats triggers
+    # rescan the group with MIN/MAX(gpa). Without an index on the whole group
+    # key that walks every row of the major, once per row of a bulk update.
+    # With gpa last, each rescan is two index seeks. The expression must match
+    # the trigger's substr(enrollment_date, 1, 4) exactly, or SQLite will not use it.
+    (11, "index for the statistics min/max rescan", [
+        "CREATE INDEX IF NOT EXISTS idx_students_stats_group ON students "
+        "(is_active, major, semester, substr(enrollment_date, 1, 4), gpa)",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    """Return the migration version recorded in the database file."""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn, target=LATEST_VERSION):
+    """
+    Apply every pending migration up to `target`, one transaction each.
+    If a migration fails it is rolled back and the version stays where it was.
+    Returns: list of (version, description) applied.
+    """
+    applied = []
+    current = get_schema_version(conn)
+    for version, description, statements in MIGRATIONS:
+        if version <= current or version > target:
+            continue
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for statement in statements:
+                conn.execute(statement)
+            # PRAGMA does not accept bound parameters; version is our own int
+            conn.execute(f'PRAGMA user_version = {int(version)}')
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        applied.append((version, description))
+    return applied
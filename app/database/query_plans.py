@@ -0,0 +1,61 @@
+# Every query the controllers run, with sample parameters, so we can check
+# with EXPLAIN QUERY PLAN that none of them falls back to a full table scan.
+# Keep this list in sync when a controller query changes.
+CONTROLLER_QUERIES = [
+    ("change counter", "SELECT version FROM table_versions WHERE name = 'students'", ()),
+    ("list: count active", 'SELECT COUNT(*) FROM students WHERE is_active = ?', (1,)),
+    ("list: max id", 'SELECT MAX(id) FROM students', ()),
+    ("list: offset page", 'SELECT * FROM students WHERE is_active = ? ORDER BY id LIMIT ? OFFSET ?', (1, 10, 100)),
+    ("list: cursor page", 'SELECT * FROM students WHERE is_active = ? AND id > ? ORDER BY id LIMIT ?', (1, 100, 11)),
+    ("search", 'SELECT s.*, bm25(students_fts) AS score FROM students_fts JOIN students s ON s.id = students_fts.rowid '
+               'WHERE students_fts MATCH ? AND s.is_active = ? ORDER BY score LIMIT ?', ('"hern"*', 1, 20)),
+    ("list: filter major", 'SELECT * FROM students WHERE is_active = ? AND major = ? AND (id > ?) ORDER BY id ASC LIMIT ?',
+     (1, 'Medicine', 100, 11)),
+    ("list: filter gpa range", 'SELECT * FROM students WHERE is_active = ? AND gpa >= ? AND gpa <= ? ORDER BY id ASC LIMIT ?',
+     (1, 3.5, 4.0, 11)),
+    ("list: sort gpa (seek)", 'SELECT * FROM students WHERE is_active = ? AND gpa >= ? AND ((gpa > ?) OR (gpa IS ? AND id > ?)) '
+                              'ORDER BY gpa ASC, id ASC LIMIT ?', (1, 3.0, 3.0, 3.0, 100, 11)),
+    ("list: sort -enrollment_date (seek)", 'SELECT * FROM students WHERE is_active = ? AND enrollment_date <= ? AND '
+                                           '((enrollment_date < ?) OR (enrollment_date IS ? AND id > ?)) '
+                                           'ORDER BY enrollment_date DESC, id ASC LIMIT ?',
+     (1, '2024-01-01', '2024-01-01', '2024-01-01', 100, 11)),
+    ("list: semester range sorted", 'SELECT * FROM students WHERE is_active = ? AND semester >= ? AND semester <= ? '
+                                    'ORDER BY semester ASC, id ASC LIMIT ? OFFSET ?', (1, 3, 5, 10, 0)),
+    ("get by id", 'SELECT * FROM students WHERE id = ? AND is_active = 1', (1,)),
+    ("update", 'UPDATE students SET gpa = ?, updated_at = CURRENT_TIMESTAMP, version = version + 1 '
+               'WHERE id = ? AND version = ? RETURNING *', (3.5, 1, 1)),
+    ("update: conflict check", 'SELECT version FROM students WHERE id = ?', (1,)),
+    ("delete", 'UPDATE students SET is_active = 0, version = version + 1 WHERE id = ? RETURNING id', (1,)),
+    ("restore", 'UPDATE students SET is_active = 1, version = version + 1 WHERE id = ? RETURNING id', (1,)),
+    ("change feed", 'SELECT c.seq, c.student_id, c.op, c.changed_at, s.* FROM student_changes c '
+                    'LEFT JOIN students s ON s.id = c.student_id WHERE c.seq > ? ORDER BY c.seq LIMIT ?', (0, 500)),
+    ("bulk update by ids", 'UPDATE students SET gpa = ?, updated_at = CURRENT_TIMESTAMP, version = version + 1 '
+                           'WHERE id IN (SELECT value FROM json_each(?)) RETURNING id', (3.5, '[1, 2, 3]')),
+    ("bulk delete by filter", 'UPDATE students SET is_active = 0, version = version + 1 '
+                              'WHERE is_active = ? AND major = ? RETURNING id', (1, 'Math')),
+    # Run by the stats triggers when a row leaves its group holding the min/max GPA
+    ("stats trigger: group min gpa", 'SELECT MIN(gpa) FROM students WHERE is_active = ? AND major = ? AND semester = ? '
+                                     'AND substr(enrollment_date, 1, 4) = substr(?, 1, 4)', (1, 'Law', 3, '2024-01-10')),
+    ("stats trigger: group max gpa", 'SELECT MAX(gpa) FROM students WHERE is_active = ? AND major = ? AND semester = ? '
+                                     'AND substr(enrollment_date, 1, 4) = substr(?, 1, 4)', (1, 'Law', 3, '2024-01-10')),
+    ("job by id", 'SELECT * FROM jobs WHERE id = ?', ('abc',)),
+    ("jobs: by status", 'SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?', ('running', 20)),
+    ("jobs: unfinished", "SELECT id, worker FROM jobs WHERE status IN ('queued', 'running')", ()),
+]
+
+
+def explain_queries(conn, queries=None):
+    """
+    Run EXPLAIN QUERY PLAN for each query.
+    Returns: list of dicts {name, sql, plan: [str], full_scan: bool}
+    """
+    report = []
+    for name, sql, params in queries or CONTROLLER_QUERIES:
+        rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+        plan = [row[3] for row in rows]
+        # "SCAN ..." means SQLite walks the whole table (or a whole index);
+        # we want every hot query to be a "SEARCH ... USING INDEX".
+        full_scan = any(step.startswith('SCAN ') and 'CONSTANT ROW' not in step and 'VIRTUAL TABLE' not in step
+                        for step in plan)
+        report.append({"name": name, "sql": sql, "plan": plan, "full_scan": full_scan})
+    return report
@@ -0,0 +1,206 @@
+import random
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from app.database.db_config import resolve_db_path
+from app.database.init_db import init_db
+from app.database.migrations import STATS_RECOMPUTE_SQL
+
+# Deterministic synthetic students for capacity tests and benchmarks:
+# the same (count, seed, start) always produces the same rows.
+
+FIRST_NAMES = (
+    'Ana', 'Carlos', 'Luisa', 'Jorge', 'Maria', 'Pedro', 'Sofia', 'Miguel', 'Laura', 'Andres',
+    'Valentina', 'Diego', 'Camila', 'Javier', 'Daniela', 'Luis', 'Gabriela', 'Jose', 'Paula', 'Ricardo',
+    'Isabella', 'Fernando', 'Mariana', 'Alejandro', 'Natalia', 'Manuel', 'Carolina', 'Rafael', 'Elena', 'Victor',
+    'Emma', 'Liam', 'Olivia', 'Noah', 'Ava', 'Ethan', 'Mia', 'Lucas', 'Chloe', 'Mateo',
+)
+LAST_NAMES = (
+    'Silva', 'Mendez', 'Rojas', 'Perez', 'Gomez', 'Diaz', 'Hernandez', 'Torres', 'Castillo', 'Vargas',
+    'Garcia', 'Martinez', 'Rodriguez', 'Lopez', 'Gonzalez', 'Sanchez', 'Ramirez', 'Cruz', 'Flores', 'Morales',
+    'Ortiz', 'Gutierrez', 'Chavez', 'Ramos', 'Ruiz', 'Alvarez', 'Mendoza', 'Jimenez', 'Moreno', 'Romero',
+    'Smith', 'Johnson', 'Brown', 'Taylor', 'Wilson', 'Davis', 'Miller', 'Moore', 'Clark', 'Lewis',
+)
+# (major, relative weight)
+MAJORS = (
+    ('Computer Science', 14), ('Engineering', 12), ('Medicine', 10), ('Law', 9), ('Business', 9),
+    ('Economics', 7), ('Psychology', 7), ('Education', 6), ('Architecture', 5), ('Biology', 5),
+    ('Nursing', 5), ('Accounting', 4), ('Physics', 2), ('Mathematics', 2), ('History', 2), ('Art', 1),
+)
+# Enrolment shrinks with every semester (drop-outs and graduations)
+SEMESTER_WEIGHTS = (16, 14, 12, 11, 10, 9, 8, 7, 5, 4, 2, 2)
+
+GPA_MEAN = 3.0
+GPA_STDDEV = 0.55
+NO_GPA_RATE = 0.2            # First-semester students without grades yet
+INACTIVE_RATE = 0.05         # Soft-deleted share
+REFERENCE_DATE = date(2026, 1, 15)  # Fixed so the output does not depend on the day it runs
+EMAIL_DOMAIN = 'university.edu'
+
+# Columns written by the loader, in generate_rows() order
+SEED_COLUMNS = ('first_name', 'last_name', 'email', 'major', 'semester', 'gpa', 'enrollment_date', 'is_active')
+
+DEFAULT_BATCH_SIZE = 50000
+
+# PRAGMAs for the duration of a load: no fsync and a large page cache.
+# The load is still one transaction, so a crash leaves the previous data intact.
+LOAD_PRAGMAS = (
+    ('synchronous', 'OFF'),
+    ('cache_size', -262144),
+    ('temp_store', 'MEMORY'),
+)
+
+
+def _cumulative(weights):
+    total = 0
+    result = []
+    for weight in weights:
+        total += weight
+        result.append(total)
+    return result
+
+
+def generate_rows(count, seed=42, start=0, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Generate `count` synthetic students as tuples in SEED_COLUMNS order,
+    yielded in lists of up to `batch_size` (ready for executemany).
+    Args:
+        seed (int): Random seed; identical arguments give identical rows.
+        start (int): Index of the first row. Emails embed the index, so
+            consecutive loads with increasing `start` never collide.
+    """
+    rng = random.Random(seed * 1000003 + start)
+    majors = [major for major, _ in MAJORS]
+    major_weights = _cumulative(weight for _, weight in MAJORS)
+    semesters = list(range(1, len(SEMESTER_WEIGHTS) + 1))
+    semester_weights = _cumulative(SEMESTER_WEIGHTS)
+
+    for offset in range(0, count, batch_size):
+        size = min(batch_size, count - offset)
+        firsts = rng.choices(FIRST_NAMES, k=size)
+        lasts = rng.choices(LAST_NAMES, k=size)
+        batch_majors = rng.choices(majors, cum_weights=major_weights, k=size)
+        batch_semesters = rng.choices(semesters, cum_weights=semester_weights, k=size)
+
+        batch = []
+        for i in range(size):
+            index = start + offset + i
+            first, last, semester = firsts[i], lasts[i], batch_semesters[i]
+            if semester == 1 and rng.random() < NO_GPA_RATE:
+                gpa = None
+            else:
+                gpa = round(min(4.0, max(0.0, rng.gauss(GPA_MEAN, GPA_STDDEV))), 2)
+            # Enrolled about `semester` terms ago, give or take a few weeks
+            enrolled = REFERENCE_DATE - timedelta(days=(semester - 1) * 182 + rng.randint(0, 150))
+            batch.append((
+                first,
+                last,
+                f"{first.lower()}.{last.lower()}.{index}@{EMAIL_DOMAIN}",
+                batch_majors[i],
+                semester,
+                gpa,
+                enrolled.isoformat(),
+                0 if rng.random() < INACTIVE_RATE else 1,
+            ))
+        yield batch
+
+
+def generate_students(count, seed=42, start=0):
+    """Same rows as generate_rows(), as dicts (e.g. API request bodies)."""
+    for batch in generate_rows(count, seed, start):
+        for row in batch:
+            yield dict(zip(SEED_COLUMNS, row))
+
+
+def _students_schema(conn, kind):
+    """(name, CREATE statement) of every index or trigger defined on students."""
+    sql = "SELECT name, sql FROM sqlite_master WHERE type = ? AND tbl_name = 'students' AND sql IS NOT NULL"
+    return conn.execute(sql, (kind,)).fetchall()
+
+
+def load_students(count, seed=42, db_path=None, batch_size=DEFAULT_BATCH_SIZE, defer_indexes=None,
+                  progress=None):
+    """
+    Write `count` generated students straight into SQLite (no HTTP, no validation).
+    The whole load is one transaction:
+      1. drop the students indexes and triggers (read back from sqlite_master),
+      2. executemany the rows in batches,
+      3. recreate the indexes and triggers, then bring the derived data up to
+         date in one pass each: search index, statistics, change log,
+      4. bump the students change counter so running servers drop their caches.
+    Steps 1 and 3 only pay off when the load is large next to what is already
+    there; small top-ups insert through the live indexes and triggers instead.
+    Args:
+        db_path (str): Defaults to the canonical database (or $STUDENTS_DB).
+        defer_indexes (bool): Force steps 1/3 on or off; None decides by size.
+        progress (callable): Called as progress(rows_loaded) after each batch.
+    Returns: dict {"rows", "first_id", "last_id", "deferred_indexes", "seconds"}
+    """
+    db_path = db_path or resolve_db_path()
+    init_db(db_path, verbose=False)
+    started = time.perf_counter()
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        previous = {name: conn.execute(f'PRAGMA {name}').fetchone()[0] for name, _ in LOAD_PRAGMAS}
+        for name, value in LOAD_PRAGMAS:
+            conn.execute(f"PRAGMA {name} = {value}")
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # AUTOINCREMENT continues after the larger of the two, and we hold the write lock
+            last_id = conn.execute(
+                "SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'students'), 0), "
+                "COALESCE((SELECT MAX(id) FROM students), 0))"
+            ).fetchone()[0]
+
+            if defer_indexes is None:
+                existing = conn.execute('SELECT COUNT(*) FROM students').fetchone()[0]
+                defer_indexes = count >= existing
+
+            indexes = _students_schema(conn, 'index') if defer_indexes else []
+            triggers = _students_schema(conn, 'trigger') if defer_indexes else []
+            for name, _ in triggers:
+                conn.execute(f'DROP TRIGGER "{name}"')
+            for name, _ in indexes:
+                conn.execute(f'DROP INDEX "{name}"')
+
+            insert_sql = (f"INSERT INTO students ({', '.join(SEED_COLUMNS)}) "
+                          f"VALUES ({', '.join('?' * len(SEED_COLUMNS))})")
+            loaded = 0
+            for batch in generate_rows(count, seed, start=last_id, batch_size=batch_size):
+                conn.executemany(insert_sql, batch)
+                loaded += len(batch)
+                if progress:
+                    progress(loaded)
+
+            if defer_indexes:
+                for _, sql in indexes + triggers:
+                    conn.execute(sql)
+                conn.execute('''
+                    INSERT INTO students_fts (rowid, first_name, last_name, email, major)
+                    SELECT id, first_name, last_name, email, major FROM students WHERE id > ?
+                ''', (last_id,))
+                conn.execute('DELETE FROM student_stats')
+                conn.execute(STATS_RECOMPUTE_SQL)
+                conn.execute("INSERT INTO student_changes (student_id, op) "
+                             "SELECT id, 'create' FROM students WHERE id > ? ORDER BY id", (last_id,))
+            conn.execute("UPDATE table_versions SET version = version + 1 WHERE name = 'students'")
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            for name, value in previous.items():
+                conn.execute(f"PRAGMA {name} = {value}")
+    finally:
+        conn.close()
+
+    return {
+        "rows": count,
+        "first_id": last_id + 1 if count else None,
+        "last_id": last_id + count if count else None,
+        "deferred_indexes": bool(defer_indexes),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,161 @@
+import os
+
+from flask import Blueprint, jsonify, request, send_file
+from app.controllers.jobs_controller import (
+    job_runner, get_job, list_jobs, export_file,
+    JOB_TYPES, JOB_STATUSES, FINISHED_STATUSES, DEFAULT_LIST_LIMIT, MAX_LIST_LIMIT
+)
+from app.utils.exporters import EXPORT_FORMATS
+
+job_bp = Blueprint('job_bp', __name__)
+
+
+def job_response(job, status_code=200):
+    if job['type'] == 'export' and job['status'] == 'completed':
+        job['download'] = f"/api/jobs/{job['id']}/download"
+    response = jsonify(job)
+    if status_code == 202:
+        response.headers['Location'] = f"/api/jobs/{job['id']}"
+    return response, status_code
+
+
+@job_bp.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """
+    Run a long operation in the background (poll GET /api/jobs/<id>)
+    ---
+    tags: [Jobs]
+    consumes: [application/json, multipart/form-data]
+    parameters:
+      - name: body
+        in: body
+        schema:
+          type: object
+          required: [type]
+          properties:
+            type: {type: string, enum: [import, export, recompute_stats, rebuild_search, vacuum, compact_changes]}
+            params:
+              type: object
+              description: "export: format (ndjson/csv), is_active (true/false/all). compact_changes: retention_days"
+        description: "JSON for every type except import. An import is a multipart form: type=import, file, and optionally format, chunk_size, import_id"
+    responses:
+      202: {description: Job queued (Location points to its status)}
+      400: {description: Unknown type or invalid parameters}
+      503: {description: Background jobs are disabled}
+    """
+    upload = None
+    if request.files or request.form:
+        job_type = request.form.get('type')
+        params = {key: value for key, value in request.form.items() if key != 'type'}
+        upload = request.files.get('file')
+    else:
+        data = request.get_json(silent=True) or {}
+        job_type = data.get('type')
+        params = data.get('params') or {}
+        if not isinstance(params, dict):
+            return jsonify({"error": "params must be an object"}), 400
+
+    try:
+        job = job_runner.submit(job_type, params, upload)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
+    return job_response(job, 202)
+
+
+@job_bp.route('/api/jobs', methods=['GET'])
+def get_jobs():
+    """
+    Recent background jobs, newest first
+    ---
+    tags: [Jobs]
+    parameters:
+      - name: status
+        in: query
+        type: string
+        enum: [queued, running, completed, failed, cancelled, interrupted]
+      - name: limit
+        in: query
+        type: integer
+        default: 20
+    responses:
+      200: {description: List of jobs}
+      400: {description: Unknown status}
+    """
+    status = request.args.get('status')
+    if status and status not in JOB_STATUSES:
+        return jsonify({"error": f"status must be one of: {', '.join(JOB_STATUSES)}"}), 400
+    limit = min(max(request.args.get('limit', DEFAULT_LIST_LIMIT, type=int), 1), MAX_LIST_LIMIT)
+    return jsonify({"jobs": list_jobs(status, limit), "types": list(JOB_TYPES)}), 200
+
+
+@job_bp.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """
+    Status, progress (0-1) and result of a background job
+    ---
+    tags: [Jobs]
+    parameters:
+      - name: job_id
+        in: path
+        type: string
+        required: true
+    responses:
+      200: {description: "Job record (status: queued, running, completed, failed, cancelled or interrupted)"}
+      404: {description: Not found}
+    """
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return job_response(job)
+
+
+@job_bp.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """
+    Cancel a background job
+    ---
+    tags: [Jobs]
+    parameters:
+      - name: job_id
+        in: path
+        type: string
+        required: true
+    responses:
+      200: {description: Cancelled before it started}
+      202: {description: Cancellation requested; the job stops at its next progress report}
+      404: {description: Not found}
+      409: {description: The job already finished}
+    """
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job['status'] in FINISHED_STATUSES:
+        return jsonify({"error": f"Job already {job['status']}", "job": job}), 409
+    job = job_runner.cancel(job_id)
+    return jsonify(job), 200 if job['status'] == 'cancelled' else 202
+
+
+@job_bp.route('/api/jobs/<job_id>/download', methods=['GET'])
+def download_job_file(job_id):
+    """
+    File produced by a completed export job
+    ---
+    tags: [Jobs]
+    parameters:
+      - name: job_id
+        in: path
+        type: string
+        required: true
+    produces: [application/x-ndjson, text/csv]
+    responses:
+      200: {description: The exported file}
+      404: {description: No finished export with this id}
+    """
+    path = export_file(job_id)
+    if path is None:
+        return jsonify({"error": "No finished export for this job"}), 404
+    extension = os.path.splitext(path)[1].lstrip('.')
+    return send_file(path, mimetype=EXPORT_FORMATS.get(extension), as_attachment=True,
+                     download_name=f"students.{extension}")
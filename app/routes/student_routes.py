@@ -1,12 +1,60 @@
-from flask import Blueprint, request, jsonify
+import csv
+import sqlite3
+
+from flask import Blueprint, Response, request, jsonify
 from app.controllers.student_controller import (
-    get_all_students, create_student, get_student_by_id, 
-    update_student, delete_student, restore_student  # <-- Nuevo import
+    get_all_students, create_student,
+    update_student, delete_student, restore_student,  # <-- Nuevo import
+    get_student_entry, current_students_version, student_etag, VersionConflict, DuplicateEmail,
+    create_students_bulk, iter_student_batches, search_students,
+    update_students_bulk, delete_students_bulk, restore_students_bulk,
+    COUNT_MODES, BULK_MODES, MAX_BULK_RECORDS, MAX_PER_PAGE, UPDATABLE_COLUMNS
+)
+from app.controllers.student_filters import parse_filters, FILTERS, LIST_FORMATS
+from app.controllers.stats_controller import get_student_stats
+from app.controllers.changes_controller import (
+    get_changes, ChangesExpired, DEFAULT_CHANGES_LIMIT, MAX_CHANGES_LIMIT
+)
+from app.controllers.import_controller import (
+    import_students, get_import_run, IMPORT_FORMATS, DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE, MAX_REPORTED_REJECTS
 )
-from app.utils.validators import validate_student_data
+from app.database.write_queue import WriteQueueTimeout
+from app.utils.exporters import EXPORT_FORMATS, export_chunks
+from app.utils.http_cache import (
+    list_etag, parse_timestamp, is_not_modified, not_modified, if_match_version
+)
+from app.utils.validators import student_errors, format_errors
 
 student_bp = Blueprint('student_bp', __name__)
 
+
+def precondition_failed(student_id, current_version=None):
+    """412 for a stale If-Match; carries the current ETag so the client can re-read."""
+    response = jsonify({"error": "Student was modified by another request",
+                        "current_version": current_version})
+    if current_version is not None:
+        response.set_etag(student_etag({"id": student_id, "version": current_version}))
+    return response, 412
+
+
+def validation_error(errors):
+    """400 listing every invalid field (`error` joins them for older clients)."""
+    return jsonify({"error": format_errors(errors), "errors": errors}), 400
+
+
+def updated_response(student):
+    response = jsonify({"message": "Student updated", "student": student})
+    response.set_etag(student_etag(student))
+    return response, 200
+
+
+@student_bp.errorhandler(WriteQueueTimeout)
+def write_queue_timeout(e):
+    """503 when the group-commit writer is backed up (WRITE_QUEUE=true); the write may still land."""
+    response = jsonify({"error": f"The database is busy, retry later ({e})"})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 # --- PART A ENDPOINTS (GET ALL y POST) ---
 @student_bp.route('/api/students', methods=['GET'])
 def get_students():
@@ -23,21 +71,94 @@ def get_students():
         in: query
         type: integer
         default: 10
+        description: 1 to 1000
       - name: is_active
         in: query
         type: boolean
         default: true
         description: True to see active students, False to see the inactive ones
+      - name: cursor
+        in: query
+        type: string
+        description: Keyset pagination. Send it empty for the first page, then the returned next_cursor (page is ignored)
+      - name: count
+        in: query
+        type: string
+        enum: [exact, cached, estimate, none]
+        default: cached
+        description: How the total is computed
+      - name: include_total
+        in: query
+        type: boolean
+        default: true
+        description: False skips the total (same as count=none)
+      - {name: major, in: query, type: string}
+      - {name: semester_min, in: query, type: integer}
+      - {name: semester_max, in: query, type: integer}
+      - {name: gpa_min, in: query, type: number}
+      - {name: gpa_max, in: query, type: number}
+      - {name: enrolled_after, in: query, type: string, format: date, description: On or after (YYYY-MM-DD)}
+      - {name: enrolled_before, in: query, type: string, format: date, description: On or before (YYYY-MM-DD)}
+      - name: sort
+        in: query
+        type: string
+        default: id
+        description: Comma separated, "-" for descending, e.g. gpa,-enrollment_date (id, major, semester, gpa, enrollment_date)
+      - name: fields
+        in: query
+        type: string
+        description: Sparse fieldset, e.g. id,first_name,gpa (only these columns are read and returned)
+      - name: format
+        in: query
+        type: string
+        enum: [objects, columnar]
+        default: objects
+        description: columnar returns "columns" once and "rows" as value arrays instead of "students"
     responses:
-      200: {description: Paginated List}
+      200: {description: Paginated List (weak ETag)}
+      304: {description: Not Modified (If-None-Match matched)}
+      400: {description: Invalid page, per_page, cursor, count mode, filter, sort, field or format}
     """
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
+    if page < 1:
+        return jsonify({"error": "page must be at least 1"}), 400
+    if not 1 <= per_page <= MAX_PER_PAGE:
+        return jsonify({"error": f"per_page must be between 1 and {MAX_PER_PAGE}"}), 400
     # Capturamos el filtro (por defecto True)
     is_active = request.args.get('is_active', 'true')
-    
-    result = get_all_students(page, per_page, is_active)
-    return jsonify(result), 200
+    cursor = request.args.get('cursor')
+    count_mode = request.args.get('count', 'cached')
+    if request.args.get('include_total', 'true').lower() == 'false':
+        count_mode = 'none'
+    if count_mode not in COUNT_MODES:
+        return jsonify({"error": f"count must be one of: {', '.join(COUNT_MODES)}"}), 400
+    sort = request.args.get('sort')
+    fields = request.args.get('fields')
+    list_format = request.args.get('format', 'objects')
+    if list_format not in LIST_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(LIST_FORMATS)}"}), 400
+    try:
+        filters = parse_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # The tag only depends on the change counter and the query string, so a
+    # matching If-None-Match is answered without running the list query.
+    version = current_students_version()
+    etag = list_etag(version, request.args)
+    if is_not_modified(etag):
+        return not_modified(etag, weak=True)
+
+    try:
+        result = get_all_students(page, per_page, is_active, cursor=cursor, count_mode=count_mode,
+                                  filters=filters, sort=sort, fields=fields, columnar=list_format == 'columnar',
+                                  version=version)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    response = jsonify(result)
+    response.set_etag(etag, weak=True)
+    return response, 200
 
 @student_bp.route('/api/students', methods=['POST'])
 def add_student():
@@ -50,29 +171,21 @@ def add_student():
         in: body
         required: true
         schema:
-          type: object
-          required: [first_name, last_name, email, major, semester, enrollment_date]
-          properties:
-            first_name: {type: string}
-            last_name: {type: string}
-            email: {type: string}
-            major: {type: string}
-            semester: {type: integer}
-            gpa: {type: number}
-            enrollment_date: {type: string}
+          $ref: '#/definitions/StudentInput'
     responses:
       201: {description: Created}
       400: {description: Invalid Data}
       409: {description: Email Conflict}
+      503: {description: Write queue backed up (WRITE_QUEUE=true); retry after Retry-After}
     """
     data = request.get_json()
     if not data:
         return jsonify({"error": "No data provided"}), 400
 
     # VALIDATION
-    is_valid, error_msg = validate_student_data(data)
-    if not is_valid:
-        return jsonify({"error": error_msg}), 400
+    errors = student_errors(data)
+    if errors:
+        return validation_error(errors)
 
     new_id = create_student(data)
     if new_id:
@@ -80,6 +193,397 @@ def add_student():
     else:
         return jsonify({"error": "Email already exists"}), 409
 
+@student_bp.route('/api/students/bulk', methods=['POST'])
+def add_students_bulk():
+    """
+    Create many students in a single transaction
+    ---
+    tags: [Students]
+    parameters:
+      - name: mode
+        in: query
+        type: string
+        enum: [atomic, best_effort]
+        default: atomic
+        description: atomic = all or nothing, best_effort = insert every valid row
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            mode: {type: string}
+            students:
+              type: array
+              items:
+                $ref: '#/definitions/StudentInput'
+    responses:
+      201: {description: All records created}
+      207: {description: Best effort, some records rejected (see results)}
+      400: {description: Invalid Data (atomic batch rolled back)}
+      409: {description: Email Conflict (atomic batch rolled back)}
+      413: {description: Too many records}
+    """
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        records = data.get('students')
+        mode = request.args.get('mode', data.get('mode', 'atomic'))
+    else:
+        records = data
+        mode = request.args.get('mode', 'atomic')
+
+    if not isinstance(records, list) or not records:
+        return jsonify({"error": "Provide a non-empty list of students"}), 400
+    if mode not in BULK_MODES:
+        return jsonify({"error": f"mode must be one of: {', '.join(BULK_MODES)}"}), 400
+    if len(records) > MAX_BULK_RECORDS:
+        return jsonify({"error": f"At most {MAX_BULK_RECORDS} records per call"}), 413
+
+    result = create_students_bulk(records, mode)
+    statuses = {r["status"] for r in result["results"]}
+    if result["committed"] and result["failed"] == 0:
+        return jsonify(result), 201
+    if result["committed"]:
+        return jsonify(result), 207
+    if statuses & {"invalid", "error"}:
+        return jsonify(result), 400
+    return jsonify(result), 409
+
+def parse_bulk_selection(data):
+    """
+    Row selection of a bulk write body: {"ids": [...]} or {"filter": {...}}.
+    Returns: (ids, filters) with exactly one of them set.
+    Raises: ValueError with a user-facing message.
+    """
+    ids = data.get('ids')
+    filter_args = data.get('filter')
+    if (ids is None) == (filter_args is None):
+        raise ValueError("Provide either ids or filter")
+    if ids is not None:
+        if not isinstance(ids, list) or not ids or \
+                not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            raise ValueError("ids must be a non-empty list of integers")
+        return ids, None
+    if not isinstance(filter_args, dict):
+        raise ValueError("filter must be an object")
+    unknown = sorted(set(filter_args) - set(FILTERS))
+    if unknown:
+        raise ValueError(f"Unknown filter: {', '.join(unknown)}. Allowed: {', '.join(FILTERS)}")
+    return None, parse_filters(filter_args)
+
+
+def bulk_write(action):
+    """Shared body parsing / error mapping of the set-based write endpoints."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "No data provided"}), 400
+    try:
+        ids, filters = parse_bulk_selection(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if ids is not None and len(ids) > MAX_BULK_RECORDS:
+        return jsonify({"error": f"At most {MAX_BULK_RECORDS} ids per call"}), 413
+
+    try:
+        result = action(data, ids, filters, bool(data.get('return_ids', False)))
+    except sqlite3.IntegrityError as e:
+        return jsonify({"error": f"Update rejected, nothing was changed: {e}"}), 409
+    if isinstance(result, tuple):
+        return result  # Validation error from `action`
+    return jsonify(result), 200
+
+@student_bp.route('/api/students/bulk', methods=['PATCH'])
+def update_students_bulk_route():
+    """
+    Update many students with one set-based UPDATE
+    ---
+    tags: [Students]
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            ids: {type: array, items: {type: integer}, description: Explicit ids (any status)}
+            filter: {type: object, description: 'List filters, e.g. {"major": "Math", "semester_max": 8}'}
+            is_active: {type: boolean, default: true, description: Status the filter applies to}
+            set: {$ref: '#/definitions/StudentUpdate'}
+            semester_increment: {type: integer, description: Added to every semester (kept within 1-12)}
+            return_ids: {type: boolean, default: false}
+    responses:
+      200: {description: "Affected count (and ids when return_ids is true)"}
+      400: {description: Invalid selection or values}
+      409: {description: Constraint violation (nothing changed)}
+      413: {description: Too many ids}
+    """
+    def action(data, ids, filters, return_ids):
+        changes = data.get('set') or {}
+        increment = data.get('semester_increment', 0)
+        if not isinstance(changes, dict):
+            return jsonify({"error": "set must be an object"}), 400
+        unknown = sorted(set(changes) - set(UPDATABLE_COLUMNS))
+        if unknown:
+            return jsonify({"error": f"Cannot update: {', '.join(unknown)}"}), 400
+        if not isinstance(increment, int) or isinstance(increment, bool):
+            return jsonify({"error": "semester_increment must be an integer"}), 400
+        if not changes and not increment:
+            return jsonify({"error": "Nothing to update: provide set and/or semester_increment"}), 400
+        errors = student_errors(changes, is_update=True)
+        if errors:
+            return validation_error(errors)
+
+        is_active = data.get('is_active')
+        if filters is not None and is_active is None:
+            is_active = True
+        if is_active is not None:
+            is_active = str(is_active).lower() != 'false'
+        return update_students_bulk(changes, ids, filters, is_active, increment, return_ids)
+
+    return bulk_write(action)
+
+@student_bp.route('/api/students/bulk/delete', methods=['POST'])
+def delete_students_bulk_route():
+    """
+    Soft delete many students with one set-based UPDATE
+    ---
+    tags: [Students]
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            ids: {type: array, items: {type: integer}}
+            filter: {type: object, description: List filters applied to active students}
+            return_ids: {type: boolean, default: false}
+    responses:
+      200: {description: "Number of students deleted (already inactive ones are not counted)"}
+      400: {description: Invalid selection}
+      413: {description: Too many ids}
+    """
+    return bulk_write(lambda data, ids, filters, return_ids: delete_students_bulk(ids, filters, return_ids))
+
+@student_bp.route('/api/students/bulk/restore', methods=['POST'])
+def restore_students_bulk_route():
+    """
+    Restore many soft-deleted students with one set-based UPDATE
+    ---
+    tags: [Students]
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            ids: {type: array, items: {type: integer}}
+            filter: {type: object, description: List filters applied to deleted students}
+            return_ids: {type: boolean, default: false}
+    responses:
+      200: {description: "Number of students restored (already active ones are not counted)"}
+      400: {description: Invalid selection}
+      413: {description: Too many ids}
+    """
+    return bulk_write(lambda data, ids, filters, return_ids: restore_students_bulk(ids, filters, return_ids))
+
+@student_bp.route('/api/students/stats', methods=['GET'])
+def student_stats():
+    """
+    Dashboard statistics: counts and GPA per major, semester and enrollment-year histograms
+    ---
+    tags: [Students]
+    parameters:
+      - name: is_active
+        in: query
+        type: boolean
+        default: true
+    responses:
+      200: {description: Aggregated statistics}
+    """
+    return jsonify(get_student_stats(request.args.get('is_active', 'true'))), 200
+
+@student_bp.route('/api/students/export', methods=['GET'])
+def export_students():
+    """
+    Stream the whole students table as NDJSON or CSV
+    ---
+    tags: [Students]
+    parameters:
+      - name: format
+        in: query
+        type: string
+        enum: [ndjson, csv]
+        default: ndjson
+      - name: is_active
+        in: query
+        type: string
+        enum: ['true', 'false', 'all']
+        default: 'true'
+    produces: [application/x-ndjson, text/csv]
+    responses:
+      200: {description: Streamed rows}
+      400: {description: Unknown format}
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    is_active = request.args.get('is_active', 'true')
+
+    chunks = export_chunks(iter_student_batches(is_active), export_format)
+    return Response(chunks, mimetype=EXPORT_FORMATS[export_format], headers={
+        "Content-Disposition": f"attachment; filename=students.{export_format}"
+    })
+
+@student_bp.route('/api/students/import', methods=['POST'])
+def import_students_upload():
+    """
+    Stream-import students from a CSV or NDJSON upload
+    ---
+    tags: [Students]
+    consumes: [multipart/form-data, text/csv, application/x-ndjson]
+    parameters:
+      - name: file
+        in: formData
+        type: file
+        description: Upload as multipart field "file" (or send the raw file as the request body)
+      - name: format
+        in: query
+        type: string
+        enum: [csv, ndjson]
+        description: Defaults to the file extension, then csv
+      - name: chunk_size
+        in: query
+        type: integer
+        default: 1000
+        description: Rows per committed transaction
+      - name: import_id
+        in: query
+        type: string
+        description: Resume an interrupted import (re-send the same file)
+    responses:
+      200: {description: Import finished (see created/rejected and rejected_rows)}
+      400: {description: Invalid parameters, or a file that is not UTF-8 text}
+    """
+    upload = request.files.get('file')
+    filename = upload.filename if upload else None
+    import_format = request.args.get('format')
+    if not import_format and filename and '.' in filename:
+        import_format = filename.rsplit('.', 1)[1].lower()
+    import_format = import_format or 'csv'
+    chunk_size = request.args.get('chunk_size', DEFAULT_CHUNK_SIZE, type=int)
+
+    if import_format not in IMPORT_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(IMPORT_FORMATS)}"}), 400
+    if not 1 <= chunk_size <= MAX_CHUNK_SIZE:
+        return jsonify({"error": f"chunk_size must be between 1 and {MAX_CHUNK_SIZE}"}), 400
+
+    rejected_rows = []
+    def on_reject(row_number, record, error):
+        if len(rejected_rows) < MAX_REPORTED_REJECTS:
+            rejected_rows.append({"row": row_number, "error": error, "record": record})
+
+    stream = upload.stream if upload else request.stream
+    try:
+        result = import_students(stream, import_format, chunk_size,
+                                 import_id=request.args.get('import_id'), source=filename, on_reject=on_reject)
+    except (UnicodeDecodeError, csv.Error) as e:
+        # Chunks before the bad line stay committed; the run is left 'interrupted'
+        return jsonify({"error": f"Could not read the upload as UTF-8 {import_format}: {e}"}), 400
+    result["rejected_rows"] = rejected_rows
+    return jsonify(result), 200
+
+@student_bp.route('/api/students/import/<import_id>', methods=['GET'])
+def import_status(import_id):
+    """
+    Progress of a streaming import
+    ---
+    tags: [Students]
+    parameters:
+      - name: import_id
+        in: path
+        type: string
+        required: true
+    responses:
+      200: {description: Import run (status, rows_committed, created, rejected)}
+      404: {description: Not found}
+    """
+    run = get_import_run(import_id)
+    if run:
+        return jsonify(run), 200
+    return jsonify({"error": "Import not found"}), 404
+
+@student_bp.route('/api/students/search', methods=['GET'])
+def search_students_route():
+    """
+    Full-text search by name, email or major (prefix matching, best first)
+    ---
+    tags: [Students]
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: Words to look for, e.g. "hern" or "ana silva"
+      - name: limit
+        in: query
+        type: integer
+        default: 20
+      - name: is_active
+        in: query
+        type: boolean
+        default: true
+    responses:
+      200: {description: Matching students}
+      400: {description: Missing query}
+    """
+    text = request.args.get('q', '')
+    limit = request.args.get('limit', 20, type=int)
+    is_active = request.args.get('is_active', 'true')
+
+    students = search_students(text, max(limit, 1), is_active)
+    if students is None:
+        return jsonify({"error": "Query parameter q is required"}), 400
+    return jsonify({"query": text, "count": len(students), "students": students}), 200
+
+@student_bp.route('/api/students/changes', methods=['GET'])
+def student_changes():
+    """
+    Change feed for incremental sync
+    ---
+    tags: [Students]
+    description: >
+      Poll with the returned next_since until has_more is false. Every entry
+      carries the student's current row (treat it as an upsert). For a first
+      sync, read latest_seq, export the students, then poll since latest_seq.
+    parameters:
+      - name: since
+        in: query
+        type: integer
+        default: 0
+        description: Last seq already processed
+      - name: limit
+        in: query
+        type: integer
+        default: 500
+    responses:
+      200: {description: "Changes after since, oldest first"}
+      400: {description: Invalid since/limit}
+      410: {description: Changes after since were dropped by retention; resync}
+    """
+    since = request.args.get('since', 0, type=int)
+    limit = request.args.get('limit', DEFAULT_CHANGES_LIMIT, type=int)
+    if since < 0:
+        return jsonify({"error": "since must be >= 0"}), 400
+    if not 1 <= limit <= MAX_CHANGES_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {MAX_CHANGES_LIMIT}"}), 400
+
+    try:
+        return jsonify(get_changes(since, limit)), 200
+    except ChangesExpired as e:
+        return jsonify({"error": str(e), "horizon": e.horizon}), 410
+
 # --- NEW ENDPOINTS (PART B) ---
 
 @student_bp.route('/api/students/<int:id>', methods=['GET'])
@@ -93,16 +597,30 @@ def get_student(id):
         in: path
         type: integer
         required: true
+      - name: If-None-Match
+        in: header
+        type: string
     responses:
       200:
-        description: Student information
+        description: Student information (strong ETag, Last-Modified)
+      304:
+        description: Not Modified
       404:
         description: Student not found
     """
-    student = get_student_by_id(id)
-    if student:
-        return jsonify(student), 200
-    return jsonify({"error": "Student not found"}), 404
+    student, etag = get_student_entry(id)
+    if not student:
+        return jsonify({"error": "Student not found"}), 404
+
+    last_modified = parse_timestamp(student.get('updated_at'))
+    if is_not_modified(etag, last_modified):
+        return not_modified(etag, last_modified=last_modified)
+
+    response = jsonify(student)
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    return response, 200
 
 @student_bp.route('/api/students/<int:id>', methods=['PUT'])
 def update_student_full(id):
@@ -115,34 +633,45 @@ def update_student_full(id):
         in: path
         type: integer
         required: true
+      - name: If-Match
+        in: header
+        type: string
+        description: ETag from a previous GET; the write only applies if the row is unchanged
       - name: body
         in: body
         required: true
         schema:
-          type: object
-          properties:
-            first_name: {type: string}
-            last_name: {type: string}
-            email: {type: string}
-            major: {type: string}
-            semester: {type: integer}
-            gpa: {type: number}
+          $ref: '#/definitions/StudentUpdate'
     responses:
       200: {description: Updated}
       400: {description: Validation Error}
       404: {description: Not Found}
+      409: {description: Email Conflict}
+      412: {description: Precondition Failed (If-Match is stale)}
+      503: {description: Write queue backed up (WRITE_QUEUE=true); retry after Retry-After}
     """
     data = request.get_json()
     
     # Validation (is_update=True allows partial checks logic, but PUT usually expects all fields. 
     # For simplicity, we just check data validity like GPA range)
-    is_valid, error_msg = validate_student_data(data, is_update=True)
-    if not is_valid:
-        return jsonify({"error": error_msg}), 400
+    errors = student_errors(data, is_update=True)
+    if errors:
+        return validation_error(errors)
 
-    updated_student = update_student(id, data)
+    try:
+        expected_version = if_match_version(id)
+    except ValueError:
+        return precondition_failed(id)
+    try:
+        updated_student = update_student(id, data, expected_version)
+    except VersionConflict as e:
+        return precondition_failed(id, e.current_version)
+    except DuplicateEmail:
+        return jsonify({"error": "Email already exists"}), 409
+    except sqlite3.IntegrityError as e:
+        return jsonify({"error": f"Update rejected: {e}"}), 400
     if updated_student:
-        return jsonify({"message": "Student updated", "student": updated_student}), 200
+        return updated_response(updated_student)
     return jsonify({"error": "Student not found"}), 404
 
 @student_bp.route('/api/students/<int:id>', methods=['PATCH'])
@@ -156,24 +685,40 @@ def update_student_partial(id):
         in: path
         type: integer
         required: true
+      - name: If-Match
+        in: header
+        type: string
+        description: ETag from a previous GET; the write only applies if the row is unchanged
       - name: body
         in: body
         schema:
-          type: object
-          properties:
-            major: {type: string}
-            gpa: {type: number}
+          $ref: '#/definitions/StudentUpdate'
     responses:
       200: {description: Updated}
+      400: {description: Validation Error}
+      409: {description: Email Conflict}
+      412: {description: Precondition Failed (If-Match is stale)}
+      503: {description: Write queue backed up (WRITE_QUEUE=true); retry after Retry-After}
     """
     data = request.get_json()
-    is_valid, error_msg = validate_student_data(data, is_update=True)
-    if not is_valid:
-        return jsonify({"error": error_msg}), 400
+    errors = student_errors(data, is_update=True)
+    if errors:
+        return validation_error(errors)
 
-    updated_student = update_student(id, data)
+    try:
+        expected_version = if_match_version(id)
+    except ValueError:
+        return precondition_failed(id)
+    try:
+        updated_student = update_student(id, data, expected_version)
+    except VersionConflict as e:
+        return precondition_failed(id, e.current_version)
+    except DuplicateEmail:
+        return jsonify({"error": "Email already exists"}), 409
+    except sqlite3.IntegrityError as e:
+        return jsonify({"error": f"Update rejected: {e}"}), 400
     if updated_student:
-        return jsonify({"message": "Student updated", "student": updated_student}), 200
+        return updated_response(updated_student)
     return jsonify({"error": "Student not found"}), 404
 
 @student_bp.route('/api/students/<int:id>', methods=['DELETE'])
@@ -187,11 +732,24 @@ def delete_student_record(id):
         in: path
         type: integer
         required: true
+      - name: If-Match
+        in: header
+        type: string
+        description: ETag from a previous GET; the write only applies if the row is unchanged
     responses:
       200: {description: Student deleted (inactive)}
       404: {description: Not found}
+      412: {description: Precondition Failed (If-Match is stale)}
+      503: {description: Write queue backed up (WRITE_QUEUE=true); retry after Retry-After}
     """
-    success = delete_student(id)
+    try:
+        expected_version = if_match_version(id)
+    except ValueError:
+        return precondition_failed(id)
+    try:
+        success = delete_student(id, expected_version)
+    except VersionConflict as e:
+        return precondition_failed(id, e.current_version)
     if success:
         return jsonify({"message": "Student deleted successfully"}), 200
     return jsonify({"error": "Student not found"}), 404
@@ -207,11 +765,24 @@ def restore_student_record(id):
         in: path
         type: integer
         required: true
+      - name: If-Match
+        in: header
+        type: string
+        description: ETag from a previous GET; the write only applies if the row is unchanged
     responses:
       200: {description: Student restored}
       404: {description: Not found}
+      412: {description: Precondition Failed (If-Match is stale)}
+      503: {description: Write queue backed up (WRITE_QUEUE=true); retry after Retry-After}
     """
-    success = restore_student(id)
+    try:
+        expected_version = if_match_version(id)
+    except ValueError:
+        return precondition_failed(id)
+    try:
+        success = restore_student(id, expected_version)
+    except VersionConflict as e:
+        return precondition_failed(id, e.current_version)
     if success:
         return jsonify({"message": "Student restored successfully"}), 200
     return jsonify({"error": "Student not found"}), 404
@@ -0,0 +1,109 @@
+from flask import Blueprint, jsonify, request
+from app.database.db_config import get_pool
+from app.controllers.student_controller import student_cache, group_writer
+from app.controllers.student_replica import student_replica
+from app.controllers.jobs_controller import job_runner
+from app.utils.metrics import metrics_response
+from app.utils.sql_profiler import sql_profiler
+
+system_bp = Blueprint('system_bp', __name__)
+
+@system_bp.route('/api/system/pool', methods=['GET'])
+def pool_stats():
+    """
+    Database connection pool statistics
+    ---
+    tags: [System]
+    responses:
+      200: {description: Pool size, checkouts and waits}
+    """
+    return jsonify(get_pool().stats()), 200
+
+@system_bp.route('/api/system/cache', methods=['GET'])
+def cache_stats():
+    """
+    Student cache statistics
+    ---
+    tags: [System]
+    responses:
+      200: {description: Hits, misses, evictions and invalidations of the get-by-id cache}
+    """
+    return jsonify(student_cache.stats()), 200
+
+@system_bp.route('/api/system/write-queue', methods=['GET'])
+def write_queue_stats():
+    """
+    Group-commit writer statistics (start the app with WRITE_QUEUE=true)
+    ---
+    tags: [System]
+    responses:
+      200: {description: Batches, operations per batch and queue depth}
+    """
+    return jsonify(group_writer.stats()), 200
+
+@system_bp.route('/api/system/replica', methods=['GET'])
+def replica_stats():
+    """
+    In-memory students replica statistics (start the app with STUDENT_REPLICA=true)
+    ---
+    tags: [System]
+    responses:
+      200: {description: Rows held, synced version, full loads and incremental refreshes}
+    """
+    return jsonify(student_replica.stats()), 200
+
+@system_bp.route('/api/system/jobs', methods=['GET'])
+def job_runner_stats():
+    """
+    Background job runner statistics
+    ---
+    tags: [System]
+    responses:
+      200: {description: Thread and process slots and jobs in flight in this worker}
+    """
+    return jsonify(job_runner.stats()), 200
+
+@system_bp.route('/api/system/sql-profile', methods=['GET'])
+def sql_profile():
+    """
+    SQL profiler report (start the app with SQL_PROFILER=true)
+    ---
+    tags: [System]
+    parameters:
+      - name: limit
+        in: query
+        type: integer
+        default: 50
+      - name: reset
+        in: query
+        type: boolean
+        default: false
+        description: Clear the collected data after reading it
+    responses:
+      200: {description: "Statements by total time (with plans), slow log, N+1 and repeated-read findings"}
+    """
+    report = sql_profiler.report(max(request.args.get('limit', 50, type=int), 1))
+    if request.args.get('reset', 'false').lower() == 'true':
+        sql_profiler.reset()
+    return jsonify(report), 200
+
+@system_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    Request metrics in Prometheus text format
+    ---
+    tags: [System]
+    produces: [text/plain]
+    responses:
+      200: {description: "Per-route request counts, latency / DB time / SQL count histograms, in-flight gauges"}
+    """
+    pool = get_pool().stats()
+    cache = student_cache.stats()
+    return metrics_response(gauges=(
+        ('db_pool_connections', 'gauge', "Open pooled connections.", pool['size']),
+        ('db_pool_connections_in_use', 'gauge', "Pooled connections checked out.", pool['in_use']),
+        ('db_pool_waits_total', 'counter', "Checkouts that had to wait for a free connection.", pool['waits']),
+        ('student_cache_hits_total', 'counter', "get-by-id cache hits.", cache['hits']),
+        ('student_cache_misses_total', 'counter', "get-by-id cache misses.", cache['misses']),
+        ('student_cache_entries', 'gauge', "Entries in the get-by-id cache.", cache['size']),
+    ))
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Returned by LRUCache.get() on a miss, so that None can be cached (404s)
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Bounded, thread-safe LRU cache with a per-entry TTL.
+
+    The cache also remembers the database `version` its entries were read at.
+    sync(version) drops everything when another process changed the table;
+    invalidate(keys, version) drops only `keys` after a write made here.
+    """
+
+    def __init__(self, max_size=10000, ttl=60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.version = None
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def configure(self, max_size, ttl):
+        """Resize (0 disables the cache) and change the TTL."""
+        with self._lock:
+            self.max_size = max_size
+            self.ttl = ttl
+            while len(self._data) > max(max_size, 0):
+                self._data.popitem(last=False)
+
+    def get(self, key):
+        """Return the cached value or MISSING."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, version):
+        """Store `value` read at `version`; ignored if the table changed meanwhile."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if version != self.version:
+                return
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def sync(self, version):
+        """Adopt the database version; a version we did not write ourselves clears the cache."""
+        with self._lock:
+            if version != self.version:
+                if self._data:
+                    self.invalidations += len(self._data)
+                    self._data.clear()
+                self.version = version
+
+    def invalidate(self, keys, version):
+        """
+        Drop `keys` after a local write that moved the table to `version`.
+        If nobody else wrote in between (version is ours + 1) the other
+        entries stay valid; otherwise the next sync() clears them.
+        """
+        with self._lock:
+            for key in keys:
+                if self._data.pop(key, None) is not None:
+                    self.invalidations += 1
+            if self.version is not None and version == self.version + 1:
+                self.version = version
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.version = None
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
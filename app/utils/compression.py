@@ -0,0 +1,104 @@
+import zlib
+
+from flask import current_app, request
+
+from app.utils.http_cache import GZIP_ETAG_SUFFIX
+
+# gzip for JSON pages, exports and /metrics (COMPRESSION=true, the default):
+#   - only when Accept-Encoding allows gzip (q=0 refuses it),
+#   - buffered bodies under COMPRESSION_MIN_SIZE bytes go out as they are
+#     (the gzip header alone is 18 bytes; tiny bodies only cost CPU),
+#   - streamed bodies (export) are compressed chunk by chunk as they are
+#     produced, each chunk flushed so the client keeps receiving rows,
+#   - a gzip body is another representation, so its ETag gets a "-gzip"
+#     suffix (RFC 9110: strong validators must differ per encoding). The
+#     If-Match / If-None-Match checks strip it, so either tag still names the
+#     same row version; a 304 echoes the suffixed tag the client revalidated.
+#     Vary: Accept-Encoding keeps shared caches from mixing the two.
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html')
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_LEVEL = 6
+
+_GZIP_WBITS = 16 + zlib.MAX_WBITS  # zlib stream with a gzip header and trailer
+
+
+def accepts_gzip():
+    """True if the request's Accept-Encoding allows gzip (directly or via "*")."""
+    return request.accept_encodings.quality('gzip') > 0
+
+
+def gzip_bytes(data, level=DEFAULT_LEVEL):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _GZIP_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def gzip_stream(chunks, level=DEFAULT_LEVEL):
+    """
+    Compress an iterable of str/bytes chunks incrementally.
+    Yields: gzip bytes; every input chunk is sync-flushed, so nothing waits
+    for the end of the stream. The source is closed even if the client disconnects.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _GZIP_WBITS)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if not chunk:
+                continue
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def _encoded_etag(response):
+    """Give the ETag of a now gzip-encoded response its suffix."""
+    tag, weak = response.get_etag()
+    if tag and not tag.endswith(GZIP_ETAG_SUFFIX):
+        response.set_etag(tag + GZIP_ETAG_SUFFIX, weak=weak)
+
+
+def _after_request(response):
+    if response.status_code == 304:
+        # No body to encode: answer with the tag of the representation the client holds
+        tag, _ = response.get_etag()
+        if tag and not request.if_none_match.star_tag and request.if_none_match.contains_weak(tag + GZIP_ETAG_SUFFIX):
+            _encoded_etag(response)
+        return response
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or 'no-transform' in response.headers.get('Cache-Control', '')):
+        return response
+
+    # The representation depends on Accept-Encoding even when this one is not compressed
+    response.vary.add('Accept-Encoding')
+    if not accepts_gzip():
+        return response
+
+    level = current_app.config['COMPRESSION_LEVEL']
+    if response.is_streamed:
+        response.response = gzip_stream(response.response, level)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < current_app.config['COMPRESSION_MIN_SIZE']:
+            return response
+        response.set_data(gzip_bytes(data, level))
+    response.headers['Content-Encoding'] = 'gzip'
+    _encoded_etag(response)
+    return response
+
+
+def init_app(app):
+    """
+    Register the compression hook. Register it after the other after_request
+    hooks (Flask runs them in reverse), so request metrics include its CPU time.
+    """
+    level = app.config['COMPRESSION_LEVEL']
+    if not 1 <= level <= 9:
+        raise ValueError("COMPRESSION_LEVEL must be between 1 and 9")
+    app.after_request(_after_request)
@@ -0,0 +1,48 @@
+import json
+import os
+
+from app.utils.validators import swagger_definitions
+
+# Swagger UI at /apidocs, spec at /apispec_1.json. DOCS_MODE picks how:
+#   dynamic  -> flasgger parses the route docstrings on the first spec request
+#   prebuilt -> the spec is read from APISPEC_PATH (`python manage.py build-apispec`),
+#               so workers never parse YAML; debug mode still rebuilds it live
+#   off      -> flasgger is not even imported (its import alone is ~60 ms)
+DOCS_MODES = ('dynamic', 'prebuilt', 'off')
+SPEC_ENDPOINT = 'apispec_1'
+DEFAULT_APISPEC_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'apispec.json')
+
+
+def init_docs(app):
+    """
+    Register the Swagger UI according to app.config['DOCS_MODE'].
+    Returns: the flasgger.Swagger instance, or None when docs are off.
+    """
+    mode = app.config['DOCS_MODE']
+    if mode not in DOCS_MODES:
+        raise ValueError(f"DOCS_MODE must be one of: {', '.join(DOCS_MODES)}")
+    if mode == 'off':
+        return None
+
+    from flasgger import Swagger
+    swagger = Swagger(app, template={'definitions': swagger_definitions()})
+
+    if mode == 'prebuilt':
+        path = app.config['APISPEC_PATH']
+        try:
+            with open(path) as f:
+                # flasgger serves apispecs[endpoint] as-is once it is filled
+                swagger.apispecs[SPEC_ENDPOINT] = json.load(f)
+        except (OSError, ValueError) as e:
+            app.logger.warning("Prebuilt API spec unavailable (%s); docs will be built on first request", e)
+    return swagger
+
+
+def build_apispec(app):
+    """The full spec of `app`, exactly as /apispec_1.json would serve it in dynamic mode."""
+    swagger = getattr(app, 'swag', None)  # Set by flasgger's init_app
+    if swagger is None:
+        raise RuntimeError("Docs are off for this app (DOCS_MODE=off)")
+    swagger.apispecs.pop(SPEC_ENDPOINT, None)
+    with app.test_request_context():
+        return swagger.get_apispecs(SPEC_ENDPOINT)
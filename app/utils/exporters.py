@@ -0,0 +1,38 @@
+import csv
+import io
+import json
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def ndjson_chunks(batches):
+    """Turn (columns, rows) batches into NDJSON text, one chunk per batch."""
+    for columns, rows in batches:
+        yield ''.join(json.dumps(dict(zip(columns, row)), separators=(',', ':')) + '\n' for row in rows)
+
+
+def csv_chunks(batches):
+    """Turn (columns, rows) batches into CSV text (header first), one chunk per batch."""
+    header_sent = False
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for columns, rows in batches:
+        if not header_sent:
+            writer.writerow(columns)
+            header_sent = True
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if not header_sent:
+        yield ''
+
+
+def export_chunks(batches, export_format):
+    """Pick the serializer for `export_format` (a key of EXPORT_FORMATS)."""
+    if export_format == 'csv':
+        return csv_chunks(batches)
+    return ndjson_chunks(batches)
@@ -0,0 +1,73 @@
+import zlib
+from datetime import datetime, timezone
+
+from flask import Response, request
+
+# Appended to the ETag of a gzip-encoded body (see utils.compression): it is a
+# different representation, so it needs a different strong validator. The
+# checks below strip it, so either tag validates the same row version.
+GZIP_ETAG_SUFFIX = '-gzip'
+
+
+def list_etag(version, args):
+    """
+    Weak ETag for a list response: the table change counter plus the query
+    string, so it can be computed (and matched) before running the query.
+    """
+    query = '&'.join(f"{key}={value}" for key, value in sorted(args.items(multi=True)))
+    return f"{version}-{zlib.crc32(query.encode()):08x}"
+
+
+def parse_timestamp(value):
+    """SQLite CURRENT_TIMESTAMP text (UTC) -> aware datetime, or None."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value[:19], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def strip_encoding(tag):
+    """Entity tag without the content-coding suffix added by the compression hook."""
+    return tag[:-len(GZIP_ETAG_SUFFIX)] if tag.endswith(GZIP_ETAG_SUFFIX) else tag
+
+
+def is_not_modified(etag, last_modified=None):
+    """
+    Evaluate If-None-Match / If-Modified-Since for the current request.
+    If-Modified-Since is only considered when no If-None-Match was sent (RFC 9110).
+    """
+    if request.if_none_match:
+        if request.if_none_match.star_tag:
+            return True
+        return any(strip_encoding(tag) == etag for tag in request.if_none_match.as_set(include_weak=True))
+    if last_modified and request.if_modified_since:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def not_modified(etag, weak=False, last_modified=None):
+    """Empty 304 response carrying the validators."""
+    response = Response(status=304)
+    response.set_etag(etag, weak=weak)
+    if last_modified:
+        response.last_modified = last_modified
+    return response
+
+
+def if_match_version(resource_id):
+    """
+    Row version required by the request's If-Match header.
+    Entity tags are "<id>-<version>" (see student_etag), or "<id>-<version>-gzip"
+    for the compressed body; weak tags never match (If-Match uses the strong comparison).
+    Returns: int version, or None when there is no precondition (no header or "*").
+    Raises: ValueError if no listed tag belongs to `resource_id` -> answer 412.
+    """
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    for tag in request.if_match.as_set():
+        tag_id, _, version = strip_encoding(tag).rpartition('-')
+        if tag_id == str(resource_id) and version.isdigit():
+            return int(version)
+    raise ValueError("If-Match does not match the current representation")
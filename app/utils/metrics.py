@@ -0,0 +1,226 @@
+import bisect
+import threading
+import time
+
+from flask import Response, g, request
+
+# Request instrumentation exposed at /metrics (Prometheus text format 0.0.4).
+#
+# Every thread aggregates into its own _ThreadStats, so recording a request
+# takes no lock; /metrics sums the per-thread copies. Stats of threads that
+# have exited are folded into `retired` at collection time.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+UNMATCHED_ROUTE = '<unmatched>'  # 404s: one label instead of one per URL
+
+
+def _new_histogram(buckets):
+    # Per-bucket counts (last slot = above the highest bound), then the sum
+    return [0] * (len(buckets) + 1) + [0.0]
+
+
+def _observe(histograms, key, buckets, value):
+    histogram = histograms.get(key)
+    if histogram is None:
+        histogram = histograms[key] = _new_histogram(buckets)
+    histogram[bisect.bisect_left(buckets, value)] += 1
+    histogram[-1] += value
+
+
+def _merge_counts(target, source):
+    for key, value in source.items():
+        target[key] = target.get(key, 0) + value
+
+
+def _merge_histograms(target, source):
+    for key, histogram in source.items():
+        merged = target.get(key)
+        if merged is None:
+            target[key] = list(histogram)
+        else:
+            for i, value in enumerate(histogram):
+                merged[i] += value
+
+
+class _ThreadStats:
+    """Counters owned by one thread (only that thread writes them)."""
+
+    def __init__(self):
+        self.requests = {}      # (method, route, status) -> count
+        self.duration = {}      # (method, route) -> histogram (seconds)
+        self.db_time = {}       # (method, route) -> histogram (seconds)
+        self.sql_count = {}     # (method, route) -> histogram (statements)
+        self.in_flight = {}     # (method, route) -> requests started - finished
+        self.errors = {}        # kind -> count (database errors swallowed by controllers)
+        # Current request on this thread
+        self.request_sql = 0
+        self.request_db_time = 0.0
+
+    def merge_into(self, total):
+        _merge_counts(total.requests, dict(self.requests))
+        _merge_histograms(total.duration, dict(self.duration))
+        _merge_histograms(total.db_time, dict(self.db_time))
+        _merge_histograms(total.sql_count, dict(self.sql_count))
+        _merge_counts(total.in_flight, dict(self.in_flight))
+        _merge_counts(total.errors, dict(self.errors))
+
+
+class Metrics:
+    """Per-thread request metrics with a merged Prometheus rendering."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._threads = []              # [(thread, _ThreadStats)]
+        self._lock = threading.Lock()   # Guards _threads / retired, never the hot path
+        self.retired = _ThreadStats()
+        self.started_at = time.time()
+
+    def _stats(self):
+        stats = getattr(self._local, 'stats', None)
+        if stats is None:
+            stats = self._local.stats = _ThreadStats()
+            with self._lock:
+                self._threads.append((threading.current_thread(), stats))
+        return stats
+
+    def request_started(self, key):
+        stats = self._stats()
+        stats.request_sql = 0
+        stats.request_db_time = 0.0
+        stats.in_flight[key] = stats.in_flight.get(key, 0) + 1
+
+    def request_finished(self, key, status, seconds):
+        stats = self._stats()
+        stats.in_flight[key] -= 1
+        counter = key + (str(status),)
+        stats.requests[counter] = stats.requests.get(counter, 0) + 1
+        _observe(stats.duration, key, LATENCY_BUCKETS, seconds)
+        _observe(stats.db_time, key, LATENCY_BUCKETS, stats.request_db_time)
+        _observe(stats.sql_count, key, SQL_COUNT_BUCKETS, stats.request_sql)
+
+    def sql_executed(self, conn, sql, parameters, seconds):
+        """db_config statement observer: charge the statement to this thread's request."""
+        stats = self._stats()
+        stats.request_sql += 1
+        stats.request_db_time += seconds
+
+    def count_error(self, kind):
+        stats = self._stats()
+        stats.errors[kind] = stats.errors.get(kind, 0) + 1
+
+    def collect(self):
+        """Merged snapshot of every thread's stats."""
+        total = _ThreadStats()
+        with self._lock:
+            alive = []
+            for thread, stats in self._threads:
+                if thread.is_alive():
+                    alive.append((thread, stats))
+                else:
+                    stats.merge_into(self.retired)
+            self._threads = alive
+            self.retired.merge_into(total)
+            for _, stats in alive:
+                stats.merge_into(total)
+        return total
+
+
+metrics = Metrics()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _render_histogram(lines, name, help_text, histograms, buckets):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for (method, route), histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(buckets, histogram):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(method=method, route=route, le=bound)} {cumulative}")
+        count = cumulative + histogram[len(buckets)]
+        lines.append(f"{name}_bucket{_labels(method=method, route=route, le='+Inf')} {count}")
+        lines.append(f"{name}_sum{_labels(method=method, route=route)} {histogram[-1]:.6f}")
+        lines.append(f"{name}_count{_labels(method=method, route=route)} {count}")
+
+
+def render_metrics(gauges=()):
+    """
+    Prometheus text exposition of the request metrics.
+    Args:
+        gauges: Extra (name, type, help, value) samples, e.g. pool and cache stats.
+    """
+    stats = metrics.collect()
+    lines = [
+        "# HELP http_requests_total Requests by route, method and status code.",
+        "# TYPE http_requests_total counter",
+    ]
+    for (method, route, status), count in sorted(stats.requests.items()):
+        lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+    lines.append("# HELP http_requests_in_flight Requests currently being handled.")
+    lines.append("# TYPE http_requests_in_flight gauge")
+    for (method, route), count in sorted(stats.in_flight.items()):
+        lines.append(f"http_requests_in_flight{_labels(method=method, route=route)} {count}")
+
+    _render_histogram(lines, 'http_request_duration_seconds', "Time to build the response.",
+                      stats.duration, LATENCY_BUCKETS)
+    _render_histogram(lines, 'http_request_db_seconds', "Time spent in SQL statements per request.",
+                      stats.db_time, LATENCY_BUCKETS)
+    _render_histogram(lines, 'http_request_sql_statements', "SQL statements executed per request.",
+                      stats.sql_count, SQL_COUNT_BUCKETS)
+
+    lines.append("# HELP db_errors_total Database errors handled by the controllers.")
+    lines.append("# TYPE db_errors_total counter")
+    for kind, count in sorted(stats.errors.items()):
+        lines.append(f"db_errors_total{_labels(kind=kind)} {count}")
+
+    lines.append("# HELP process_start_time_seconds Start time of the process (unix epoch).")
+    lines.append("# TYPE process_start_time_seconds gauge")
+    lines.append(f"process_start_time_seconds {metrics.started_at:.3f}")
+    for name, metric_type, help_text, value in gauges:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.append(f"{name} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+def _request_key():
+    rule = request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE
+    return (request.method, rule)
+
+
+def _before_request():
+    g._metrics_key = _request_key()
+    g._metrics_started = time.perf_counter()
+    metrics.request_started(g._metrics_key)
+
+
+def _after_request(response):
+    key = g.pop('_metrics_key', None)
+    if key is not None:
+        # Streamed bodies (export) are timed up to the first byte
+        metrics.request_finished(key, response.status_code, time.perf_counter() - g._metrics_started)
+    return response
+
+
+def init_app(app):
+    """Register the request hooks and the SQL statement observer."""
+    from app.database import db_config
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    if metrics.sql_executed not in db_config.statement_observers:
+        db_config.statement_observers.append(metrics.sql_executed)
+
+
+def metrics_response(gauges=()):
+    return Response(render_metrics(gauges), content_type=CONTENT_TYPE)
@@ -0,0 +1,251 @@
+import collections
+import re
+import sqlite3
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+
+# Opt-in SQL profiler (SQL_PROFILER=true). Off by default: it takes a lock per
+# statement and runs EXPLAIN QUERY PLAN for slow ones.
+#
+#   timing      -> db_config.statement_observers (every execute/executemany/commit)
+#   tracing     -> sqlite3 set_trace_callback on each pooled connection, which also
+#                  sees what the timing wrapper cannot: implicit BEGINs and the
+#                  statements run inside triggers
+#   per request -> statement counts, DB time and repeated statements (N+1)
+
+DEFAULT_SLOW_MS = 50.0
+DEFAULT_SLOW_LOG_SIZE = 100
+# The same statement this many times in one request is reported as N+1;
+# a SELECT run twice in one request (e.g. read, write, read the row back)
+# is reported as a repeated read.
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+MAX_STATEMENTS = 2000  # Distinct normalized statements kept
+HEADER = 'X-SQL-Profile'
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+_EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REPLACE')
+
+
+def normalize_sql(sql):
+    """Collapse literals and whitespace so the same query shape aggregates together."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(?, ...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+class _RequestTrace:
+    """Statements seen by one request (owned by the thread handling it)."""
+
+    def __init__(self):
+        self.statements = 0
+        self.traced = 0
+        self.db_time = 0.0
+        self.slow = 0
+        self.counts = collections.Counter()
+
+
+class SQLProfiler:
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_ms = DEFAULT_SLOW_MS
+        self.n_plus_one_threshold = DEFAULT_N_PLUS_ONE_THRESHOLD
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset(DEFAULT_SLOW_LOG_SIZE)
+
+    def configure(self, enabled, slow_ms=DEFAULT_SLOW_MS, slow_log_size=DEFAULT_SLOW_LOG_SIZE,
+                  n_plus_one_threshold=DEFAULT_N_PLUS_ONE_THRESHOLD):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.reset(slow_log_size)
+
+    def reset(self, slow_log_size=None):
+        with self._lock:
+            self._statements = {}   # normalized -> [calls, total_s, max_s]
+            self._triggers = collections.Counter()  # normalized -> statements run by triggers
+            self._plans = {}        # normalized -> list of plan lines
+            self._slow = collections.deque(maxlen=slow_log_size or self._slow.maxlen)
+            self._findings = {}     # (kind, route, normalized) -> {"requests", "max_calls"}
+
+    # --- Hooks ------------------------------------------------------------
+
+    def _trace(self):
+        return getattr(self._local, 'trace', None)
+
+    def statement_executed(self, conn, sql, parameters, seconds):
+        """db_config statement observer: aggregate timing, log slow statements."""
+        normalized = normalize_sql(sql)
+        with self._lock:
+            entry = self._statements.get(normalized)
+            if entry is None and len(self._statements) < MAX_STATEMENTS:
+                entry = self._statements[normalized] = [0, 0.0, 0.0]
+            if entry is not None:
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2] = max(entry[2], seconds)
+
+        trace = self._trace()
+        if trace is not None:
+            trace.statements += 1
+            trace.db_time += seconds
+            trace.counts[normalized] += 1
+
+        if seconds * 1000 >= self.slow_ms:
+            if trace is not None:
+                trace.slow += 1
+            self._log_slow(conn, sql, normalized, parameters, seconds)
+
+    def _log_slow(self, conn, sql, normalized, parameters, seconds):
+        plan = self._plans.get(normalized)
+        if plan is None and parameters is not None and normalized.split(' ', 1)[0].upper() in _EXPLAINABLE:
+            try:
+                # Straight to sqlite3 so the EXPLAIN is not timed/profiled itself
+                rows = sqlite3.Connection.execute(conn, f'EXPLAIN QUERY PLAN {sql}', parameters).fetchall()
+                plan = [row[3] for row in rows]
+            except sqlite3.Error as e:
+                plan = [f"(no plan: {e})"]
+            self._plans[normalized] = plan
+        with self._lock:
+            self._slow.append({
+                "statement": normalized,
+                "ms": round(seconds * 1000, 3),
+                "at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+                "route": g.get('_sql_profile_route') if has_request_context() else None,
+                "plan": plan,
+            })
+
+    def traced(self, statement):
+        """
+        set_trace_callback target: counts statements the timing hook cannot see.
+        Python's sqlite3 reports each statement a trigger runs as the (expanded)
+        outer statement again, so consecutive repeats of a write are trigger steps; they are
+        charged to the outer statement when the next one starts.
+        """
+        local = self._local
+        trace = getattr(local, 'trace', None)
+        if trace is not None:
+            trace.traced += 1
+        if statement == getattr(local, 'last_traced', None) and statement[:6].upper() != 'SELECT':
+            local.trigger_steps += 1
+            return
+        self._flush_trigger_steps()
+        local.last_traced = statement
+        local.trigger_steps = 0
+
+    def _flush_trigger_steps(self):
+        local = self._local
+        steps = getattr(local, 'trigger_steps', 0)
+        if steps:
+            normalized = normalize_sql(local.last_traced)
+            with self._lock:
+                self._triggers[normalized] += steps
+        local.last_traced = None
+        local.trigger_steps = 0
+
+    def install(self, conn):
+        """db_config connection hook."""
+        conn.set_trace_callback(self.traced)
+
+    def request_started(self):
+        self._local.trace = _RequestTrace()
+
+    def request_finished(self, route):
+        """Close the request trace. Returns: its summary dict."""
+        self._flush_trigger_steps()
+        trace = self._trace()
+        self._local.trace = None
+        if trace is None:
+            return None
+        findings = []
+        for sql, calls in trace.counts.items():
+            if calls >= self.n_plus_one_threshold and sql != 'COMMIT':
+                findings.append(('n_plus_one', sql, calls))
+            elif calls >= 2 and sql[:6].upper() == 'SELECT':
+                findings.append(('repeated_read', sql, calls))
+        if findings:
+            with self._lock:
+                for kind, sql, calls in findings:
+                    finding = self._findings.setdefault((kind, route, sql), {"requests": 0, "max_calls": 0})
+                    finding["requests"] += 1
+                    finding["max_calls"] = max(finding["max_calls"], calls)
+        return {
+            "statements": trace.statements,
+            "traced": trace.traced,
+            "db_ms": round(trace.db_time * 1000, 3),
+            "slow": trace.slow,
+            "n_plus_one": sum(1 for kind, _, _ in findings if kind == 'n_plus_one'),
+            "repeated_reads": sum(1 for kind, _, _ in findings if kind == 'repeated_read'),
+        }
+
+    # --- Report -----------------------------------------------------------
+
+    def report(self, limit=50):
+        """JSON-ready profile: top statements by total time, slow log, N+1 / repeated-read findings."""
+        with self._lock:
+            statements = sorted(self._statements.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+            return {
+                "enabled": self.enabled,
+                "slow_ms": self.slow_ms,
+                "statements": [
+                    {
+                        "statement": sql,
+                        "calls": calls,
+                        "total_ms": round(total * 1000, 3),
+                        "avg_ms": round(total * 1000 / calls, 3),
+                        "max_ms": round(longest * 1000, 3),
+                        "plan": self._plans.get(sql),
+                    }
+                    for sql, (calls, total, longest) in statements
+                ],
+                "triggers": dict(self._triggers.most_common(limit)),
+                "slow": list(self._slow)[-limit:],
+                "findings": [
+                    {"kind": kind, "route": route, "statement": sql, **finding}
+                    for (kind, route, sql), finding in sorted(self._findings.items(),
+                                                              key=lambda item: item[1]["requests"], reverse=True)
+                ][:limit],
+            }
+
+
+sql_profiler = SQLProfiler()
+
+
+def _before_request():
+    g._sql_profile_route = f"{request.method} {request.url_rule.rule if request.url_rule else '<unmatched>'}"
+    sql_profiler.request_started()
+
+
+def _after_request(response):
+    summary = sql_profiler.request_finished(g.get('_sql_profile_route'))
+    # Checked per request: run.py turns debug on after create_app()
+    if summary is not None and (current_app.debug or current_app.config.get('SQL_PROFILER_HEADER')):
+        response.headers[HEADER] = '; '.join(f"{key}={value}" for key, value in summary.items())
+    return response
+
+
+def init_app(app):
+    """Enable profiling when app.config['SQL_PROFILER'] is set."""
+    from app.database import db_config
+    sql_profiler.configure(
+        app.config.get('SQL_PROFILER', False),
+        slow_ms=app.config.get('SQL_SLOW_MS', DEFAULT_SLOW_MS),
+        n_plus_one_threshold=app.config.get('SQL_N_PLUS_ONE_THRESHOLD', DEFAULT_N_PLUS_ONE_THRESHOLD),
+    )
+    hooks = ((db_config.statement_observers, sql_profiler.statement_executed),
+             (db_config.connection_hooks, sql_profiler.install))
+    for registry, hook in hooks:
+        if hook in registry:
+            registry.remove(hook)
+        if sql_profiler.enabled:
+            registry.append(hook)
+    if sql_profiler.enabled:
+        app.before_request(_before_request)
+        app.after_request(_after_request)
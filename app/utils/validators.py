@@ -1,43 +1,236 @@
 import re
+from datetime import date
+
+# Declarative description of a student record. compile_schema() turns it into
+# one check function per field once, at import time; the Swagger definitions
+# are generated from the same dict, so the docs and the validator agree.
+#   type      -> string | email | integer | number | date | boolean
+#   required  -> must be present on create (PATCH/PUT bodies are partial)
+#   nullable  -> null is accepted (only gpa: first-semester students have none)
+STUDENT_SCHEMA = {
+    'first_name': {'type': 'string', 'required': True, 'max_length': 100},
+    'last_name': {'type': 'string', 'required': True, 'max_length': 100},
+    'email': {'type': 'email', 'required': True, 'max_length': 150},
+    'major': {'type': 'string', 'required': True, 'max_length': 100},
+    'semester': {'type': 'integer', 'required': True, 'min': 1, 'max': 12, 'label': 'Semester'},
+    'gpa': {'type': 'number', 'nullable': True, 'min': 0.0, 'max': 4.0, 'label': 'GPA'},
+    'enrollment_date': {'type': 'date', 'required': True},
+    # Writable through PUT/PATCH and bulk `set`; ignored on create (new rows are active)
+    'is_active': {'type': 'boolean'},
+}
+
+EMAIL_PATTERN = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+_MISSING = object()
+
 
 def is_valid_email(email):
     """Check if email format is valid using Regex."""
-    pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-    return re.match(pattern, email) is not None
+    return isinstance(email, str) and EMAIL_PATTERN.match(email) is not None
+
+
+def _range_check(label, rule, native, convert, type_error):
+    low, high = rule.get('min'), rule.get('max')
+    range_error = f"{label} must be between {low} and {high}"
+
+    def check(value):
+        # JSON numbers skip the conversion; strings (CSV) and the like go through it
+        if type(value) not in native:
+            try:
+                value = convert(value)
+            except (TypeError, ValueError):
+                return type_error
+        if (low is not None and not value >= low) or (high is not None and not value <= high):
+            return range_error
+        return None
+    return check
+
+
+def _to_int(value):
+    # JSON/CSV input: 3, 3.0 and "3" are fine; True, 3.5 and "3.5" are not
+    if isinstance(value, bool):
+        raise TypeError(value)
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(value)
+        return int(value)
+    return int(value)
+
+
+def _to_float(value):
+    if isinstance(value, bool):
+        raise TypeError(value)
+    return float(value)
+
+
+def _compile_field(field, rule):
+    """Build the check for one field: check(value) -> error message or None."""
+    label = rule.get('label', field)
+    kind = rule['type']
+
+    if kind in ('string', 'email'):
+        max_length = rule.get('max_length')
+        type_error = f"{label} must be a non-empty string"
+        length_error = f"{label} must be at most {max_length} characters"
+        is_email = kind == 'email'
+
+        def check(value):
+            if type(value) is not str or not value.strip():
+                return type_error
+            if max_length is not None and len(value) > max_length:
+                return length_error
+            if is_email and EMAIL_PATTERN.match(value) is None:
+                return "Invalid email format"
+            return None
+        return check
+
+    if kind == 'integer':
+        return _range_check(label, rule, (int,), _to_int, f"{label} must be an integer")
+
+    if kind == 'number':
+        return _range_check(label, rule, (int, float), _to_float, f"{label} must be a number")
+
+    if kind == 'date':
+        date_error = f"{label} must be a valid date (YYYY-MM-DD)"
+
+        def check(value):
+            if type(value) is not str or DATE_PATTERN.match(value) is None:
+                return date_error
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                return date_error
+            return None
+        return check
+
+    if kind == 'boolean':
+        boolean_error = f"{label} must be true or false (or 1/0)"
+
+        def check(value):
+            # "0"/"1" come from CSV; any of these is stored as the integer 0/1
+            if value in (0, 1, '0', '1') and type(value) is not float:
+                return None
+            return boolean_error
+        return check
+
+    raise ValueError(f"Unknown type for {field}: {kind}")
+
+
+def compile_schema(schema):
+    """
+    Compile a schema dict into a validator.
+    Returns: validate(data, partial=False) -> dict {field: error message},
+             empty when the record is valid. Fields not in the schema are ignored.
+    """
+    required = frozenset(field for field, rule in schema.items() if rule.get('required'))
+    checks = tuple(
+        (field, _compile_field(field, rule), rule.get('nullable', False),
+         f"{rule.get('label', field)} cannot be null")
+        for field, rule in schema.items()
+    )
+
+    def validate(data, partial=False):
+        errors = {}
+        if not partial and not required <= data.keys():
+            for field in schema:
+                if field in required and field not in data:
+                    errors[field] = f"Missing required field: {field}"
+        for field, check, nullable, null_error in checks:
+            value = data.get(field, _MISSING)
+            if value is _MISSING:
+                continue
+            if value is None:
+                if not nullable:
+                    errors[field] = null_error
+                continue
+            error = check(value)
+            if error is not None:
+                errors[field] = error
+        return errors
+    return validate
+
+
+_validate_student = compile_schema(STUDENT_SCHEMA)
+
+
+def student_errors(data, is_update=False):
+    """
+    Every problem with a student record.
+    Returns: dict {field: error message}; empty when the record is valid.
+    """
+    if not isinstance(data, dict):
+        return {"body": "Student data must be a JSON object"}
+    return _validate_student(data, partial=is_update)
+
+
+def format_errors(errors):
+    return '; '.join(errors.values())
+
 
 def validate_student_data(data, is_update=False):
     """
     Validate student data against business rules.
-    Returns: (bool, str) -> (is_valid, error_message)
-    """
-    # 1. Validate required fields (only if it is a new creation)
-    required_fields = ['first_name', 'last_name', 'email', 'major', 'enrollment_date']
-    if not is_update:
-        for field in required_fields:
-            if field not in data:
-                return False, f"Missing required field: {field}"
-
-    # 2. Validate Email
-    if 'email' in data:
-        if not is_valid_email(data['email']):
-            return False, "Invalid email format"
-
-    # 3. Validate GPA (0.0 - 4.0)
-    if 'gpa' in data and data['gpa'] is not None:
-        try:
-            gpa = float(data['gpa'])
-            if not (0.0 <= gpa <= 4.0):
-                return False, "GPA must be between 0.0 and 4.0"
-        except ValueError:
-            return False, "GPA must be a number"
-
-    # 4. Validate Semester (1 - 12)
-    if 'semester' in data and data['semester'] is not None:
-        try:
-            semester = int(data['semester'])
-            if not (1 <= semester <= 12):
-                return False, "Semester must be between 1 and 12"
-        except ValueError:
-            return False, "Semester must be an integer"
-
-    return True, None
\ No newline at end of file
+    Returns: (bool, str) -> (is_valid, error_message listing every error)
+    """
+    errors = student_errors(data, is_update)
+    if errors:
+        return False, format_errors(errors)
+    return True, None
+
+
+def validate_students(records, is_update=False):
+    """
+    Validate a batch of records in one pass (bulk create, imports).
+    Returns: list aligned with `records`: None for a valid record,
+             else its {field: error message} dict.
+    """
+    validate = _validate_student
+    results = []
+    append = results.append
+    for record in records:
+        if not isinstance(record, dict):
+            append({"record": "Each record must be an object"})
+            continue
+        errors = validate(record, is_update)
+        append(errors or None)
+    return results
+
+
+_SWAGGER_TYPES = {
+    'string': {'type': 'string'},
+    'email': {'type': 'string', 'format': 'email'},
+    'integer': {'type': 'integer'},
+    'number': {'type': 'number'},
+    'date': {'type': 'string', 'format': 'date'},
+    'boolean': {'type': 'boolean'},
+}
+
+
+def swagger_definition(schema, partial=False):
+    """OpenAPI 2 object definition of a schema (partial=True drops `required`)."""
+    properties = {}
+    for field, rule in schema.items():
+        prop = dict(_SWAGGER_TYPES[rule['type']])
+        if 'min' in rule:
+            prop['minimum'] = rule['min']
+        if 'max' in rule:
+            prop['maximum'] = rule['max']
+        if 'max_length' in rule:
+            prop['maxLength'] = rule['max_length']
+        if rule.get('nullable'):
+            prop['x-nullable'] = True
+        properties[field] = prop
+    definition = {'type': 'object', 'properties': properties}
+    required = [field for field, rule in schema.items() if rule.get('required')]
+    if required and not partial:
+        definition['required'] = required
+    return definition
+
+
+def swagger_definitions():
+    """Definitions referenced by the route docs as #/definitions/<name>."""
+    return {
+        'StudentInput': swagger_definition(STUDENT_SCHEMA),
+        'StudentUpdate': swagger_definition(STUDENT_SCHEMA, partial=True),
+    }
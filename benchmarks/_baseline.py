@@ -0,0 +1,78 @@
+"""
+Baseline files shared by the benchmark scripts: the --save / --compare /
+--threshold options, writing results with run metadata, and failing on
+regressions against a saved run.
+"""
+import json
+import platform
+import sqlite3
+import time
+
+DEFAULT_THRESHOLD = 0.25
+
+
+def add_arguments(parser):
+    """Add --save, --compare and --threshold to a benchmark's argument parser."""
+    parser.add_argument('--save', metavar='JSON', help="Write the results as a baseline file")
+    parser.add_argument('--compare', metavar='JSON', help="Fail on regressions against this baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown before --compare fails (default: %(default)s = 25%%)")
+
+
+def compare(results, baseline, threshold, metrics):
+    """
+    Compare `results` with a saved baseline.
+    Args:
+        metrics: (name, higher_is_better) pairs to check in every result.
+    Returns: list of (key, metric, baseline value, current value) that regressed
+    by more than `threshold` (0.25 = 25%).
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        for metric, higher_is_better in metrics:
+            before, now = previous.get(metric), current.get(metric)
+            if not before or now is None:
+                continue
+            if higher_is_better:
+                regressed = now < before / (1 + threshold)
+            else:
+                regressed = now > before * (1 + threshold)
+            if regressed:
+                regressions.append((key, metric, before, now))
+    return regressions
+
+
+def save_or_compare(args, results, metrics, **meta):
+    """
+    Handle --save and --compare after a run.
+    Args:
+        metrics: (name, higher_is_better) pairs checked by --compare.
+        meta: Extra run settings stored next to the timestamp and versions.
+    Returns: the exit status, 1 when --compare found a regression beyond --threshold.
+    """
+    if args.save:
+        report = {
+            "meta": dict({
+                "created_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform(),
+            }, **meta),
+            "results": results,
+        }
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold, metrics)
+        for key, metric, before, now in regressions:
+            print(f"REGRESSION {key} {metric}: {before} -> {now}")
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        return 1 if regressions else 0
+    return 0
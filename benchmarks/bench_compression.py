@@ -0,0 +1,155 @@
+"""
+Compression benchmark: bytes on the wire against CPU for the payloads the API
+actually serves (list pages of several sizes, columnar pages, streamed
+exports), at each gzip level and uncompressed. Bodies are fetched once through
+the Flask test client, then compressed the way the middleware does it
+(gzip_bytes, or gzip_stream chunk by chunk for exports) and timed in CPU time.
+
+A modeled transfer time (bytes / --bandwidth) shows where compression pays off:
+on slow mobile links the saved bytes outweigh the CPU by far.
+
+    python -m benchmarks.bench_compression --size 20000 --levels 1,6,9
+    python -m benchmarks.bench_compression --bandwidth 2,20,200 --save benchmarks/compression.json
+    python -m benchmarks.bench_compression --compare benchmarks/compression.json --threshold 0.25
+
+Exit status is 1 when --compare finds a regression beyond --threshold.
+"""
+import argparse
+import gzip
+import os
+import shutil
+import tempfile
+import time
+
+from app.database.seed import load_students
+from app.utils.compression import DEFAULT_LEVEL, gzip_bytes, gzip_stream
+from benchmarks._baseline import add_arguments, save_or_compare
+
+DEFAULT_SIZE = 20000
+DEFAULT_LEVELS = (1, DEFAULT_LEVEL, 9)
+DEFAULT_BANDWIDTHS = (2, 20, 200)  # Mbit/s: slow mobile, good mobile, broadband
+DEFAULT_REPEAT = 20
+COMPARED_METRICS = (('compress_ms', False), ('ratio', False))
+
+# name -> (path, streamed)
+PAYLOADS = {
+    'list_10': ('/api/students?per_page=10&count=none', False),
+    'list_100': ('/api/students?per_page=100&count=none', False),
+    'list_1000': ('/api/students?per_page=1000&count=none', False),
+    'list_1000_columnar': ('/api/students?per_page=1000&count=none&format=columnar', False),
+    'export_ndjson': ('/api/students/export?format=ndjson', True),
+    'export_csv': ('/api/students/export?format=csv', True),
+}
+
+
+def fetch_payloads(app, names):
+    """Uncompressed bodies. Returns: {name: (list of chunks, streamed)}."""
+    client = app.test_client()
+    bodies = {}
+    for name in names:
+        path, streamed = PAYLOADS[name]
+        response = client.get(path, headers={'Accept-Encoding': 'identity'})
+        assert response.status_code == 200, (path, response.status_code)
+        # Streamed bodies keep their chunking, so flush overhead is measured too
+        chunks = list(response.response) if streamed else [response.get_data()]
+        bodies[name] = ([c.encode('utf-8') if isinstance(c, str) else c for c in chunks], streamed)
+        response.close()
+    return bodies
+
+
+def cpu_ms(func, repeat):
+    """Median CPU time of func() in ms, and its last result."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.process_time()
+        result = func()
+        samples.append((time.process_time() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], result
+
+
+def measure(chunks, streamed, level, repeat):
+    raw = b''.join(chunks)
+    if level == 0:
+        return {"bytes": len(raw), "ratio": 1.0, "compress_ms": 0.0, "decompress_ms": 0.0}
+    if streamed:
+        compress = lambda: b''.join(gzip_stream(iter(chunks), level))
+    else:
+        compress = lambda: gzip_bytes(raw, level)
+    compress_ms, compressed = cpu_ms(compress, repeat)
+    decompress_ms, restored = cpu_ms(lambda: gzip.decompress(compressed), repeat)
+    assert restored == raw
+    return {
+        "bytes": len(compressed),
+        "ratio": round(len(compressed) / len(raw), 4),
+        "compress_ms": round(compress_ms, 3),
+        "decompress_ms": round(decompress_ms, 3),
+    }
+
+
+def transfer_ms(size, mbps):
+    return size * 8 / (mbps * 1000)
+
+
+def run_benchmarks(size, names, levels, bandwidths, repeat, log=print):
+    """Returns: dict {"<payload>@gzip<level>": result} (level 0 = uncompressed)."""
+    workdir = tempfile.mkdtemp(prefix='student-compression-')
+    try:
+        db_path = os.path.join(workdir, 'bench.db')
+        os.environ['STUDENTS_DB'] = db_path
+        load_students(size, db_path=db_path)
+        from app import create_app
+        app = create_app({'DATABASE': db_path, 'METRICS_ENABLED': False, 'COMPRESSION': False})
+        bodies = fetch_payloads(app, names)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {}
+    header = ''.join(f"  @{mbps:g}Mbit/s" for mbps in bandwidths)
+    log(f"{'payload':<20} {'level':>5} {'bytes':>10} {'ratio':>6} {'cpu ms':>8} {'decomp':>7}{header}")
+    for name in names:
+        chunks, streamed = bodies[name]
+        for level in (0,) + tuple(levels):
+            result = measure(chunks, streamed, level, repeat)
+            # Modeled end-to-end cost: compress + transfer + decompress
+            result["total_ms"] = {
+                f"{mbps:g}": round(result["compress_ms"] + transfer_ms(result["bytes"], mbps)
+                                   + result["decompress_ms"], 3)
+                for mbps in bandwidths
+            }
+            results[f"{name}@gzip{level}"] = result
+            totals = ''.join(f"  {result['total_ms'][f'{mbps:g}']:>{len(f'@{mbps:g}Mbit/s')}.1f}"
+                             for mbps in bandwidths)
+            log(f"{name:<20} {level or '-':>5} {result['bytes']:>10} {result['ratio']:>6.3f} "
+                f"{result['compress_ms']:>8.2f} {result['decompress_ms']:>7.2f}{totals}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark response size vs CPU per gzip level")
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE, help="Students in the dataset (default: %(default)s)")
+    parser.add_argument('--payloads', default=','.join(PAYLOADS), help="Payload names, comma separated")
+    parser.add_argument('--levels', default=','.join(map(str, DEFAULT_LEVELS)), help="gzip levels (1-9)")
+    parser.add_argument('--bandwidth', default=','.join(map(str, DEFAULT_BANDWIDTHS)),
+                        help="Link speeds in Mbit/s for the modeled total time")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Timed repetitions (median is kept)")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    names = [name for name in args.payloads.split(',') if name]
+    unknown = [name for name in names if name not in PAYLOADS]
+    if unknown:
+        parser.error(f"Unknown payload(s): {', '.join(unknown)}. Available: {', '.join(PAYLOADS)}")
+    levels = [int(level) for level in args.levels.split(',') if level]
+    if any(not 1 <= level <= 9 for level in levels):
+        parser.error("gzip levels must be between 1 and 9")
+    bandwidths = [float(mbps) for mbps in args.bandwidth.split(',') if mbps]
+
+    results = run_benchmarks(args.size, names, levels, bandwidths, args.repeat)
+
+    return save_or_compare(args, results, COMPARED_METRICS, size=args.size, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
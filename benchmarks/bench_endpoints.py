@@ -0,0 +1,362 @@
+"""
+Endpoint benchmarks: latency percentiles and throughput for every route in
+student_routes.py, per dataset size and concurrency level.
+
+By default each dataset is generated with app.database.seed into a temporary
+database and the app runs in-process through Flask's test client. --live
+points the same scenarios at a running server instead (urllib, no extra deps).
+
+    python -m benchmarks.bench_endpoints --sizes 1000,100000 --concurrency 1,8
+    python -m benchmarks.bench_endpoints --save benchmarks/baseline.json
+    python -m benchmarks.bench_endpoints --compare benchmarks/baseline.json --threshold 0.25
+    python -m benchmarks.bench_endpoints --live http://127.0.0.1:5000 --sizes 0
+
+Exit status is 1 when --compare finds a regression beyond --threshold.
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from app.controllers.student_filters import encode_cursor, parse_sort
+from app.database.seed import generate_students, load_students
+from benchmarks._baseline import add_arguments, save_or_compare
+
+DEFAULT_SIZES = (1000, 100000)
+DEFAULT_CONCURRENCY = (1, 4)
+DEFAULT_REQUESTS = 200
+WARMUP_REQUESTS = 5
+PER_PAGE = 20
+
+# Metrics compared against a baseline: (name, True if higher is better)
+COMPARED_METRICS = (('p50_ms', False), ('p95_ms', False), ('throughput_rps', True))
+
+
+# --- Targets ---------------------------------------------------------------
+
+class TestClientTarget:
+    """Runs requests in-process through the Flask test client (one client per thread)."""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, headers=None, data=None, content_type=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body, data=data,
+                               headers=headers or {}, content_type=content_type)
+        response.get_data()  # Drain streamed responses (export)
+        status, response_headers = response.status_code, response.headers
+        response.close()
+        return status, response_headers
+
+
+class LiveTarget:
+    """Runs requests against a running server over HTTP."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, body=None, headers=None, data=None, content_type=None):
+        headers = dict(headers or {})
+        if body is not None:
+            data = json.dumps(body).encode()
+            content_type = 'application/json'
+        if content_type:
+            headers['Content-Type'] = content_type
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(req) as response:
+                response.read()
+                return response.status, response.headers
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code, e.headers
+
+
+# --- Scenarios -------------------------------------------------------------
+# Each scenario is called as scenario(target, ctx, rng) and returns the status
+# of its (last) request; `expected` lists the statuses that count as success
+# and `cap` limits the timed requests of the heavy ones (None = --requests).
+
+class Context:
+    """Dataset facts the scenarios need (id range, a deep cursor, fresh emails)."""
+
+    def __init__(self, max_id, total):
+        self.max_id = max(max_id, 1)
+        self.total = max(total, 1)
+        self.last_page = max(1, self.total // PER_PAGE)
+        self.deep_cursor = encode_cursor([int(self.max_id * 0.9)], parse_sort('id'))
+        self._emails = itertools.count(1)
+        self._lock = threading.Lock()
+        self._run = f"{os.getpid()}{int(time.time())}"
+
+    def new_students(self, count):
+        with self._lock:
+            start = next(self._emails)
+            for _ in range(count - 1):
+                next(self._emails)
+        students = list(generate_students(count, seed=start, start=start))
+        for i, student in enumerate(students):
+            student['email'] = f"bench.{self._run}.{start + i}@example.org"
+        return students
+
+    def random_id(self, rng):
+        return rng.randint(1, self.max_id)
+
+
+def _get(path):
+    return lambda target, ctx, rng: target.request('GET', path)[0]
+
+
+def _list_deep(target, ctx, rng):
+    return target.request('GET', f'/api/students?page={ctx.last_page}&per_page={PER_PAGE}')[0]
+
+
+def _list_cursor_deep(target, ctx, rng):
+    return target.request('GET', f'/api/students?per_page={PER_PAGE}&cursor={ctx.deep_cursor}')[0]
+
+
+def _get_by_id(target, ctx, rng):
+    return target.request('GET', f'/api/students/{ctx.random_id(rng)}')[0]
+
+
+def _get_by_id_not_modified(target, ctx, rng):
+    path = f'/api/students/{ctx.random_id(rng)}'
+    status, headers = target.request('GET', path)
+    if status != 200:
+        return status
+    return target.request('GET', path, headers={'If-None-Match': headers['ETag']})[0]
+
+
+def _create(target, ctx, rng):
+    return target.request('POST', '/api/students', body=ctx.new_students(1)[0])[0]
+
+
+def _create_bulk(target, ctx, rng):
+    return target.request('POST', '/api/students/bulk', body=ctx.new_students(100))[0]
+
+
+def _put(target, ctx, rng):
+    body = {"major": "Engineering", "semester": rng.randint(1, 12), "gpa": round(rng.uniform(0, 4), 2)}
+    return target.request('PUT', f'/api/students/{ctx.random_id(rng)}', body=body)[0]
+
+
+def _patch(target, ctx, rng):
+    body = {"gpa": round(rng.uniform(0, 4), 2)}
+    return target.request('PATCH', f'/api/students/{ctx.random_id(rng)}', body=body)[0]
+
+
+def _delete_restore(target, ctx, rng):
+    student_id = ctx.random_id(rng)
+    target.request('DELETE', f'/api/students/{student_id}')
+    return target.request('POST', f'/api/students/{student_id}/restore')[0]
+
+
+def _bulk_patch(target, ctx, rng):
+    ids = [ctx.random_id(rng) for _ in range(100)]
+    return target.request('PATCH', '/api/students/bulk', body={"ids": ids, "set": {"gpa": 3.0}})[0]
+
+
+def _bulk_delete_restore(target, ctx, rng):
+    ids = [ctx.random_id(rng) for _ in range(100)]
+    target.request('POST', '/api/students/bulk/delete', body={"ids": ids})
+    return target.request('POST', '/api/students/bulk/restore', body={"ids": ids})[0]
+
+
+def _semester_rollover(target, ctx, rng):
+    # Every active row changes group, so the stats triggers run once per row
+    body = {"filter": {}, "semester_increment": rng.choice((1, -1))}
+    return target.request('PATCH', '/api/students/bulk', body=body)[0]
+
+
+def _import(target, ctx, rng):
+    lines = [json.dumps(student) for student in ctx.new_students(100)]
+    return target.request('POST', '/api/students/import?format=ndjson',
+                          data='\n'.join(lines).encode(), content_type='application/x-ndjson')[0]
+
+
+def _changes(target, ctx, rng):
+    return target.request('GET', f'/api/students/changes?since={max(0, ctx.total - 500)}&limit=100')[0]
+
+
+SCENARIOS = {
+    'list_first_page': (_get(f'/api/students?page=1&per_page={PER_PAGE}'), (200,), None),
+    'list_deep_offset': (_list_deep, (200,), None),
+    'list_deep_cursor': (_list_cursor_deep, (200,), None),
+    'list_filtered_sorted': (_get(f'/api/students?major=Law&gpa_min=3&sort=-gpa&per_page={PER_PAGE}'), (200,), None),
+    'get_by_id': (_get_by_id, (200, 404), None),
+    'get_by_id_304': (_get_by_id_not_modified, (304, 404), None),
+    'search': (_get('/api/students/search?q=ana%20sil&limit=20'), (200,), None),
+    'stats': (_get('/api/students/stats'), (200,), None),
+    'changes': (_changes, (200, 410), None),
+    'export_full': (_get('/api/students/export?format=ndjson'), (200,), 5),
+    'create': (_create, (201,), None),
+    'create_bulk_100': (_create_bulk, (201,), 50),
+    'import_100': (_import, (200,), 50),
+    'import_status': (_get('/api/students/import/bench-missing'), (404,), None),
+    'put': (_put, (200, 404), None),
+    'patch': (_patch, (200, 404), None),
+    'delete_restore': (_delete_restore, (200, 404), None),
+    'bulk_patch_100': (_bulk_patch, (200,), 50),
+    'bulk_delete_restore_100': (_bulk_delete_restore, (200,), 50),
+    'semester_rollover': (_semester_rollover, (200,), 5),
+}
+
+
+# --- Runner ----------------------------------------------------------------
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_scenario(target, ctx, scenario, expected, requests, concurrency, seed=0):
+    """
+    Run `requests` calls of `scenario` split over `concurrency` threads.
+    Returns: dict with count, errors, throughput and latency percentiles (ms).
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    per_thread = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+
+    def worker(index, count):
+        rng = random.Random(seed * 1000 + index)
+        for _ in range(min(WARMUP_REQUESTS, count)):
+            scenario(target, ctx, rng)
+        local = []
+        failed = 0
+        for _ in range(count):
+            started = time.perf_counter()
+            status = scenario(target, ctx, rng)
+            local.append(time.perf_counter() - started)
+            if status not in expected:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=worker, args=(i, count)) for i, count in enumerate(per_thread) if count]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    return {
+        "requests": len(ms),
+        "errors": sum(errors),
+        "throughput_rps": round(len(ms) / elapsed, 1) if elapsed else None,
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else None,
+        "p50_ms": round(percentile(ms, 0.50), 3) if ms else None,
+        "p95_ms": round(percentile(ms, 0.95), 3) if ms else None,
+        "p99_ms": round(percentile(ms, 0.99), 3) if ms else None,
+    }
+
+
+def _context_for(target):
+    """Read the id range and the active total through the API itself."""
+    status, _ = target.request('GET', '/api/students?per_page=1')
+    if status != 200:
+        raise SystemExit(f"Target is not answering GET /api/students (status {status})")
+    if isinstance(target, LiveTarget):
+        with urllib.request.urlopen(target.base_url + '/api/students?per_page=1&sort=-id&count=exact') as r:
+            body = json.loads(r.read())
+    else:
+        client = target.app.test_client()
+        body = client.get('/api/students?per_page=1&sort=-id&count=exact').get_json()
+    max_id = body['students'][0]['id'] if body['students'] else 1
+    return Context(max_id, body.get('total') or max_id)
+
+
+def prepare_dataset(size, seed, workdir):
+    """Generate a database of `size` students; returns the app bound to it."""
+    from app import create_app
+    db_path = os.path.join(workdir, f'bench_{size}.db')
+    if size:
+        load_students(size, seed=seed, db_path=db_path)
+    return create_app({'DATABASE': db_path})
+
+
+def run_benchmarks(sizes, concurrency_levels, requests, scenarios, seed=42, live=None, log=print):
+    """
+    Run every scenario for every (size, concurrency) pair.
+    Returns: dict {"<scenario>@<size>x<concurrency>": result}
+    """
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='student-bench-')
+    try:
+        for size in sizes:
+            if live:
+                target = LiveTarget(live)
+            else:
+                log(f"Preparing dataset: {size} students...")
+                target = TestClientTarget(prepare_dataset(size, seed, workdir))
+            ctx = _context_for(target)
+            for concurrency in concurrency_levels:
+                for name in scenarios:
+                    scenario, expected, cap = SCENARIOS[name]
+                    count = min(requests, cap) if cap else requests
+                    key = f"{name}@{size}x{concurrency}"
+                    results[key] = run_scenario(target, ctx, scenario, expected, count, concurrency, seed)
+                    log(format_row(key, results[key]))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def format_row(key, result):
+    return (f"{key:<44} {result['throughput_rps'] or 0:>9.1f} rps  p50 {result['p50_ms'] or 0:>8.3f}  "
+            f"p95 {result['p95_ms'] or 0:>8.3f}  p99 {result['p99_ms'] or 0:>8.3f} ms  errors {result['errors']}")
+
+
+def _csv(value, cast=str):
+    return [cast(part) for part in value.split(',') if part.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the student API endpoints")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Dataset sizes, comma separated (default: %(default)s)")
+    parser.add_argument('--concurrency', default=','.join(map(str, DEFAULT_CONCURRENCY)),
+                        help="Client threads, comma separated (default: %(default)s)")
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS,
+                        help="Timed requests per scenario (default: %(default)s)")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help="Subset of scenarios, comma separated")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--live', metavar='URL', help="Benchmark a running server instead of the test client")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    scenarios = _csv(args.scenarios)
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(unknown)}. Available: {', '.join(SCENARIOS)}")
+
+    results = run_benchmarks(_csv(args.sizes, int), _csv(args.concurrency, int), args.requests,
+                             scenarios, seed=args.seed, live=args.live)
+
+    return save_or_compare(args, results, COMPARED_METRICS, requests=args.requests,
+                           target=args.live or "test_client")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,128 @@
+"""
+Cold-start benchmark: import time of the app package plus create_app() time,
+measured in a fresh interpreter per run (nothing cached in sys.modules), for
+each DOCS_MODE. The first /apispec_1.json request is timed separately since
+dynamic mode builds the spec there.
+
+    python -m benchmarks.bench_startup --runs 20
+    python -m benchmarks.bench_startup --save benchmarks/startup.json
+    python -m benchmarks.bench_startup --compare benchmarks/startup.json --threshold 0.25
+
+Exit status is 1 when --compare finds a regression beyond --threshold.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.utils.docs import DOCS_MODES
+from benchmarks._baseline import add_arguments, save_or_compare
+from benchmarks.bench_endpoints import percentile
+
+DEFAULT_RUNS = 10
+COMPARED_METRICS = (('import_ms', False), ('factory_ms', False), ('startup_p95_ms', False))
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints one JSON line of timings
+_CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+docs_ms = None
+if sys.argv[1] != 'off':
+    response = app.test_client().get('/apispec_1.json')
+    assert response.status_code == 200, response.status_code
+    docs_ms = (time.perf_counter() - created) * 1000
+print(json.dumps({"import_ms": (imported - started) * 1000, "factory_ms": (created - imported) * 1000,
+                  "first_docs_ms": docs_ms, "modules": len(sys.modules)}))
+'''
+
+
+def run_once(mode, env):
+    """One fresh interpreter. Returns: dict of timings (ms) plus the process wall time."""
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', _CHILD, mode], cwd=ROOT, env=dict(env, DOCS_MODE=mode),
+                            capture_output=True, text=True, check=True).stdout
+    sample = json.loads(output.strip().splitlines()[-1])
+    sample['process_ms'] = (time.perf_counter() - started) * 1000
+    return sample
+
+
+def summarize(samples):
+    startup = sorted(s['import_ms'] + s['factory_ms'] for s in samples)
+    docs = [s['first_docs_ms'] for s in samples if s['first_docs_ms'] is not None]
+    return {
+        "runs": len(samples),
+        "import_ms": round(statistics.median(s['import_ms'] for s in samples), 3),
+        "factory_ms": round(statistics.median(s['factory_ms'] for s in samples), 3),
+        "startup_p50_ms": round(percentile(startup, 0.50), 3),
+        "startup_p95_ms": round(percentile(startup, 0.95), 3),
+        "first_docs_ms": round(statistics.median(docs), 3) if docs else None,
+        "process_ms": round(statistics.median(s['process_ms'] for s in samples), 3),
+        "modules": samples[-1]['modules'],
+    }
+
+
+def run_benchmarks(modes, runs, apispec_path=None, log=print):
+    """
+    Returns: dict {"startup@<mode>": summary}. Prebuilt mode uses `apispec_path`,
+    or a spec built into a temporary file first.
+    """
+    workdir = tempfile.mkdtemp(prefix='student-startup-')
+    try:
+        env = dict(os.environ, STUDENTS_DB=os.path.join(workdir, 'startup.db'))
+        if 'prebuilt' in modes and not apispec_path:
+            apispec_path = os.path.join(workdir, 'apispec.json')
+            subprocess.run([sys.executable, 'manage.py', 'build-apispec', '--output', apispec_path],
+                           cwd=ROOT, env=env, capture_output=True, check=True)
+        if apispec_path:
+            env['APISPEC_PATH'] = apispec_path
+
+        # Untimed run: creates the database and compiles the .pyc files
+        run_once('dynamic', env)
+        # Modes take turns so machine noise spreads evenly over them
+        samples = {mode: [] for mode in modes}
+        for _ in range(runs):
+            for mode in modes:
+                samples[mode].append(run_once(mode, env))
+        results = {}
+        for mode in modes:
+            summary = summarize(samples[mode])
+            results[f"startup@{mode}"] = summary
+            log(f"{mode:<9} import {summary['import_ms']:>8.1f}  factory {summary['factory_ms']:>6.1f}  "
+                f"p50 {summary['startup_p50_ms']:>8.1f}  p95 {summary['startup_p95_ms']:>8.1f} ms  "
+                f"first docs {summary['first_docs_ms'] or 0:>6.1f} ms  process {summary['process_ms']:>7.1f} ms  "
+                f"modules {summary['modules']}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark app import + create_app() time")
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help="Fresh interpreters per mode (default: %(default)s)")
+    parser.add_argument('--modes', default=','.join(DOCS_MODES), help="DOCS_MODE values, comma separated")
+    parser.add_argument('--apispec', metavar='JSON', help="Prebuilt spec to use (default: build one)")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    modes = [mode for mode in args.modes.split(',') if mode]
+    unknown = [mode for mode in modes if mode not in DOCS_MODES]
+    if unknown:
+        parser.error(f"Unknown mode(s): {', '.join(unknown)}. Available: {', '.join(DOCS_MODES)}")
+
+    results = run_benchmarks(modes, args.runs, args.apispec)
+
+    return save_or_compare(args, results, COMPARED_METRICS, runs=args.runs)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,202 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+
+from app.controllers.changes_controller import compact_changes, DEFAULT_RETENTION_DAYS
+from app.controllers.import_controller import import_students, IMPORT_FORMATS
+from app.controllers.jobs_controller import run_job_by_id
+from app.controllers.stats_controller import recompute_stats, verify_stats
+from app.controllers.student_controller import rebuild_search_index
+from app.database.db_config import get_pool, init_pool, resolve_db_path
+from app.database.init_db import init_db
+from app.database.migrations import LATEST_VERSION, get_schema_version
+from app.database.query_plans import explain_queries
+from app.utils.docs import DEFAULT_APISPEC_PATH, build_apispec
+
+
+def cmd_init_db(args):
+    """Create the database and apply pending migrations."""
+    init_db()
+
+
+def cmd_db_status(args):
+    """Show the schema version of the database file."""
+    conn = sqlite3.connect(resolve_db_path())
+    try:
+        version = get_schema_version(conn)
+    finally:
+        conn.close()
+    state = "up to date" if version == LATEST_VERSION else f"{LATEST_VERSION - version} migration(s) pending"
+    print(f"{resolve_db_path()}: schema version {version} ({state})")
+
+
+def cmd_explain(args):
+    """Print EXPLAIN QUERY PLAN for every controller query."""
+    init_db(verbose=False)
+    conn = sqlite3.connect(resolve_db_path())
+    try:
+        report = explain_queries(conn)
+    finally:
+        conn.close()
+
+    scans = 0
+    for entry in report:
+        flag = "FULL SCAN" if entry["full_scan"] else "ok"
+        print(f"[{flag}] {entry['name']}")
+        print(f"    {entry['sql']}")
+        for step in entry["plan"]:
+            print(f"      -> {step}")
+        scans += entry["full_scan"]
+    print(f"\n{len(report)} queries, {scans} full scan(s)")
+    return 1 if scans else 0
+
+
+def cmd_import(args):
+    """Stream-import students from a CSV or NDJSON file."""
+    init_db(verbose=False)
+    import_format = args.format or os.path.splitext(args.file)[1].lstrip('.').lower() or 'csv'
+    if import_format not in IMPORT_FORMATS:
+        print(f"Cannot tell the format from {args.file}: use --format ({', '.join(IMPORT_FORMATS)})", file=sys.stderr)
+        return 1
+    report = None
+    writer = None
+    if args.rejected_report:
+        report = open(args.rejected_report, 'a', newline='', encoding='utf-8')
+        writer = csv.writer(report)
+        if report.tell() == 0:
+            writer.writerow(['row', 'error', 'record'])
+
+    def on_reject(row_number, record, error):
+        if writer:
+            writer.writerow([row_number, error, json.dumps(record)])
+
+    try:
+        with open(args.file, 'rb') as stream:
+            result = import_students(stream, import_format, args.chunk_size, import_id=args.resume,
+                                     source=os.path.basename(args.file), on_reject=on_reject)
+    except (UnicodeDecodeError, csv.Error) as e:
+        print(f"Could not read {args.file} as UTF-8 {import_format}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if report:
+            report.close()
+
+    print(f"Import {result['id']}: {result['status']}, {result['rows_committed']} rows read "
+          f"({result['created']} created, {result['rejected']} rejected)")
+    if result['resumed_from']:
+        print(f"Resumed after row {result['resumed_from']}")
+    if result['rejected'] and not args.rejected_report:
+        print("Tip: use --rejected-report FILE to keep the rejected rows", file=sys.stderr)
+
+
+def cmd_rebuild_search(args):
+    """Rebuild the full-text search index from the students table."""
+    init_db(verbose=False)
+    conn = get_pool().acquire()
+    try:
+        rebuild_search_index(conn)
+    finally:
+        conn.close()
+    print("Search index rebuilt.")
+
+
+def cmd_stats(args):
+    """Verify the statistics summary table against the students table (or rebuild it)."""
+    init_db(verbose=False)
+    conn = get_pool().acquire()
+    try:
+        if args.rebuild:
+            groups = recompute_stats(conn)
+            print(f"Statistics rebuilt ({groups} groups).")
+            return 0
+        drift = verify_stats(conn)
+    finally:
+        conn.close()
+
+    for entry in drift:
+        print(f"DRIFT {entry['group']}: stored={entry['stored']} expected={entry['expected']}")
+    print(f"{len(drift)} drifted group(s)" + (" - run with --rebuild to fix" if drift else ""))
+    return 1 if drift else 0
+
+
+def cmd_compact_changes(args):
+    """Compact the change log and drop entries past the retention window."""
+    init_db(verbose=False)
+    conn = get_pool().acquire()
+    try:
+        result = compact_changes(conn, args.retention_days, compact=not args.keep_superseded)
+    finally:
+        conn.close()
+    print(f"Removed {result['superseded']} superseded and {result['expired']} expired change(s); "
+          f"{result['remaining']} left, horizon at seq {result['horizon']}.")
+
+
+def cmd_build_apispec(args):
+    """Write the Swagger spec to a file for DOCS_MODE=prebuilt."""
+    from app import create_app
+    app = create_app({'DOCS_MODE': 'dynamic', 'AUTO_MIGRATE': False, 'METRICS_ENABLED': False,
+                      'JOBS_ENABLED': False})
+    spec = build_apispec(app)
+    with open(args.output, 'w') as f:
+        json.dump(spec, f, indent=1, sort_keys=True)
+    print(f"API spec with {len(spec.get('paths', {}))} paths written to {args.output}")
+
+
+def cmd_run_job(args):
+    """Run one queued background job in this process (used by the job runner for process jobs)."""
+    if not run_job_by_id(args.job_id):
+        print(f"No job {args.job_id}", file=sys.stderr)
+        return 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Student Manager maintenance commands")
+    parser.add_argument('--db', help="Database file (default: app/database/students.db or $STUDENTS_DB)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('init-db', help=cmd_init_db.__doc__).set_defaults(func=cmd_init_db)
+    sub.add_parser('db-status', help=cmd_db_status.__doc__).set_defaults(func=cmd_db_status)
+    sub.add_parser('explain', help=cmd_explain.__doc__).set_defaults(func=cmd_explain)
+
+    sub.add_parser('rebuild-search', help=cmd_rebuild_search.__doc__).set_defaults(func=cmd_rebuild_search)
+
+    stats = sub.add_parser('stats', help=cmd_stats.__doc__)
+    stats.add_argument('--rebuild', action='store_true', help="Recompute the summary table from scratch")
+    stats.set_defaults(func=cmd_stats)
+
+    compact = sub.add_parser('compact-changes', help=cmd_compact_changes.__doc__)
+    compact.add_argument('--retention-days', type=int,
+                         default=int(os.environ.get('CHANGE_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)),
+                         help="Drop changes older than this (default: $CHANGE_RETENTION_DAYS or %(default)s)")
+    compact.add_argument('--keep-superseded', action='store_true',
+                         help="Keep every entry instead of only the latest one per student")
+    compact.set_defaults(func=cmd_compact_changes)
+
+    apispec = sub.add_parser('build-apispec', help=cmd_build_apispec.__doc__)
+    apispec.add_argument('--output', default=os.environ.get('APISPEC_PATH', DEFAULT_APISPEC_PATH),
+                         help="Default: $APISPEC_PATH or app/apispec.json")
+    apispec.set_defaults(func=cmd_build_apispec)
+
+    importer = sub.add_parser('import', help=cmd_import.__doc__)
+    importer.add_argument('file')
+    importer.add_argument('--format', choices=IMPORT_FORMATS, help="Default: from the file extension")
+    importer.add_argument('--chunk-size', type=int, default=1000, help="Rows per committed transaction")
+    importer.add_argument('--resume', metavar='IMPORT_ID', help="Continue an interrupted import")
+    importer.add_argument('--rejected-report', metavar='CSV', help="Append rejected rows to this CSV file")
+    importer.set_defaults(func=cmd_import)
+
+    run_job = sub.add_parser('run-job', help=cmd_run_job.__doc__)
+    run_job.add_argument('job_id')
+    run_job.set_defaults(func=cmd_run_job)
+
+    args = parser.parse_args(argv)
+    if args.db:
+        init_pool(args.db)
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,32 +1,36 @@
-import requests
-import json
-
-# Local URL API
-url = 'http://127.0.0.1:5000/api/students'
-
-# 10 student list for testing
-students_list = [
-    {"first_name": "Ana", "last_name": "Silva", "email": "ana.silva@university.edu", "major": "Medicine", "semester": 2, "gpa": 3.8, "enrollment_date": "2025-09-01"},
-    {"first_name": "Carlos", "last_name": "Mendez", "email": "carlos.m@university.edu", "major": "Engineering", "semester": 5, "gpa": 3.5, "enrollment_date": "2024-03-15"},
-    {"first_name": "Luisa", "last_name": "Rojas", "email": "luisa.r@university.edu", "major": "Law", "semester": 3, "gpa": 3.9, "enrollment_date": "2025-01-10"},
-    {"first_name": "Jorge", "last_name": "Perez", "email": "jorge.p@university.edu", "major": "Education", "semester": 8, "gpa": 3.2, "enrollment_date": "2022-08-20"},
-    {"first_name": "Maria", "last_name": "Gomez", "email": "maria.g@university.edu", "major": "Architecture", "semester": 4, "gpa": 3.7, "enrollment_date": "2024-09-05"},
-    {"first_name": "Pedro", "last_name": "Diaz", "email": "pedro.d@university.edu", "major": "Computer Science", "semester": 1, "gpa": 4.0, "enrollment_date": "2026-01-15"},
-    {"first_name": "Sofia", "last_name": "Hernandez", "email": "sofia.h@university.edu", "major": "Psychology", "semester": 6, "gpa": 3.6, "enrollment_date": "2023-04-12"},
-    {"first_name": "Miguel", "last_name": "Torres", "email": "miguel.t@university.edu", "major": "Economics", "semester": 7, "gpa": 3.1, "enrollment_date": "2023-01-30"},
-    {"first_name": "Laura", "last_name": "Castillo", "email": "laura.c@university.edu", "major": "Biology", "semester": 2, "gpa": 3.4, "enrollment_date": "2025-08-22"},
-    {"first_name": "Andres", "last_name": "Vargas", "email": "andres.v@university.edu", "major": "Physics", "semester": 9, "gpa": 3.95, "enrollment_date": "2021-09-10"}
-]
-
-print("Loading data...")
-
-for student in students_list:
-    response = requests.post(url, json=student)
-    if response.status_code == 201:
-        print(f"✅ Registering: {student['first_name']} {student['last_name']}")
-    elif response.status_code == 409:
-        print(f"⚠️ Already exists (Duplicate email): {student['email']}")
+import argparse
+
+from app.database.seed import load_students, DEFAULT_BATCH_SIZE
+
+# Fill the database with deterministic synthetic students, written straight
+# into SQLite (the server does not need to be running). Same --seed, same data.
+#
+#   python populate_db.py                     # 1,000 students
+#   python populate_db.py --count 1000000     # capacity-test database
+#   python populate_db.py --db /tmp/bench.db --seed 7
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load synthetic students into the database")
+    parser.add_argument('--count', type=int, default=1000, help="Students to add (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed (default: %(default)s)")
+    parser.add_argument('--db', help="Database file (default: app/database/students.db or $STUDENTS_DB)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Rows per executemany")
+    args = parser.parse_args(argv)
+
+    print(f"Loading {args.count} students (seed {args.seed})...")
+
+    def progress(loaded):
+        print(f"  {loaded}/{args.count}", end='\r', flush=True)
+
+    result = load_students(args.count, seed=args.seed, db_path=args.db, batch_size=args.batch_size,
+                           progress=progress)
+    if result['rows']:
+        print(f"\n✅ Loaded students {result['first_id']}-{result['last_id']} in {result['seconds']}s.")
     else:
-        print(f"❌ Error registering {student['first_name']}: {response.text}")
+        print("Nothing to load.")
+    return 0
+
 
-print("\n✅ All data registered.")
\ No newline at end of file
+if __name__ == "__main__":
+    raise SystemExit(main())